@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 
-from .hardware import detect_hardware
+from .hardware import HardwareProfile, detect_hardware
+
+BATCH_MAX_SECONDS = 30.0
+BATCH_PADDING_SECONDS = 0.5
 
 
 @dataclass(slots=True)
@@ -18,17 +21,37 @@ class Segment:
     speaker: Optional[str]
 
 
+@dataclass(slots=True)
+class AudioChunk:
+    """A slice of audio queued for batched transcription."""
+
+    audio: np.ndarray
+    sample_rate: int
+    start_ts: float
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+
 class IncrementalTranscriber:
     """Wrapper around faster-whisper with graceful fallbacks."""
 
-    def __init__(self, model_size: str = "small") -> None:
+    def __init__(
+        self,
+        model_size: str = "small",
+        hardware: Optional[HardwareProfile] = None,
+        cpu_threads: int = 0,
+    ) -> None:
         self.model_size = model_size
+        self.hardware = hardware
+        self.cpu_threads = cpu_threads
         self._model = None
         self._device = None
         self._load_model()
 
     def _load_model(self) -> None:
-        profile = detect_hardware()
+        profile = self.hardware or detect_hardware()
         try:
             from faster_whisper import WhisperModel  # type: ignore
         except Exception:  # pragma: no cover - optional dependency
@@ -43,16 +66,11 @@ class IncrementalTranscriber:
             self.model_size,
             device=profile.device,
             compute_type=profile.compute_type,
+            cpu_threads=self.cpu_threads,
         )
         self._device = profile.device
 
-    def transcribe(self, audio: np.ndarray, sample_rate: int, start_ts: float) -> List[Segment]:
-        if audio.size == 0:
-            return []
-        if self._model is None:
-            text = "".join("la" for _ in range(int(len(audio) / sample_rate * 2)))
-            return [Segment(text=text or "(silencio)", start=start_ts, end=start_ts + len(audio) / sample_rate, confidence=0.5, speaker=None)]
-
+    def _decode(self, audio: np.ndarray):
         segments, _ = self._model.transcribe(
             audio,
             beam_size=1,
@@ -62,14 +80,23 @@ class IncrementalTranscriber:
             word_timestamps=True,
             compression_ratio_threshold=2.6,
         )
+        return segments
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int, start_ts: float) -> List[Segment]:
+        if audio.size == 0:
+            return []
+        if self._model is None:
+            text = "".join("la" for _ in range(int(len(audio) / sample_rate * 2)))
+            return [Segment(text=text or "(silencio)", start=start_ts, end=start_ts + len(audio) / sample_rate, confidence=0.5, speaker=None)]
+
         results: List[Segment] = []
-        for seg in segments:
+        for seg in self._decode(audio):
             results.append(
                 Segment(
                     text=seg.text.strip(),
                     start=start_ts + float(seg.start),
                     end=start_ts + float(seg.end),
-                    confidence=float(getattr(seg, "avg_logprob", 0.0) + 1.0) / 2.0,
+                    confidence=_segment_confidence(seg),
                     speaker=None,
                 )
             )
@@ -77,3 +104,134 @@ class IncrementalTranscriber:
             duration = len(audio) / sample_rate
             results.append(Segment(text="(sin voz)", start=start_ts, end=start_ts + duration, confidence=0.3, speaker=None))
         return results
+
+    def transcribe_batch(
+        self,
+        chunks: Sequence[AudioChunk],
+        max_batch_seconds: float = BATCH_MAX_SECONDS,
+        padding_seconds: float = BATCH_PADDING_SECONDS,
+    ) -> List[List[Segment]]:
+        """Transcribe many short chunks with one decoder call per batch.
+
+        Chunks (from one session or several) are packed back to back with
+        silence padding in between, decoded together and the resulting
+        segments are mapped back to the chunk they belong to. The returned
+        list is aligned with ``chunks``.
+        """
+
+        results: List[List[Segment]] = [[] for _ in chunks]
+        pending = [idx for idx, chunk in enumerate(chunks) if chunk.audio.size > 0]
+        if not pending:
+            return results
+        if self._model is None:
+            for idx in pending:
+                chunk = chunks[idx]
+                results[idx] = self.transcribe(chunk.audio, chunk.sample_rate, chunk.start_ts)
+            return results
+
+        for batch in _pack_batches([chunks[idx] for idx in pending], pending, max_batch_seconds, padding_seconds):
+            for idx, segments in zip(batch, self._transcribe_packed([chunks[idx] for idx in batch], padding_seconds)):
+                results[idx] = segments
+        return results
+
+    def _transcribe_packed(self, chunks: Sequence[AudioChunk], padding_seconds: float) -> List[List[Segment]]:
+        sample_rate = chunks[0].sample_rate
+        padding = np.zeros(int(padding_seconds * sample_rate), dtype=np.float32)
+        parts: List[np.ndarray] = []
+        spans: List[tuple[float, float]] = []
+        cursor = 0.0
+        for position, chunk in enumerate(chunks):
+            if chunk.sample_rate != sample_rate:
+                raise ValueError("all chunks in a batch must share the sample rate")
+            if position:
+                parts.append(padding)
+                cursor += len(padding) / sample_rate
+            parts.append(chunk.audio.astype(np.float32, copy=False))
+            spans.append((cursor, cursor + chunk.duration))
+            cursor += chunk.duration
+        packed = np.concatenate(parts)
+
+        per_chunk: List[List[Segment]] = [[] for _ in chunks]
+        for seg in self._decode(packed):
+            confidence = _segment_confidence(seg)
+            words = getattr(seg, "words", None) or []
+            pieces = _split_words(words, spans) if words else []
+            if not pieces:
+                start, end = float(seg.start), float(seg.end)
+                pieces = [(_locate_span(spans, (start + end) / 2.0), seg.text, start, end)]
+            for idx, text, start, end in pieces:
+                text = text.strip()
+                if not text:
+                    continue
+                span_start, span_end = spans[idx]
+                offset = chunks[idx].start_ts - span_start
+                per_chunk[idx].append(
+                    Segment(
+                        text=text,
+                        start=offset + min(max(start, span_start), span_end),
+                        end=offset + min(max(end, span_start), span_end),
+                        confidence=confidence,
+                        speaker=None,
+                    )
+                )
+
+        for idx, chunk in enumerate(chunks):
+            if not per_chunk[idx]:
+                per_chunk[idx].append(
+                    Segment(text="(sin voz)", start=chunk.start_ts, end=chunk.start_ts + chunk.duration, confidence=0.3, speaker=None)
+                )
+        return per_chunk
+
+
+def _segment_confidence(seg) -> float:
+    return float(getattr(seg, "avg_logprob", 0.0) + 1.0) / 2.0
+
+
+def _pack_batches(
+    chunks: Sequence[AudioChunk],
+    indices: Sequence[int],
+    max_batch_seconds: float,
+    padding_seconds: float,
+) -> Iterable[List[int]]:
+    """Yield batches of ``indices``, one sample rate per batch, in arrival order."""
+
+    open_batches: Dict[int, Tuple[List[int], float]] = {}
+    for idx, chunk in zip(indices, chunks):
+        batch, batch_seconds = open_batches.get(chunk.sample_rate, ([], 0.0))
+        extra = chunk.duration + (padding_seconds if batch else 0.0)
+        if batch and batch_seconds + extra > max_batch_seconds:
+            yield batch
+            batch, batch_seconds, extra = [], 0.0, chunk.duration
+        batch.append(idx)
+        open_batches[chunk.sample_rate] = (batch, batch_seconds + extra)
+    for batch, _ in open_batches.values():
+        yield batch
+
+
+def _locate_span(spans: Sequence[tuple[float, float]], ts: float) -> int:
+    """Return the index of the chunk span containing ``ts`` (or the nearest one)."""
+
+    best_idx = 0
+    best_distance = float("inf")
+    for idx, (start, end) in enumerate(spans):
+        if start <= ts <= end:
+            return idx
+        distance = start - ts if ts < start else ts - end
+        if distance < best_distance:
+            best_idx, best_distance = idx, distance
+    return best_idx
+
+
+def _split_words(words, spans: Sequence[tuple[float, float]]) -> List[tuple[int, str, float, float]]:
+    """Group word timestamps into contiguous runs that belong to the same chunk."""
+
+    pieces: List[tuple[int, str, float, float]] = []
+    for word in words:
+        start, end = float(word.start), float(word.end)
+        idx = _locate_span(spans, (start + end) / 2.0)
+        if pieces and pieces[-1][0] == idx:
+            _, text, first_start, _ = pieces[-1]
+            pieces[-1] = (idx, text + word.word, first_start, end)
+        else:
+            pieces.append((idx, word.word, start, end))
+    return pieces
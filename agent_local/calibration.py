@@ -0,0 +1,161 @@
+"""First-run auto-tuning of model size, compute type and threads."""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .asr import IncrementalTranscriber
+from .capture import SyntheticSource
+from .hardware import HardwareProfile, detect_hardware
+
+logger = logging.getLogger(__name__)
+
+RTF_TARGETS = {"cpu": 1.2, "cuda": 0.6}
+MODEL_LADDER = ("small", "base", "tiny")
+COMPUTE_CANDIDATES = {"cpu": ("int8", "float32"), "cuda": ("int8_float16", "float16")}
+TUNING_FILENAME = "tuning.json"
+CLIP_SECONDS = 20.0
+
+
+@dataclass(slots=True)
+class TuningProfile:
+    model_size: str
+    compute_type: str
+    cpu_threads: int
+    device: str
+    rtf: float
+    meets_target: bool
+
+
+def synthetic_clip(seconds: float = CLIP_SECONDS, sample_rate: int = 16000) -> np.ndarray:
+    """The bundled benchmark clip: deterministic speech-like bursts and pauses."""
+
+    clip = SyntheticSource(duration_seconds=seconds, sample_rate=sample_rate).read(int(seconds * sample_rate))
+    return clip if clip is not None else np.zeros(0, dtype=np.float32)
+
+
+def _thread_candidates(device: str) -> List[int]:
+    if device != "cpu":
+        return [0]
+    cores = os.cpu_count() or 1
+    return sorted({cores, max(1, cores // 2)}, reverse=True)
+
+
+def candidate_settings(device: str, models: Sequence[str] = MODEL_LADDER) -> List[tuple[str, str, int]]:
+    return [
+        (model_size, compute_type, threads)
+        for model_size in models
+        for compute_type in COMPUTE_CANDIDATES.get(device, COMPUTE_CANDIDATES["cpu"])
+        for threads in _thread_candidates(device)
+    ]
+
+
+def measure_rtf(transcriber: IncrementalTranscriber, clip: np.ndarray, sample_rate: int) -> float:
+    """Real-time factor (processing time / audio duration) after one warm-up pass."""
+
+    transcriber.transcribe(clip[: sample_rate], sample_rate, 0.0)
+    started = time.perf_counter()
+    transcriber.transcribe(clip, sample_rate, 0.0)
+    return (time.perf_counter() - started) / (len(clip) / sample_rate)
+
+
+def _default_factory(model_size: str, compute_type: str, cpu_threads: int, hardware: HardwareProfile) -> IncrementalTranscriber:
+    return IncrementalTranscriber(
+        model_size,
+        hardware=HardwareProfile(device=hardware.device, compute_type=compute_type, source=hardware.source),
+        cpu_threads=cpu_threads,
+    )
+
+
+def calibrate(
+    storage_dir: Path,
+    hardware: Optional[HardwareProfile] = None,
+    models: Sequence[str] = MODEL_LADDER,
+    factory: Callable[[str, str, int, HardwareProfile], IncrementalTranscriber] = _default_factory,
+    measure: Callable[[IncrementalTranscriber, np.ndarray, int], float] = measure_rtf,
+    clip_seconds: float = CLIP_SECONDS,
+    sample_rate: int = 16000,
+) -> TuningProfile:
+    """Benchmark candidates and persist the profile the agent should use.
+
+    Models are tried from most to least accurate; the first one whose fastest
+    compute type/thread combination meets the device RTF target wins. When
+    nothing meets the target the fastest measured setting is stored with
+    ``meets_target=False``.
+    """
+
+    hardware = hardware or detect_hardware(Path(storage_dir) / "hardware.json")
+    target = RTF_TARGETS.get(hardware.device, RTF_TARGETS["cpu"])
+    clip = synthetic_clip(clip_seconds, sample_rate)
+    fastest: Optional[TuningProfile] = None
+    chosen: Optional[TuningProfile] = None
+    for model_size in models:
+        best_for_model: Optional[TuningProfile] = None
+        for _, compute_type, threads in candidate_settings(hardware.device, [model_size]):
+            try:
+                rtf = measure(factory(model_size, compute_type, threads, hardware), clip, sample_rate)
+            except Exception as exc:  # pragma: no cover - unsupported compute type on this box
+                logger.info("Skipping %s/%s/%s threads: %s", model_size, compute_type, threads, exc)
+                continue
+            logger.info("RTF %.3f for %s/%s/%s threads", rtf, model_size, compute_type, threads)
+            profile = TuningProfile(model_size, compute_type, threads, hardware.device, rtf, rtf <= target)
+            if best_for_model is None or rtf < best_for_model.rtf:
+                best_for_model = profile
+            if fastest is None or rtf < fastest.rtf:
+                fastest = profile
+        if best_for_model is not None and best_for_model.meets_target:
+            chosen = best_for_model
+            break
+    chosen = chosen or fastest
+    if chosen is None:
+        raise RuntimeError("no candidate setting could be benchmarked")
+    save_tuning(storage_dir, chosen)
+    return chosen
+
+
+def save_tuning(storage_dir: Path, profile: TuningProfile) -> Path:
+    path = Path(storage_dir) / TUNING_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({**asdict(profile), "calibrated_at": time.time()}, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+    return path
+
+
+def load_tuning(storage_dir: Path, hardware: Optional[HardwareProfile] = None) -> Optional[TuningProfile]:
+    """Return the persisted profile, ignoring it if it was tuned on another device."""
+
+    try:
+        data = json.loads((Path(storage_dir) / TUNING_FILENAME).read_text(encoding="utf-8"))
+        profile = TuningProfile(**{field.name: data[field.name] for field in fields(TuningProfile)})
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if hardware is not None and profile.device != hardware.device:
+        return None
+    return profile
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the local agent ASR settings")
+    parser.add_argument("--storage-dir", type=Path, required=True)
+    parser.add_argument("--clip-seconds", type=float, default=CLIP_SECONDS)
+    parser.add_argument("--models", nargs="+", default=list(MODEL_LADDER))
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    logging.basicConfig(level=logging.INFO)
+    if importlib.util.find_spec("faster_whisper") is None:
+        logger.warning("faster-whisper is not installed; timings come from the simulated transcriber")
+    profile = calibrate(args.storage_dir, models=args.models, clip_seconds=args.clip_seconds)
+    print(json.dumps(asdict(profile), indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    main()
@@ -0,0 +1,267 @@
+"""Audio capture layer: pluggable sources feeding a preallocated ring buffer."""
+from __future__ import annotations
+
+import logging
+import threading
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AudioSource:
+    """Interface for anything that produces mono float32 audio.
+
+    ``read`` returns up to ``max_frames`` samples, an empty array when no audio
+    is available yet, or ``None`` once the source is exhausted.
+    """
+
+    sample_rate: int = 16000
+
+    def read(self, max_frames: int) -> Optional[np.ndarray]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class FileSource(AudioSource):
+    """Replay a PCM WAV file, downmixed to mono and resampled if needed."""
+
+    def __init__(self, path: Path, sample_rate: int = 16000) -> None:
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self._wav = wave.open(str(self.path), "rb")
+        self._channels = self._wav.getnchannels()
+        self._width = self._wav.getsampwidth()
+        self._file_rate = self._wav.getframerate()
+        if self._width not in (1, 2, 4):
+            raise ValueError(f"unsupported sample width {self._width}")
+
+    def read(self, max_frames: int) -> Optional[np.ndarray]:
+        file_frames = max(1, int(round(max_frames * self._file_rate / self.sample_rate)))
+        raw = self._wav.readframes(file_frames)
+        if not raw:
+            return None
+        if self._width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif self._width == 2:
+            samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+        else:
+            samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+        if self._channels > 1:
+            samples = samples.reshape(-1, self._channels).mean(axis=1)
+        if self._file_rate != self.sample_rate:
+            target = int(round(len(samples) * self.sample_rate / self._file_rate))
+            positions = np.linspace(0, len(samples) - 1, num=max(target, 1))
+            samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+        return samples
+
+    def close(self) -> None:
+        self._wav.close()
+
+
+class SyntheticSource(AudioSource):
+    """Deterministic speech-like bursts separated by silence, for tests and demos."""
+
+    def __init__(
+        self,
+        duration_seconds: float,
+        sample_rate: int = 16000,
+        burst_seconds: float = 1.2,
+        gap_seconds: float = 0.6,
+        seed: int = 7,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self._total = int(duration_seconds * sample_rate)
+        self._burst = int(burst_seconds * sample_rate)
+        self._period = self._burst + int(gap_seconds * sample_rate)
+        self._rng = np.random.default_rng(seed)
+        self._position = 0
+
+    def read(self, max_frames: int) -> Optional[np.ndarray]:
+        if self._position >= self._total:
+            return None
+        count = min(max_frames, self._total - self._position)
+        index = np.arange(self._position, self._position + count)
+        voiced = (index % self._period) < self._burst
+        t = index / self.sample_rate
+        tone = 0.3 * np.sin(2 * np.pi * 180.0 * t) + 0.15 * np.sin(2 * np.pi * 420.0 * t)
+        noise = 0.01 * self._rng.standard_normal(count)
+        self._position += count
+        return np.where(voiced, tone, 0.0).astype(np.float32) + noise.astype(np.float32)
+
+
+class CaptureBuffer:
+    """Fixed-size float32 circular buffer that hands out zero-copy views.
+
+    Every sample is written twice (at ``i`` and ``i + capacity``) so any window
+    up to ``capacity`` samples long is contiguous in memory. Positions are
+    absolute sample counts since the start of the capture.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity * 2, dtype=np.float32)
+        self.written = 0
+        self.released = 0
+        self.overruns = 0
+        self.overrun_samples = 0
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.written - self.capacity)
+
+    def write(self, samples: np.ndarray) -> int:
+        """Append samples and return how many unread samples were overwritten."""
+
+        count = len(samples)
+        if count == 0:
+            return 0
+        if count > self.capacity:
+            self.written += count - self.capacity
+            samples = samples[-self.capacity :]
+            count = self.capacity
+        pos = self.written % self.capacity
+        first = min(count, self.capacity - pos)
+        rest = count - first
+        self._data[pos : pos + first] = samples[:first]
+        self._data[pos + self.capacity : pos + self.capacity + first] = samples[:first]
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity : self.capacity + rest] = samples[first:]
+        self.written += count
+        lost = self.oldest - self.released
+        if lost > 0:
+            self.overruns += 1
+            self.overrun_samples += lost
+            self.released = self.oldest
+            return lost
+        return 0
+
+    def view(self, start: int, length: int) -> np.ndarray:
+        if start < self.oldest or start + length > self.written or length > self.capacity:
+            raise ValueError("requested window is not buffered")
+        pos = start % self.capacity
+        window = self._data[pos : pos + length]
+        window.flags.writeable = False
+        return window
+
+    def release(self, upto: int) -> None:
+        self.released = max(self.released, min(upto, self.written))
+
+
+@dataclass(slots=True)
+class CaptureChunk:
+    index: int
+    audio: np.ndarray
+    start_ts: float
+    final: bool = False
+
+
+class AudioCapture:
+    """Cut a source into ``chunk_seconds`` windows overlapping by ``overlap_seconds``.
+
+    Pull mode (``chunks()``) reads from the source on demand, which suits file
+    replay. Real-time sources call ``push()`` from their own thread instead;
+    when the consumer falls behind, the oldest audio is dropped and counted
+    as an overrun. A yielded chunk is a view into the ring and stays valid
+    until the next call to ``next_chunk``.
+    """
+
+    def __init__(
+        self,
+        source: AudioSource,
+        chunk_seconds: float,
+        overlap_seconds: float = 1.0,
+        buffer_seconds: float = 60.0,
+        read_frames: int = 4096,
+    ) -> None:
+        self.source = source
+        self.sample_rate = source.sample_rate
+        self.chunk_frames = int(chunk_seconds * self.sample_rate)
+        overlap_frames = int(overlap_seconds * self.sample_rate)
+        if self.chunk_frames <= 0 or not 0 <= overlap_frames < self.chunk_frames:
+            raise ValueError("overlap must be shorter than the chunk")
+        self.overlap_frames = overlap_frames
+        self.hop_frames = self.chunk_frames - overlap_frames
+        capacity = max(int(buffer_seconds * self.sample_rate), self.chunk_frames * 2)
+        self.buffer = CaptureBuffer(capacity)
+        self.read_frames = read_frames
+        self._next_start = 0
+        self._index = 0
+        self._exhausted = False
+        self._lock = threading.Lock()
+
+    @property
+    def overlap_seconds(self) -> float:
+        return self.overlap_frames / self.sample_rate
+
+    def push(self, samples: np.ndarray) -> None:
+        with self._lock:
+            lost = self.buffer.write(np.asarray(samples, dtype=np.float32))
+        if lost:
+            logger.warning("Capture overrun: dropped %.2f s of audio", lost / self.sample_rate)
+
+    def pump(self) -> bool:
+        """Read one block from the source. Returns ``False`` once it is exhausted."""
+
+        if self._exhausted:
+            return False
+        block = self.source.read(self.read_frames)
+        if block is None:
+            self._exhausted = True
+            return False
+        self.push(block)
+        return True
+
+    def next_chunk(self, final: bool = False) -> Optional[CaptureChunk]:
+        with self._lock:
+            # The previous chunk is no longer in use; keep only the overlap.
+            self.buffer.release(self._next_start)
+            if self._next_start < self.buffer.oldest:
+                self._next_start = self.buffer.oldest
+            available = self.buffer.written - self._next_start
+            if available >= self.chunk_frames:
+                length, is_final = self.chunk_frames, False
+            elif final and available > (self.overlap_frames if self._index else 0):
+                length, is_final = available, True
+            else:
+                return None
+            start = self._next_start
+            audio = self.buffer.view(start, length)
+            self._next_start = start + (self.hop_frames if not is_final else length)
+        chunk = CaptureChunk(index=self._index, audio=audio, start_ts=start / self.sample_rate, final=is_final)
+        self._index += 1
+        return chunk
+
+    def chunks(self) -> Iterator[CaptureChunk]:
+        while self.pump():
+            while True:
+                chunk = self.next_chunk()
+                if chunk is None:
+                    break
+                yield chunk
+        while True:
+            chunk = self.next_chunk(final=True)
+            if chunk is None:
+                break
+            yield chunk
+            if chunk.final:
+                break
+
+    def stats(self) -> dict:
+        return {
+            "overruns": self.buffer.overruns,
+            "dropped_seconds": self.buffer.overrun_samples / self.sample_rate,
+            "buffered_seconds": (self.buffer.written - self._next_start) / self.sample_rate,
+        }
+
+    def close(self) -> None:
+        self.source.close()
@@ -3,6 +3,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_MODEL_SIZE = "small"
 
 
 @dataclass(slots=True)
@@ -12,12 +16,18 @@ class AgentConfig:
     storage_dir: Path
     websocket_url: str
     jwt: str
-    model_size: str = "small"
+    # None picks the calibrated profile, or DEFAULT_MODEL_SIZE without one.
+    model_size: Optional[str] = None
+    use_calibration: bool = True
     chunk_size_seconds: float = 9.0
+    chunk_overlap_seconds: float = 1.0
+    capture_buffer_seconds: float = 60.0
     vad_frame_ms: int = 30
     min_speech_ms: int = 350
     min_silence_ms: int = 200
     upload_audio: bool = False
+    two_tier: bool = False
+    provisional_model_size: str = "tiny"
 
     def ensure_dirs(self) -> None:
         self.storage_dir.mkdir(parents=True, exist_ok=True)
@@ -1,24 +1,180 @@
 """Hardware detection helpers for the local agent."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Literal
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, Literal, Optional, Tuple
+
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_CACHE_PATH = Path(os.getenv("AGENT_CACHE_DIR", Path.home() / ".cache" / "grabadora")) / "hardware.json"
+
+_COMPUTE_TYPES = {"cuda": "int8_float16", "cpu": "int8"}
+_MEMO: Dict[Path, "HardwareProfile"] = {}
 
 
 @dataclass(slots=True)
 class HardwareProfile:
     device: Literal["cpu", "cuda"]
     compute_type: str
+    source: str = "default"
+
+
+def _probe_override() -> Optional[str]:
+    forced = os.getenv("AGENT_DEVICE", "").strip().lower()
+    return forced if forced in _COMPUTE_TYPES else None
+
+
+def _probe_ctranslate2() -> Optional[str]:
+    """Ask the runtime faster-whisper actually uses, without touching torch."""
+
+    if importlib.util.find_spec("ctranslate2") is None:
+        return None
+    try:
+        import ctranslate2  # type: ignore
+
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:  # pragma: no cover - broken CUDA install
+        return None
 
 
-def detect_hardware() -> HardwareProfile:
-    """Detect GPU availability using torch if present."""
+def _probe_environment() -> Optional[str]:
+    """Rule out CUDA cheaply when it is hidden or no NVIDIA driver is present."""
 
+    visible = os.getenv("CUDA_VISIBLE_DEVICES")
+    if visible is not None and visible.strip() in {"", "-1"}:
+        return "cpu"
+    has_driver = (
+        Path("/proc/driver/nvidia").exists()
+        or Path("/dev/nvidia0").exists()
+        or shutil.which("nvidia-smi") is not None
+    )
+    return None if has_driver else "cpu"
+
+
+def _probe_torch() -> Optional[str]:
+    if importlib.util.find_spec("torch") is None:
+        return None
     try:
-        import torch
+        import torch  # type: ignore
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
     except Exception:  # pragma: no cover - torch is optional
-        torch = None  # type: ignore
+        return None
+
+
+PROBES: Tuple[Tuple[str, Callable[[], Optional[str]]], ...] = (
+    ("override", _probe_override),
+    ("ctranslate2", _probe_ctranslate2),
+    ("environment", _probe_environment),
+    ("torch", _probe_torch),
+)
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _fingerprint() -> Dict[str, Optional[str]]:
+    """Everything that can change the probe result; a mismatch invalidates the cache."""
+
+    driver = Path("/proc/driver/nvidia/version")
+    return {
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "ctranslate2": _package_version("ctranslate2"),
+        "torch": _package_version("torch"),
+        "cuda_visible_devices": os.getenv("CUDA_VISIBLE_DEVICES"),
+        "agent_device": os.getenv("AGENT_DEVICE"),
+        "nvidia_driver": driver.read_text(errors="ignore").strip() if driver.exists() else shutil.which("nvidia-smi"),
+    }
+
+
+def _probe() -> HardwareProfile:
+    for name, probe in PROBES:
+        device = probe()
+        if device is not None:
+            return HardwareProfile(device=device, compute_type=_COMPUTE_TYPES[device], source=name)
+    return HardwareProfile(device="cpu", compute_type=_COMPUTE_TYPES["cpu"])
+
+
+def _load_cached(cache_path: Path, fingerprint: Dict[str, Optional[str]]) -> Optional[HardwareProfile]:
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("fingerprint") != fingerprint:
+        return None
+    if time.time() - float(data.get("detected_at", 0)) > CACHE_TTL_SECONDS:
+        return None
+    try:
+        return HardwareProfile(**data["profile"])
+    except (KeyError, TypeError):
+        return None
+
+
+def _store_cached(cache_path: Path, profile: HardwareProfile, fingerprint: Dict[str, Optional[str]]) -> None:
+    payload = {"profile": asdict(profile), "fingerprint": fingerprint, "detected_at": time.time()}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        tmp_path.replace(cache_path)
+    except OSError:  # pragma: no cover - read-only home, keep the in-process memo
+        pass
+
+
+def detect_hardware(cache_path: Optional[Path] = None, refresh: bool = False) -> HardwareProfile:
+    """Detect the inference device with cheap probes, cached in memory and on disk.
+
+    Probes run in order: ``AGENT_DEVICE`` override, ctranslate2 device count,
+    the environment (hidden CUDA or no NVIDIA driver) and finally torch.
+    """
+
+    path = Path(cache_path or DEFAULT_CACHE_PATH)
+    if not refresh and path in _MEMO:
+        return _MEMO[path]
+    fingerprint = _fingerprint()
+    profile = None if refresh else _load_cached(path, fingerprint)
+    if profile is None:
+        profile = _probe()
+        _store_cached(path, profile, fingerprint)
+    _MEMO[path] = profile
+    return profile
+
+
+if __name__ == "__main__":  # pragma: no cover - manual measurement helper
+    # Time LocalAgent until it is ready, without and then with the probe cache.
+    # This file runs as ``__main__``; the agent uses the imported module's memo.
+    import tempfile
+
+    from agent_local import hardware
+    from agent_local.config import AgentConfig
+    from agent_local.session import LocalAgent
 
-    if torch is not None and torch.cuda.is_available():  # pragma: no branch - simple check
-        return HardwareProfile(device="cuda", compute_type="int8_float16")
-    return HardwareProfile(device="cpu", compute_type="int8")
+    storage = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(tempfile.mkdtemp(prefix="agent-startup-"))
+    config = AgentConfig(
+        transcript_id="tr_startup",
+        org_id="local",
+        storage_dir=storage,
+        websocket_url="ws://localhost/sync",
+        jwt="",
+    )
+    (storage / "hardware.json").unlink(missing_ok=True)
+    for label in ("cold", "warm"):
+        hardware._MEMO.clear()
+        started = time.perf_counter()
+        agent = LocalAgent(config)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        agent.close()
+        print(f"{label} agent startup: {elapsed_ms:.2f} ms on {agent.hardware} (cache {storage / 'hardware.json'})")
@@ -0,0 +1,77 @@
+"""Background re-decoding of provisional segments with a larger model."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from .asr import AudioChunk
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class RefineJob:
+    """A span already emitted as ``rev=1`` that awaits its final decode."""
+
+    segment_id: str
+    chunk: AudioChunk
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RevisionRefiner:
+    """Single worker thread that feeds queued spans to the final model.
+
+    ``handler`` receives every batch submitted together and is expected to
+    emit the ``rev=2`` upserts. Failures are logged and the provisional
+    revision is kept.
+    """
+
+    def __init__(self, handler: Callable[[Sequence[RefineJob]], None]) -> None:
+        self._handler = handler
+        self._queue: "queue.Queue[Optional[List[RefineJob]]]" = queue.Queue()
+        self._cond = threading.Condition()
+        self._backlog = 0
+        self.last_latency: Optional[float] = None
+        self._thread = threading.Thread(target=self._run, name="revision-refiner", daemon=True)
+        self._thread.start()
+
+    @property
+    def backlog(self) -> int:
+        with self._cond:
+            return self._backlog
+
+    def submit(self, jobs: Sequence[RefineJob]) -> None:
+        if not jobs:
+            return
+        with self._cond:
+            self._backlog += len(jobs)
+        self._queue.put(list(jobs))
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted job was refined. Returns ``False`` on timeout."""
+
+        with self._cond:
+            return self._cond.wait_for(lambda: self._backlog == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._queue.get()
+            if jobs is None:
+                return
+            try:
+                self._handler(jobs)
+                self.last_latency = time.monotonic() - min(job.enqueued_at for job in jobs)
+            except Exception:  # pragma: no cover - keep the provisional revision
+                logger.exception("Final decode failed for %d provisional segments", len(jobs))
+            finally:
+                with self._cond:
+                    self._backlog -= len(jobs)
+                    self._cond.notify_all()
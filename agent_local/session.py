@@ -1,30 +1,50 @@
 """High level orchestration for a transcription session."""
 from __future__ import annotations
 
+import logging
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Deque, Dict, List, Optional, Sequence
 
 import numpy as np
 
 from shared.ids import new_id
 from shared.models import DeltaType, SegmentDelta
 
-from .asr import IncrementalTranscriber
-from .config import AgentConfig
+from .asr import AudioChunk, IncrementalTranscriber, Segment
+from .calibration import load_tuning
+from .capture import AudioCapture, AudioSource
+from .config import DEFAULT_MODEL_SIZE, AgentConfig
+from .hardware import HardwareProfile, detect_hardware
 from .queue import DeltaQueue
+from .refine import RefineJob, RevisionRefiner
 from .sync import SyncClient
 from .vad import VadConfig, VoiceActivityDetector
 
+logger = logging.getLogger(__name__)
+
 
 class LocalAgent:
     def __init__(
         self,
         config: AgentConfig,
         transcriber: Optional[IncrementalTranscriber] = None,
+        provisional_transcriber: Optional[IncrementalTranscriber] = None,
     ) -> None:
         self.config = config
         self.config.ensure_dirs()
-        self.transcriber = transcriber or IncrementalTranscriber(config.model_size)
+        self.hardware = detect_hardware(config.storage_dir / "hardware.json")
+        self.tuning = load_tuning(config.storage_dir, self.hardware) if config.use_calibration else None
+        self.transcriber = transcriber or self._build_transcriber()
+        self.provisional_transcriber: Optional[IncrementalTranscriber] = None
+        self.refiner: Optional[RevisionRefiner] = None
+        if config.two_tier:
+            self.provisional_transcriber = provisional_transcriber or IncrementalTranscriber(
+                config.provisional_model_size, hardware=self.hardware
+            )
+            self.refiner = RevisionRefiner(self._refine)
         self.delta_queue = DeltaQueue(config.storage_dir / "queue.db")
         self.vad = VoiceActivityDetector(
             VadConfig(
@@ -35,8 +55,45 @@ class LocalAgent:
         )
         self.sync_client: Optional[SyncClient] = None
         self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._rev1_latencies: Deque[float] = deque(maxlen=100)
+        self._committed_until = 0.0
+        self.capture: Optional[AudioCapture] = None
         self.sample_rate = 16000
 
+    def _build_transcriber(self) -> IncrementalTranscriber:
+        """Use the calibrated profile when ``python -m agent_local.calibration`` was run.
+
+        Any ``model_size`` set in the config wins over the calibration.
+        """
+
+        if self.tuning is None:
+            return IncrementalTranscriber(
+                self.config.model_size or DEFAULT_MODEL_SIZE, hardware=self.hardware
+            )
+        if self.config.model_size is not None:
+            logger.info(
+                "Ignoring calibrated profile (%s): model_size %s set explicitly",
+                self.tuning.model_size,
+                self.config.model_size,
+            )
+            return IncrementalTranscriber(self.config.model_size, hardware=self.hardware)
+        logger.info(
+            "Using calibrated profile: model %s, compute %s, %s threads",
+            self.tuning.model_size,
+            self.tuning.compute_type,
+            self.tuning.cpu_threads,
+        )
+        return IncrementalTranscriber(
+            self.tuning.model_size,
+            hardware=HardwareProfile(
+                device=self.hardware.device,
+                compute_type=self.tuning.compute_type,
+                source=self.hardware.source,
+            ),
+            cpu_threads=self.tuning.cpu_threads,
+        )
+
     def attach_sync(self, sync_client: SyncClient) -> None:
         self.sync_client = sync_client
 
@@ -44,35 +101,165 @@ class LocalAgent:
         return new_id("sg")
 
     def _next_seq(self) -> int:
-        self._seq += 1
-        return self._seq
+        with self._seq_lock:
+            self._seq += 1
+            return self._seq
 
     def process_audio(self, audio: np.ndarray, start_ts: float) -> List[SegmentDelta]:
-        chunks = self.vad.detect(audio, self.sample_rate)
+        return self._process_chunks(self._vad_chunks(audio, start_ts))
+
+    def open_capture(self, source: AudioSource) -> AudioCapture:
+        self.capture = AudioCapture(
+            source,
+            chunk_seconds=self.config.chunk_size_seconds,
+            overlap_seconds=self.config.chunk_overlap_seconds,
+            buffer_seconds=self.config.capture_buffer_seconds,
+        )
+        return self.capture
+
+    def process_capture(self, source: AudioSource) -> List[SegmentDelta]:
+        """Transcribe a whole source through the capture ring, chunk by chunk."""
+
+        capture = self.open_capture(source)
         deltas: List[SegmentDelta] = []
-        for chunk in chunks:
-            chunk_audio = audio[chunk]
-            chunk_start = start_ts + chunk.start / self.sample_rate
-            segments = self.transcriber.transcribe(chunk_audio, self.sample_rate, chunk_start)
+        try:
+            for chunk in capture.chunks():
+                deltas.extend(self._process_chunks(self._select_new_speech(chunk.audio, chunk.start_ts, chunk.final)))
+        finally:
+            capture.close()
+        return deltas
+
+    def _vad_chunks(self, audio: np.ndarray, start_ts: float) -> List[AudioChunk]:
+        return [
+            AudioChunk(
+                audio=audio[window],
+                sample_rate=self.sample_rate,
+                start_ts=start_ts + window.start / self.sample_rate,
+            )
+            for window in self.vad.detect(audio, self.sample_rate)
+        ]
+
+    def _select_new_speech(self, audio: np.ndarray, start_ts: float, final: bool) -> List[AudioChunk]:
+        """Drop speech already transcribed in the overlap of the previous chunk.
+
+        Speech that runs into the end of a non-final chunk and starts inside
+        the region the next chunk will overlap is deferred, so utterances are
+        not cut at chunk boundaries.
+        """
+
+        overlap_start = start_ts + len(audio) / self.sample_rate - self.config.chunk_overlap_seconds
+        selected: List[AudioChunk] = []
+        for chunk in self._vad_chunks(audio, start_ts):
+            chunk_end = chunk.start_ts + chunk.duration
+            if chunk_end <= self._committed_until + 1e-3:
+                continue
+            touches_end = chunk_end >= start_ts + len(audio) / self.sample_rate - 1e-3
+            if not final and touches_end and chunk.start_ts >= overlap_start:
+                continue
+            if chunk.start_ts < self._committed_until:
+                skip = int((self._committed_until - chunk.start_ts) * self.sample_rate)
+                chunk = AudioChunk(
+                    audio=chunk.audio[skip:],
+                    sample_rate=chunk.sample_rate,
+                    start_ts=chunk.start_ts + skip / self.sample_rate,
+                )
+            selected.append(chunk)
+            self._committed_until = max(self._committed_until, chunk_end)
+        return selected
+
+    def _process_chunks(self, chunks: List[AudioChunk]) -> List[SegmentDelta]:
+        if self.refiner is not None:
+            return self._process_two_tier(chunks)
+        deltas: List[SegmentDelta] = []
+        for segments in self._transcribe_chunks(self.transcriber, chunks):
             for segment in segments:
-                segment_id = self._next_segment_id()
-                delta = SegmentDelta(
-                    type=DeltaType.SEGMENT_UPSERT,
-                    seq=self._next_seq(),
-                    transcript_id=self.config.transcript_id,
-                    segment_id=segment_id,
-                    rev=1,
-                    t0=segment.start,
-                    t1=segment.end,
-                    text=segment.text,
-                    speaker=segment.speaker,
-                    conf=segment.confidence,
-                    meta={"lang": "es"},
+                deltas.append(self._emit_segment(segment))
+        return deltas
+
+    def _process_two_tier(self, chunks: List[AudioChunk]) -> List[SegmentDelta]:
+        """Emit one provisional ``rev=1`` segment per chunk and queue its final decode."""
+
+        started = time.monotonic()
+        deltas: List[SegmentDelta] = []
+        jobs: List[RefineJob] = []
+        for chunk, segments in zip(chunks, self._transcribe_chunks(self.provisional_transcriber, chunks)):
+            merged = _merge_segments(segments)
+            if merged is None:
+                continue
+            delta = self._emit_segment(merged)
+            deltas.append(delta)
+            # The chunk may be a view on a buffer the caller reuses.
+            jobs.append(
+                RefineJob(
+                    segment_id=delta.segment_id,
+                    chunk=AudioChunk(
+                        audio=np.array(chunk.audio, copy=True),
+                        sample_rate=chunk.sample_rate,
+                        start_ts=chunk.start_ts,
+                    ),
                 )
-                self.delta_queue.enqueue(delta)
-                deltas.append(delta)
+            )
+        if deltas:
+            self._rev1_latencies.append(time.monotonic() - started)
+        self.refiner.submit(jobs)
         return deltas
 
+    def _refine(self, jobs: Sequence[RefineJob]) -> None:
+        chunks = [job.chunk for job in jobs]
+        for job, segments in zip(jobs, self._transcribe_chunks(self.transcriber, chunks)):
+            merged = _merge_segments(segments)
+            if merged is not None:
+                self._emit_segment(merged, segment_id=job.segment_id, rev=2)
+
+    def _transcribe_chunks(self, transcriber, chunks: List[AudioChunk]) -> List[List[Segment]]:
+        """Use the batched API when several VAD chunks are ready at once."""
+
+        transcribe_batch = getattr(transcriber, "transcribe_batch", None)
+        if len(chunks) > 1 and callable(transcribe_batch):
+            return transcribe_batch(chunks)
+        return [transcriber.transcribe(chunk.audio, chunk.sample_rate, chunk.start_ts) for chunk in chunks]
+
+    def wait_for_refinements(self, timeout: Optional[float] = None) -> bool:
+        """Block until every provisional segment got its ``rev=2`` upsert."""
+
+        if self.refiner is None:
+            return True
+        return self.refiner.join(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = list(self._rev1_latencies)
+        refiner = self.refiner
+        last_refine = refiner.last_latency if refiner else None
+        return {
+            "rev1_latency_ms": int(latencies[-1] * 1000) if latencies else None,
+            "rev1_latency_avg_ms": int(sum(latencies) / len(latencies) * 1000) if latencies else None,
+            "rev2_backlog": refiner.backlog if refiner else 0,
+            "rev2_latency_ms": int(last_refine * 1000) if last_refine is not None else None,
+            **(self.capture.stats() if self.capture else {}),
+        }
+
+    def close(self) -> None:
+        if self.refiner is not None:
+            self.refiner.close()
+            self.refiner = None
+
+    def _emit_segment(self, segment: Segment, segment_id: Optional[str] = None, rev: int = 1) -> SegmentDelta:
+        delta = SegmentDelta(
+            type=DeltaType.SEGMENT_UPSERT,
+            seq=self._next_seq(),
+            transcript_id=self.config.transcript_id,
+            segment_id=segment_id or self._next_segment_id(),
+            rev=rev,
+            t0=segment.start,
+            t1=segment.end,
+            text=segment.text,
+            speaker=segment.speaker,
+            conf=segment.confidence,
+            meta={"lang": "es"},
+        )
+        self.delta_queue.enqueue(delta)
+        return delta
+
     async def flush(self) -> None:
         if not self.sync_client:
             return
@@ -90,7 +277,7 @@ class LocalAgent:
         md_path = exports_dir / f"{self.config.transcript_id}.md"
         srt_path = exports_dir / f"{self.config.transcript_id}.srt"
         json_path = exports_dir / f"{self.config.transcript_id}.json"
-        all_deltas = self.delta_queue.list_all()
+        all_deltas = _latest_revisions(self.delta_queue.list_all())
         with md_path.open("w", encoding="utf-8") as handle:
             for delta in all_deltas:
                 handle.write(f"- {delta.text}\n")
@@ -105,3 +292,26 @@ class LocalAgent:
             payload = [delta.to_payload() for delta in all_deltas]
             json.dump(payload, handle, indent=2, ensure_ascii=False)
         return {"md": md_path, "srt": srt_path, "json": json_path}
+
+
+def _merge_segments(segments: Sequence[Segment]) -> Optional[Segment]:
+    if not segments:
+        return None
+    return Segment(
+        text=" ".join(segment.text for segment in segments if segment.text).strip(),
+        start=min(segment.start for segment in segments),
+        end=max(segment.end for segment in segments),
+        confidence=sum(segment.confidence for segment in segments) / len(segments),
+        speaker=segments[0].speaker,
+    )
+
+
+def _latest_revisions(deltas: List[SegmentDelta]) -> List[SegmentDelta]:
+    """Keep only the highest ``rev`` of every segment, in first-seen order."""
+
+    latest: Dict[str, SegmentDelta] = {}
+    for delta in deltas:
+        current = latest.get(delta.segment_id)
+        if current is None or delta.rev >= current.rev:
+            latest[delta.segment_id] = delta
+    return list(latest.values())
@@ -34,10 +34,10 @@ class VoiceActivityDetector:
             raise ValueError("frame duration too small")
 
         if self._vad is None:
-            return self._energy_based(audio, frame_samples)
+            return self._energy_based(audio, sample_rate, frame_samples)
         return self._webrtc_based(audio, sample_rate, frame_samples)
 
-    def _energy_based(self, audio: np.ndarray, frame_samples: int) -> List[slice]:
+    def _energy_based(self, audio: np.ndarray, sample_rate: int, frame_samples: int) -> List[slice]:
         energy = np.abs(audio)
         threshold = np.percentile(energy, 75) * 0.5
         slices: List[slice] = []
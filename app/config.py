@@ -24,6 +24,9 @@ class Settings(BaseSettings):
     transcripts_dir: Path = Path("data/transcripts")
     models_cache_dir: Path = Path("data/models")
     audio_cache_dir: Path = Path("data/audio_cache")
+    audio_cache_max_bytes: int = 2 * 1024**3
+    result_cache_path: Path = Path("data/result_cache.db")
+    result_cache_max_bytes: int = 256 * 1024**2
 
     whisper_model_size: str = "large-v3"
     whisper_device: str = "cuda"
@@ -37,12 +40,20 @@ class Settings(BaseSettings):
     whisper_vad_mode: str = "auto"
     whisper_enable_speaker_diarization: bool = True
     whisper_parallel_pipelines: int = 1
+    whisper_long_audio_seconds: float = 1800.0
+    whisper_long_audio_piece_seconds: float = 600.0
+    whisper_long_audio_overlap_seconds: float = 5.0
     whisper_word_timestamps: bool = False
     whisper_condition_on_previous_text: bool = True
     whisper_compression_ratio_threshold: Optional[float] = 2.4
     whisper_log_prob_threshold: Optional[float] = -1.0
     whisper_vad_repo_id: str = "pyannote/segmentation"
     whisper_vad_filename: str = "pytorch_model.bin"
+    inference_slots_shared: bool = True
+    inference_slots_dir: Path = Path("data/inference_slots")
+    model_pool_budget_mb: Optional[int] = None
+    # Comma-separated "model[:device]" entries, e.g. "small,medium:cpu".
+    preload_models: str = ""
 
     live_window_seconds: float = 60.0
     live_window_overlap_seconds: float = 2.0
@@ -51,6 +62,19 @@ class Settings(BaseSettings):
     live_event_history_size: int = 512
     live_snapshot_max_segments: int = 200
     live_heartbeat_interval_seconds: float = 15.0
+    live_stream_decoder: bool = True
+    live_session_store: str = "memory"
+    live_session_store_path: Path = Path("data/live_sessions.db")
+    live_session_routing: str = "forward"
+    live_worker_url: Optional[str] = None
+
+    transcription_queue: str = "inline"
+    transcription_queue_path: Path = Path("data/jobs.db")
+    transcription_job_lease_seconds: float = 60.0
+    transcription_job_max_attempts: int = 3
+    transcription_job_backoff_seconds: float = 5.0
+    transcription_progress_flush_ms: int = 1000
+    transcription_progress_flush_segments: int = 20
 
     enable_dummy_transcriber: bool = False
 
@@ -58,6 +82,8 @@ class Settings(BaseSettings):
     fw_num_workers: int = 1
 
     max_upload_size_mb: int = 300
+    batch_ingest_workers: int = 4
+    chunked_upload_ttl_seconds: float = 24 * 3600.0
 
     log_level: str = "INFO"
 
@@ -66,6 +92,9 @@ class Settings(BaseSettings):
     huggingface_token: Optional[str] = None
 
     debug_event_limit: int = 200
+    debug_event_log_dir: Path = Path("data/debug_events")
+    debug_event_flush_ms: int = 200
+    debug_event_batch_size: int = 64
 
 
 @lru_cache
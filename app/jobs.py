@@ -0,0 +1,342 @@
+"""Persistent transcription job queue with leases, retries and recovery."""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+LEASE_EXPIRED_ERROR = "El worker dejó de renovar la concesión del trabajo"
+
+
+@dataclass
+class Job:
+    id: int
+    transcription_id: int
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """Transcription jobs stored in a SQLite file shared by API and workers.
+
+    A worker leases a job for ``lease_seconds`` and must heartbeat before the
+    lease runs out. Failed attempts, including leases that expired because the
+    worker crashed or hung, are retried with exponential backoff up to
+    ``max_attempts``.
+
+    Jobs enqueued together with ``enqueue_group`` share a ``group_id`` and an
+    ``available_at``, so they are leased longest-first by
+    ``estimated_seconds``, which keeps the slowest file off the end of the
+    batch.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        backoff_seconds: float = 5.0,
+        max_backoff_seconds: float = 300.0,
+    ) -> None:
+        self.path = Path(path)
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_seconds = float(backoff_seconds)
+        self.max_backoff_seconds = float(max_backoff_seconds)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcription_jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "transcription_id INTEGER NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "max_attempts INTEGER NOT NULL, "
+                "available_at REAL NOT NULL, "
+                "lease_owner TEXT, "
+                "lease_expires_at REAL, "
+                "last_error TEXT, "
+                "group_id TEXT, "
+                "estimated_seconds REAL, "
+                "created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(transcription_jobs)")}
+            for column, kind in (("group_id", "TEXT"), ("estimated_seconds", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE transcription_jobs ADD COLUMN {column} {kind}")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_transcription_jobs_ready "
+                "ON transcription_jobs (status, available_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_transcription_jobs_group "
+                "ON transcription_jobs (group_id)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def backoff_for(self, attempts: int) -> float:
+        return min(self.max_backoff_seconds, self.backoff_seconds * 2 ** max(0, attempts - 1))
+
+    def enqueue(self, transcription_id: int, payload: Dict[str, Any]) -> int:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO transcription_jobs (transcription_id, payload, status, "
+                "max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (transcription_id, json.dumps(payload), QUEUED, self.max_attempts, now, now, now),
+            )
+            return int(cursor.lastrowid)
+
+    def enqueue_group(
+        self,
+        group_id: str,
+        items: Sequence[Tuple[int, Dict[str, Any], Optional[float]]],
+    ) -> List[int]:
+        """Enqueue ``(transcription_id, payload, estimated_seconds)`` items at once."""
+
+        now = time.time()
+        job_ids: List[int] = []
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for transcription_id, payload, estimated_seconds in items:
+                    cursor = conn.execute(
+                        "INSERT INTO transcription_jobs (transcription_id, payload, status, "
+                        "max_attempts, available_at, group_id, estimated_seconds, "
+                        "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            transcription_id,
+                            json.dumps(payload),
+                            QUEUED,
+                            self.max_attempts,
+                            now,
+                            group_id,
+                            estimated_seconds,
+                            now,
+                            now,
+                        ),
+                    )
+                    job_ids.append(int(cursor.lastrowid))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return job_ids
+
+    def lease(
+        self,
+        worker_id: str,
+        job_id: Optional[int] = None,
+        group_id: Optional[str] = None,
+    ) -> Optional[Job]:
+        """Claim the next runnable job (or ``job_id``) for ``worker_id``."""
+
+        now = time.time()
+        query = "SELECT * FROM transcription_jobs WHERE status = ? AND available_at <= ?"
+        params: list = [QUEUED, now]
+        if job_id is not None:
+            query += " AND id = ?"
+            params.append(job_id)
+        if group_id is not None:
+            query += " AND group_id = ?"
+            params.append(group_id)
+        query += " ORDER BY available_at, estimated_seconds DESC, id LIMIT 1"
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(query, params).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE transcription_jobs SET status = ?, attempts = attempts + 1, "
+                    "lease_owner = ?, lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                    (LEASED, worker_id, now + self.lease_seconds, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return Job(
+            id=row["id"],
+            transcription_id=row["transcription_id"],
+            payload=json.loads(row["payload"]),
+            attempts=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+        )
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease; ``False`` means another worker took the job over."""
+
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE transcription_jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + self.lease_seconds, now, job_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE transcription_jobs SET status = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, time.time(), job_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def _record_failure(
+        self, conn: sqlite3.Connection, row: sqlite3.Row, error: str, now: float
+    ) -> bool:
+        retry = row["attempts"] < row["max_attempts"]
+        conn.execute(
+            "UPDATE transcription_jobs SET status = ?, available_at = ?, "
+            "lease_owner = NULL, lease_expires_at = NULL, last_error = ?, updated_at = ? "
+            "WHERE id = ?",
+            (
+                QUEUED if retry else FAILED,
+                now + self.backoff_for(row["attempts"]) if retry else now,
+                error,
+                now,
+                row["id"],
+            ),
+        )
+        return retry
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; returns ``True`` when the job will be retried."""
+
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, attempts, max_attempts FROM transcription_jobs "
+                    "WHERE id = ? AND status = ? AND lease_owner = ?",
+                    (job_id, LEASED, worker_id),
+                ).fetchone()
+                retry = row is not None and self._record_failure(conn, row, error, now)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return retry
+
+    def expire_leases(self) -> List[int]:
+        """Count expired leases as failed attempts.
+
+        The job is requeued with backoff like any other failure, so a job
+        that keeps killing its worker stops after ``max_attempts``. Returns
+        the transcription ids whose jobs have no attempts left.
+        """
+
+        now = time.time()
+        exhausted: List[int] = []
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, transcription_id, attempts, max_attempts FROM transcription_jobs "
+                    "WHERE status = ? AND lease_expires_at < ?",
+                    (LEASED, now),
+                ).fetchall()
+                for row in rows:
+                    if not self._record_failure(conn, row, LEASE_EXPIRED_ERROR, now):
+                        exhausted.append(row["transcription_id"])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if rows:
+            logger.warning("%s trabajos de transcripción perdieron su concesión", len(rows))
+        return exhausted
+
+    def transcriptions_with_jobs(self, transcription_ids: Sequence[int]) -> Set[int]:
+        """The ids in ``transcription_ids`` that have had a job, in any status."""
+
+        found: Set[int] = set()
+        ids = list(transcription_ids)
+        with closing(self._connect()) as conn:
+            # Stay under SQLite's limit on bound parameters.
+            for start in range(0, len(ids), 500):
+                batch = ids[start : start + 500]
+                rows = conn.execute(
+                    "SELECT DISTINCT transcription_id FROM transcription_jobs "
+                    f"WHERE transcription_id IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                found.update(row["transcription_id"] for row in rows)
+        return found
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM transcription_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def pending_count(self) -> int:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM transcription_jobs WHERE status IN (?, ?)", (QUEUED, LEASED)
+            ).fetchone()
+        return int(row[0])
+
+    def group_progress(self, group_id: str) -> Optional[Dict[str, Any]]:
+        """Job counts per status and the share of estimated work that is finished."""
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, transcription_id, status, attempts, estimated_seconds, last_error "
+                "FROM transcription_jobs WHERE group_id = ? "
+                "ORDER BY estimated_seconds DESC, id",
+                (group_id,),
+            ).fetchall()
+        if not rows:
+            return None
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        total_work = finished_work = 0.0
+        for row in rows:
+            counts[row["status"]] = counts.get(row["status"], 0) + 1
+            weight = row["estimated_seconds"] or 1.0
+            total_work += weight
+            if row["status"] in (DONE, FAILED):
+                finished_work += weight
+        return {
+            "group_id": group_id,
+            "total": len(rows),
+            **counts,
+            "progress": round(finished_work / total_work, 4) if total_work else 1.0,
+            "jobs": [
+                {
+                    "job_id": row["id"],
+                    "transcription_id": row["transcription_id"],
+                    "status": row["status"],
+                    "attempts": row["attempts"],
+                    "estimated_seconds": row["estimated_seconds"],
+                    "error": row["last_error"],
+                }
+                for row in rows
+            ],
+        }
@@ -0,0 +1,124 @@
+"""Background expiry of idle live sessions."""
+from __future__ import annotations
+
+import heapq
+import logging
+import shutil
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryReaper:
+    """Expire keys from a min-heap of deadlines on a daemon thread.
+
+    Each key is pushed once with its first deadline. Activity only has to move
+    the value ``deadline_of`` reports: when an entry comes due the reaper asks
+    for the current deadline and pushes the key back if it has moved, so
+    requests never touch the heap and each wake-up costs O(log n). Directory
+    removal for expired or finished sessions also runs on this thread.
+    """
+
+    def __init__(
+        self,
+        deadline_of: Callable[[str], Optional[float]],
+        expire: Callable[[str], None],
+        name: str = "live-session-reaper",
+    ) -> None:
+        self.deadline_of = deadline_of
+        self.expire = expire
+        self.name = name
+        self._heap: List[Tuple[float, str]] = []
+        self._removals: Deque[Path] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def track(self, key: str, deadline: float) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, key))
+            self._cond.notify()
+        self._ensure_thread()
+
+    def remove_later(self, path: Path) -> None:
+        with self._cond:
+            self._removals.append(Path(path))
+            self._cond.notify()
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _due(self, now: float) -> List[str]:
+        due: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Expire every key past its deadline and flush queued removals."""
+
+        current = time.time() if now is None else now
+        with self._cond:
+            due = self._due(current)
+        expired = 0
+        for key in due:
+            deadline = self.deadline_of(key)
+            if deadline is None:
+                continue
+            if deadline > current:
+                with self._cond:
+                    heapq.heappush(self._heap, (deadline, key))
+                continue
+            try:
+                self.expire(key)
+                expired += 1
+            except Exception:  # pragma: no cover - defensive
+                logger.exception("No se pudo expirar la sesión en vivo %s", key)
+        self._flush_removals()
+        return expired
+
+    def _flush_removals(self) -> None:
+        while True:
+            with self._cond:
+                if not self._removals:
+                    return
+                path = self._removals.popleft()
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping and not self._removals:
+                    if self._heap:
+                        timeout = self._heap[0][0] - time.time()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._cond.wait(timeout=timeout)
+                if self._stopping:
+                    return
+            self.run_pending()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self._flush_removals()
@@ -0,0 +1,158 @@
+"""Ownership of live sessions across API worker processes."""
+from __future__ import annotations
+
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSessionRegistry:
+    """Record which worker holds the in-memory state of each live session.
+
+    Owners are base URLs (``http://127.0.0.1:41231``) that other workers can
+    reach to forward chunk and SSE requests for sessions they do not hold.
+    """
+
+    def claim(self, session_id: str, owner: str) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def owner_of(self, session_id: str) -> Optional[str]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def release(self, session_id: str) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def release_owner(self, owner: str) -> int:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class InMemoryLiveSessionRegistry(LiveSessionRegistry):
+    """Single-process registry; every session belongs to this worker."""
+
+    def __init__(self) -> None:
+        self._owners: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, session_id: str, owner: str) -> None:
+        with self._lock:
+            self._owners[session_id] = owner
+
+    def owner_of(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            return self._owners.get(session_id)
+
+    def release(self, session_id: str) -> None:
+        with self._lock:
+            self._owners.pop(session_id, None)
+
+    def release_owner(self, owner: str) -> int:
+        with self._lock:
+            stale = [key for key, value in self._owners.items() if value == owner]
+            for key in stale:
+                del self._owners[key]
+        return len(stale)
+
+
+class SQLiteLiveSessionRegistry(LiveSessionRegistry):
+    """Registry shared by the workers of one host through a SQLite file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS live_sessions ("
+                "session_id TEXT PRIMARY KEY, owner TEXT NOT NULL, claimed_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def claim(self, session_id: str, owner: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO live_sessions (session_id, owner, claimed_at) VALUES (?, ?, ?)",
+                (session_id, owner, time.time()),
+            )
+
+    def owner_of(self, session_id: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT owner FROM live_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def release(self, session_id: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM live_sessions WHERE session_id = ?", (session_id,))
+
+    def release_owner(self, owner: str) -> int:
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM live_sessions WHERE owner = ?", (owner,)).rowcount
+
+
+def create_live_registry(store: str, path: Path) -> LiveSessionRegistry:
+    normalized = (store or "memory").strip().lower()
+    if normalized == "sqlite":
+        return SQLiteLiveSessionRegistry(path)
+    if normalized != "memory":
+        raise ValueError(f"Almacén de sesiones en vivo no soportado: {store}")
+    return InMemoryLiveSessionRegistry()
+
+
+class LiveWorkerListener:
+    """Private per-process HTTP listener other workers forward requests to.
+
+    ``uvicorn --workers N`` shares one public port, so a request can land on
+    any worker. Each worker therefore also serves ``app`` on its own loopback
+    port and advertises that address as the owner of the sessions it creates.
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.app = app
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 5.0) -> str:
+        import uvicorn
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        config = uvicorn.Config(self.app, lifespan="off", log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run,
+            kwargs={"sockets": [sock]},
+            name="live-worker-listener",
+            daemon=True,
+        )
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if not self._server.started:
+            raise RuntimeError("No se pudo iniciar el listener interno del worker")
+        logger.info("Listener interno de sesiones en vivo en %s", self.url)
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
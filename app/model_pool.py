@@ -0,0 +1,316 @@
+"""Resident Whisper models shared by live sessions and batch jobs."""
+from __future__ import annotations
+
+import logging
+import os
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Approximate resident size of a loaded faster-whisper model (fp16/int8
+# weights plus runtime buffers), used until a load has been measured.
+MODEL_MEMORY_ESTIMATES_MB: Dict[str, int] = {
+    "tiny": 150,
+    "base": 250,
+    "small": 700,
+    "medium": 1_800,
+    "large": 3_500,
+}
+DEFAULT_MODEL_MEMORY_MB = 3_500
+_MIN_MEASURED_BYTES = 1024 * 1024
+
+ModelKey = Tuple[str, str]
+
+
+def estimate_model_bytes(model_size: str) -> int:
+    name = (model_size or "").lower()
+    for prefix, megabytes in MODEL_MEMORY_ESTIMATES_MB.items():
+        if name.startswith(prefix) or f"-{prefix}" in name or f"/{prefix}" in name:
+            return megabytes * 1024 * 1024
+    return DEFAULT_MODEL_MEMORY_MB * 1024 * 1024
+
+
+def resident_set_bytes() -> Optional[int]:
+    """Current RSS of this process, or ``None`` where ``/proc`` is missing."""
+
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def default_budget_bytes() -> Optional[int]:
+    """Half of physical memory, or ``None`` (no limit) when it is unknown."""
+
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (OSError, ValueError):
+        return None
+
+
+@dataclass
+class _Entry:
+    model_size: str
+    device: str
+    model: Any = None
+    future: Optional[Future] = None
+    refs: int = 0
+    bytes: int = 0
+    measured: bool = False
+    uses: int = 0
+    loaded_at: Optional[float] = None
+    last_used_at: float = field(default_factory=time.time)
+
+
+class ModelPool:
+    """Keep loaded models under a memory budget.
+
+    ``use`` hands out a model and counts the reference until the block exits;
+    models nobody holds stay resident and are evicted least recently used
+    first when a new load needs room. ``reserve`` charges copies loaded
+    outside the pool, such as the long-audio worker processes, against the
+    same budget. Models in use are never evicted, so
+    the budget can be overshot while every resident model is busy. Each model
+    is charged the RSS growth measured around its load, or the size estimate
+    for its name when that cannot be measured (GPU weights barely touch RSS).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str, str], Any],
+        budget_bytes: Optional[int] = None,
+        unload: Optional[Callable[[Any], None]] = None,
+        estimate: Callable[[str], int] = estimate_model_bytes,
+        measure: Callable[[], Optional[int]] = resident_set_bytes,
+    ) -> None:
+        self.loader = loader
+        self.budget_bytes = budget_bytes if budget_bytes and budget_bytes > 0 else None
+        self.unload = unload
+        self.estimate = estimate
+        self.measure = measure
+        self.loads = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._reserved: Dict[int, Tuple[str, str, int]] = {}
+        self._tokens = itertools.count()
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.bytes for entry in self._entries.values() if entry.model is not None)
+
+    def is_resident(self, model_size: str, device: str) -> bool:
+        with self._lock:
+            entry = self._entries.get((model_size, device))
+            return entry is not None and entry.model is not None
+
+    def acquire(self, model_size: str, device: str) -> Any:
+        key = (model_size, device)
+        evicted: List[_Entry] = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.model is not None:
+                entry.refs += 1
+                entry.uses += 1
+                self._entries.move_to_end(key)
+                return entry.model
+            leader = entry is None
+            if leader:
+                entry = _Entry(model_size=model_size, device=device, future=Future())
+                entry.bytes = self.estimate(model_size)
+                self._entries[key] = entry
+                evicted = self._evict_locked()
+            entry.refs += 1
+            entry.uses += 1
+            future = entry.future
+        self._unload_all(evicted)
+        if not leader:
+            try:
+                return future.result()
+            except BaseException:
+                with self._lock:
+                    entry.refs -= 1
+                raise
+        return self._load(key, entry)
+
+    def _load(self, key: ModelKey, entry: _Entry) -> Any:
+        before = self.measure()
+        started = time.perf_counter()
+        try:
+            model = self.loader(entry.model_size, entry.device)
+        except BaseException as exc:
+            with self._lock:
+                self._entries.pop(key, None)
+            entry.future.set_exception(exc)
+            raise
+        after = self.measure()
+        with self._lock:
+            if before is not None and after is not None and after - before >= _MIN_MEASURED_BYTES:
+                entry.bytes = after - before
+                entry.measured = True
+            entry.model = model
+            entry.loaded_at = time.time()
+            self.loads += 1
+            evicted = self._evict_locked()
+        self._unload_all(evicted)
+        logger.info(
+            "Modelo %s (%s) cargado en %.1fs; ~%d MB residentes",
+            entry.model_size,
+            entry.device,
+            time.perf_counter() - started,
+            entry.bytes // (1024 * 1024),
+        )
+        entry.future.set_result(model)
+        return model
+
+    def release(self, model_size: str, device: str) -> None:
+        with self._lock:
+            entry = self._entries.get((model_size, device))
+            if entry is None:
+                return
+            entry.refs = max(0, entry.refs - 1)
+            entry.last_used_at = time.time()
+            self._entries.move_to_end((model_size, device))
+            evicted = self._evict_locked()
+        self._unload_all(evicted)
+
+    @contextmanager
+    def use(self, model_size: str, device: str) -> Iterator[Any]:
+        model = self.acquire(model_size, device)
+        try:
+            yield model
+        finally:
+            self.release(model_size, device)
+
+    def preload(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Load ``(model_size, device)`` pairs and leave them resident but idle."""
+
+        for model_size, device in pairs:
+            try:
+                with self.use(model_size, device):
+                    pass
+            except Exception as exc:
+                logger.warning("No se pudo precargar el modelo %s (%s): %s", model_size, device, exc)
+
+    def prepare(self, model_size: str, device: str) -> bool:
+        """Start loading a model in the background; ``True`` if already resident."""
+
+        if self.is_resident(model_size, device):
+            return True
+        threading.Thread(
+            target=self.preload,
+            args=([(model_size, device)],),
+            name="model-prepare",
+            daemon=True,
+        ).start()
+        return False
+
+    @contextmanager
+    def reserve(self, model_size: str, device: str, copies: int = 1) -> Iterator[None]:
+        """Charge ``copies`` of a model loaded elsewhere to the budget while open.
+
+        Idle models are evicted to make room, as for a load of our own.
+        """
+
+        size = self.estimate(model_size) * max(0, int(copies))
+        with self._lock:
+            token = next(self._tokens)
+            self._reserved[token] = (model_size, device, size)
+            evicted = self._evict_locked()
+        self._unload_all(evicted)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._reserved.pop(token, None)
+
+    def _evict_locked(self) -> List[_Entry]:
+        """Pop idle models, oldest first, until loaded and loading ones fit.
+
+        The most recently used model is always kept, so a single model larger
+        than the budget stays resident instead of reloading on every use.
+        """
+
+        if self.budget_bytes is None:
+            return []
+        used = sum(entry.bytes for entry in self._entries.values())
+        used += sum(size for _, _, size in self._reserved.values())
+        evicted: List[_Entry] = []
+        for key, entry in list(self._entries.items())[:-1]:
+            if used <= self.budget_bytes:
+                break
+            if entry.refs or entry.model is None:
+                continue
+            del self._entries[key]
+            used -= entry.bytes
+            evicted.append(entry)
+        if used > self.budget_bytes:
+            logger.warning(
+                "Presupuesto de modelos superado (%d MB residentes); no hay modelos libres que descargar",
+                used // (1024 * 1024),
+            )
+        return evicted
+
+    def _unload_all(self, evicted: List[_Entry]) -> None:
+        for entry in evicted:
+            self.evictions += 1
+            logger.info("Modelo %s (%s) descargado por presupuesto de memoria", entry.model_size, entry.device)
+            if self.unload is not None:
+                try:
+                    self.unload(entry.model)
+                except Exception as exc:  # pragma: no cover - depende del backend
+                    logger.warning("Error al descargar %s: %s", entry.model_size, exc)
+            entry.model = None
+
+    def clear(self) -> None:
+        """Drop every idle model."""
+
+        with self._lock:
+            idle = [key for key, entry in self._entries.items() if not entry.refs and entry.model is not None]
+            evicted = [self._entries.pop(key) for key in idle]
+        self._unload_all(evicted)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            models = [
+                {
+                    "model_size": entry.model_size,
+                    "device": entry.device,
+                    "state": (
+                        "loading" if entry.model is None else "in_use" if entry.refs else "idle"
+                    ),
+                    "refs": entry.refs,
+                    "memory_mb": round(entry.bytes / (1024 * 1024), 1),
+                    "memory_measured": entry.measured,
+                    "uses": entry.uses,
+                    "loaded_at": entry.loaded_at,
+                    "last_used_at": entry.last_used_at,
+                }
+                for entry in reversed(self._entries.values())
+            ]
+            reserved = [
+                {
+                    "model_size": model_size,
+                    "device": device,
+                    "memory_mb": round(size / (1024 * 1024), 1),
+                }
+                for model_size, device, size in self._reserved.values()
+            ]
+        return {
+            "budget_mb": round(self.budget_bytes / (1024 * 1024), 1) if self.budget_bytes else None,
+            "resident_mb": round(sum(item["memory_mb"] for item in models), 1),
+            "reserved_mb": round(sum(item["memory_mb"] for item in reserved), 1),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "models": models,
+            "reserved": reserved,
+        }
@@ -1,25 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import json
 import logging
 import mimetypes
 import os
 import secrets
 import shutil
+import sqlite3
 import struct
 import time
 import wave
 from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from threading import Lock
+from threading import Condition, Event, Lock, Thread, Timer
 from typing import (
     Annotated,
     Any,
     AsyncIterator,
+    Awaitable,
+    Callable,
     Deque,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Set,
@@ -27,6 +36,8 @@ from typing import (
 )
 
 import anyio
+import httpx
+import numpy as np
 from fastapi import (
     APIRouter,
     BackgroundTasks,
@@ -41,12 +52,19 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
 from ..config import settings
 from ..database import get_session
+from ..live_reaper import ExpiryReaper
+from ..model_pool import ModelPool, default_budget_bytes
+from ..live_registry import LiveWorkerListener, create_live_registry
+from ..scheduler import InferenceScheduler, Priority, SharedSlots
+from ..worker import JobWorker, create_job_queue
 from ..models import Transcription, TranscriptionStatus
 from ..schemas import (
     BatchTranscriptionCreateResponse,
@@ -62,29 +80,44 @@ from ..schemas import (
     TranscriptionCreateResponse,
     TranscriptionDetail,
 )
-from ..utils.debug import append_debug_event
 from ..utils.storage import (
     compute_txt_path,
     ensure_normalized_audio,
     ensure_storage_subdir,
     sanitize_folder_name,
-    save_upload_file,
     write_atomic_text,
 )
+from ..utils.audio_cache import NormalizedAudioCache, hash_file, normalized_audio_key
+from ..utils.event_log import DebugEventLog
+from ..utils.ingest import (
+    ChunkedUploadStore,
+    IngestResult,
+    UploadOffsetError,
+    UploadTooLargeError,
+    ingest_stream,
+)
+from ..utils.long_audio import AudioPiece, transcribe_in_pieces
+from ..utils.media import MediaProbeError, probe_media
+from ..utils.result_cache import TranscriptionResultCache, result_cache_key
+from ..utils.stream_decoder import (
+    STREAMING_FORMATS,
+    StreamDecoderError,
+    StreamingDecoder,
+    is_streaming_decoder_available,
+)
 from ..whisper_service import (
     BaseTranscriber,
+    SegmentResult,
     TranscriptionResult,
     get_model_preparation_status,
     get_transcriber,
     is_cuda_runtime_available,
     is_cuda_dependency_error,
-    request_model_preparation,
     summarize_cuda_dependency_error,
     serialize_segments,
 )
 from pydub import AudioSegment
 from pydub.exceptions import CouldntDecodeError
-from pydub.silence import detect_nonsilent
 
 ALLOWED_MEDIA_EXTENSIONS = {
     ".aac",
@@ -133,7 +166,42 @@ DEVICE_ALIASES = {
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/transcriptions", tags=["transcriptions"])
+# Form fields and part boundaries sent along with the file of a single upload.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _single_upload(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark an endpoint whose body carries one file, for ``_UploadLimitRoute``."""
+
+    endpoint.single_upload = True  # type: ignore[attr-defined]
+    return endpoint
+
+
+class _UploadLimitRoute(APIRoute):
+    """Reject single-file uploads whose ``Content-Length`` is over the limit.
+
+    FastAPI spools the whole multipart body before the endpoint runs, so the
+    declared length is checked first. Streamed, size-checked ingestion is
+    what the chunked upload endpoints are for.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "single_upload", False):
+            return handler
+
+        async def limited_handler(request: Request) -> Response:
+            declared = request.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > _max_upload_bytes() + MULTIPART_OVERHEAD_BYTES:
+                raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(
+    prefix="/transcriptions", tags=["transcriptions"], route_class=_UploadLimitRoute
+)
 
 LIVE_SESSIONS_ROOT = Path(settings.storage_dir).parent / "live_sessions"
 LIVE_SESSIONS_ROOT.mkdir(parents=True, exist_ok=True)
@@ -153,34 +221,381 @@ LIVE_HEARTBEAT_INTERVAL_SECONDS = max(
     5.0, float(settings.live_heartbeat_interval_seconds)
 )
 LIVE_EVENT_QUEUE_SIZE = 64
+LIVE_EXPIRY_RETRY_SECONDS = 5.0
+
+# Slots are also taken as file locks so job worker processes and the API
+# share the device capacity instead of each assuming it owns it.
+INFERENCE_SCHEDULER = InferenceScheduler(
+    slots=settings.whisper_parallel_pipelines,
+    shared=SharedSlots(settings.inference_slots_dir) if settings.inference_slots_shared else None,
+)
+
+
+def _model_pool_budget() -> Optional[int]:
+    if settings.model_pool_budget_mb is None:
+        return default_budget_bytes()
+    return settings.model_pool_budget_mb * 1024 * 1024
+
+
+def _load_pooled_transcriber(model_size: str, device: str) -> BaseTranscriber:
+    """Load a model for ``MODEL_POOL``; the router takes models only from the pool."""
+
+    return get_transcriber(model_size, device)
+
+
+MODEL_POOL = ModelPool(_load_pooled_transcriber, budget_bytes=_model_pool_budget())
+
+JOB_QUEUE = create_job_queue()
+DEBUG_EVENT_LOG = DebugEventLog(
+    settings.debug_event_log_dir,
+    flush_interval=settings.debug_event_flush_ms / 1000.0,
+    batch_size=settings.debug_event_batch_size,
+)
+
+
+def record_debug_event(
+    transcription_id: int,
+    stage: str,
+    message: str,
+    extra: Optional[Dict[str, Any]] = None,
+    level: str = "info",
+) -> None:
+    DEBUG_EVENT_LOG.append(transcription_id, stage, message, extra=extra, level=level)
+
+
+_audio_caches: Dict[Path, NormalizedAudioCache] = {}
+
+
+def _normalized_audio(source: Path, content_hash: Optional[str] = None) -> Path:
+    """Normalized copy of ``source``, shared across jobs with the same content.
+
+    ``content_hash`` is the SHA-256 taken while the upload was ingested; when
+    given, the source is not read again just to find its cache entry.
+    """
+
+    if settings.audio_cache_max_bytes <= 0:
+        return ensure_normalized_audio(source)
+    root = Path(settings.audio_cache_dir)
+    cache = _audio_caches.get(root)
+    if cache is None:
+        cache = _audio_caches.setdefault(
+            root,
+            NormalizedAudioCache(
+                root, ensure_normalized_audio, max_bytes=settings.audio_cache_max_bytes
+            ),
+        )
+    return cache.get(Path(source), content_hash)
+
+
+def _audio_fingerprint(source: Path, content_hash: Optional[str] = None) -> str:
+    """Identity of the normalized audio, without normalizing ``source``."""
+
+    cache = _audio_caches.get(Path(settings.audio_cache_dir))
+    if cache is not None:
+        return cache.key_for(Path(source), content_hash)
+    return normalized_audio_key(content_hash or hash_file(Path(source)))
+
+
+_result_caches: Dict[Path, TranscriptionResultCache] = {}
+
+
+def _result_cache() -> Optional[TranscriptionResultCache]:
+    if settings.result_cache_max_bytes <= 0:
+        return None
+    path = Path(settings.result_cache_path)
+    cache = _result_caches.get(path)
+    if cache is None:
+        cache = _result_caches.setdefault(
+            path, TranscriptionResultCache(path, max_bytes=settings.result_cache_max_bytes)
+        )
+    return cache
+
+
+def _result_payload(result: TranscriptionResult) -> Dict[str, Any]:
+    return {
+        "text": result.text,
+        "language": result.language,
+        "duration": result.duration,
+        "runtime_seconds": result.runtime_seconds,
+        "segments": serialize_segments(result.segments),
+    }
+
+
+def _cached_transcription_result(
+    cache: TranscriptionResultCache, key: str
+) -> Optional[TranscriptionResult]:
+    started = time.perf_counter()
+    try:
+        payload = cache.get(key)
+    except sqlite3.Error as exc:
+        logger.warning("No se pudo leer la caché de resultados: %s", exc)
+        return None
+    if payload is None:
+        return None
+    segments = [
+        SegmentResult(
+            start=segment["start"],
+            end=segment["end"],
+            text=segment["text"],
+            speaker=segment.get("speaker"),
+        )
+        for segment in payload.get("segments") or []
+    ]
+    return TranscriptionResult(
+        text=payload["text"],
+        segments=segments,
+        language=payload.get("language"),
+        duration=payload.get("duration"),
+        runtime_seconds=time.perf_counter() - started,
+    )
+
+
+def _decode_options() -> Dict[str, Any]:
+    """Decode options of batch transcriptions; part of every result cache key."""
+
+    options = {
+        "batch_size": settings.whisper_batch_size,
+        "temperature": 0.0,
+        "word_timestamps": settings.whisper_word_timestamps,
+        "condition_on_previous_text": settings.whisper_condition_on_previous_text,
+        "vad_filter": settings.whisper_vad_mode,
+        "compression_ratio_threshold": settings.whisper_compression_ratio_threshold,
+        "log_prob_threshold": settings.whisper_log_prob_threshold,
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def _splits_long_audio(duration: Optional[float]) -> bool:
+    return (
+        settings.whisper_parallel_pipelines > 1
+        and settings.whisper_long_audio_seconds > 0
+        and (duration or 0.0) >= settings.whisper_long_audio_seconds
+    )
+
+
+def _transcription_result_key(
+    audio_path: Path,
+    content_hash: str,
+    model_size: str,
+    language: Optional[str],
+    beam_size: int,
+    decode_options: Dict[str, Any],
+    use_pieces: bool,
+) -> str:
+    return result_cache_key(
+        _audio_fingerprint(audio_path, content_hash),
+        model_size,
+        {
+            "language": language,
+            "beam_size": beam_size,
+            "decode_options": decode_options,
+            "compute_type": settings.whisper_compute_type,
+            "pieces": (
+                [
+                    settings.whisper_long_audio_piece_seconds,
+                    settings.whisper_long_audio_overlap_seconds,
+                ]
+                if use_pieces
+                else None
+            ),
+        },
+    )
+
+
+def _store_transcription_result(
+    transcription: Transcription,
+    result: TranscriptionResult,
+    language: Optional[str],
+    model_size: str,
+    beam_size: int,
+    device: str,
+) -> None:
+    """Mark ``transcription`` completed with ``result`` and write its text file."""
+
+    transcription.text = result.text
+    transcription.language = result.language or language
+    transcription.model_size = model_size
+    transcription.beam_size = beam_size
+    transcription.device_preference = device
+    transcription.duration = result.duration
+    transcription.runtime_seconds = result.runtime_seconds
+    transcription.speakers = serialize_segments(result.segments)
+    transcription.status = TranscriptionStatus.COMPLETED.value
+    transcription.error_message = None
+    stored_folder = transcription.output_folder or "transcripciones"
+    target_path = (
+        Path(transcription.transcript_path)
+        if transcription.transcript_path
+        else compute_txt_path(
+            transcription.id,
+            folder=stored_folder,
+            original_filename=transcription.original_filename,
+        )
+    )
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic_text(target_path, transcription.to_txt())
+    transcription.transcript_path = str(target_path)
+
+
+def _complete_from_result_cache(transcription: Transcription, stored: IngestResult) -> bool:
+    """Complete a new upload from the result cache, without queueing a job.
+
+    The hash taken while ingesting and the request parameters are enough to
+    find a result from an identical earlier upload; ``False`` on a miss.
+    """
+
+    cache = _result_cache()
+    if cache is None:
+        return False
+    try:
+        duration = probe_media(stored.path).duration
+    except (MediaProbeError, OSError):
+        duration = None
+    beam_size = transcription.beam_size or settings.whisper_final_beam
+    key = _transcription_result_key(
+        stored.path,
+        stored.sha256,
+        transcription.model_size,
+        transcription.language,
+        beam_size,
+        _decode_options(),
+        _splits_long_audio(duration),
+    )
+    result = _cached_transcription_result(cache, key)
+    if result is None:
+        return False
+    _store_transcription_result(
+        transcription,
+        result,
+        transcription.language,
+        transcription.model_size,
+        beam_size,
+        transcription.device_preference,
+    )
+    record_debug_event(
+        transcription.id,
+        "cache.hit",
+        "Resultado reutilizado de la caché al subir el archivo",
+        extra={"key": key, "segments": len(result.segments)},
+    )
+    return True
+
+
+def _with_logged_events(detail: TranscriptionDetail) -> TranscriptionDetail:
+    """Show the latest logged events; rows from before the log keep their column."""
+
+    events = DEBUG_EVENT_LOG.tail(detail.id, settings.debug_event_limit)
+    if not events:
+        return detail
+    return TranscriptionDetail.parse_obj({**detail.dict(), "debug_events": events})
+
+
+_inline_worker_stop = Event()
+_inline_worker_thread: Optional[Thread] = None
+
+
+def _inference_slot(
+    transcriber: BaseTranscriber, device: Optional[str], priority: Priority, owner: str
+):
+    return INFERENCE_SCHEDULER.slot(
+        getattr(transcriber, "device", None) or device, priority, owner
+    )
+
+
+class LiveChunkCursorResponse(LiveChunkResponse):
+    next_cursor: int = 0
 
 
 @dataclass(frozen=True)
 class LiveEvent:
-    seq: int
+    """A live event, encoded to its SSE wire form once when it is created."""
+
+    seq: Optional[int]
     event: str
     data_json: str
     created_at: float
+    sse: bytes = b""
+
+    @classmethod
+    def create(
+        cls, seq: Optional[int], event: str, data_json: str, created_at: float
+    ) -> "LiveEvent":
+        id_line = f"id: {seq}\n" if seq is not None else ""
+        sse = f"{id_line}event: {event}\ndata: {data_json}\n\n".encode("utf-8")
+        return cls(seq=seq, event=event, data_json=data_json, created_at=created_at, sse=sse)
 
     def as_message(self) -> Dict[str, str]:
         return {"event": self.event, "id": str(self.seq), "data": self.data_json}
 
 
 def _event_to_sse_bytes(event: LiveEvent) -> bytes:
-    message = event.as_message()
-    data = message.get("data", "")
-    payload = (
-        f"id: {message.get('id', '')}\n"
-        f"event: {message.get('event', '')}\n"
-        f"data: {data}\n\n"
-    )
-    return payload.encode("utf-8")
+    return event.sse
+
+
+class LiveEventHistory:
+    """Bounded, seq-ordered event history with O(log n) resume lookups."""
+
+    def __init__(self, maxlen: int) -> None:
+        self.maxlen = maxlen
+        self._events: List[LiveEvent] = []
+        self._seqs: List[int] = []
+        self._start = 0
+
+    def __len__(self) -> int:
+        return len(self._events) - self._start
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index: int) -> LiveEvent:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._events[self._start + index]
+
+    def __iter__(self):
+        return iter(self._events[self._start :])
+
+    def append(self, event: LiveEvent) -> None:
+        self._events.append(event)
+        self._seqs.append(event.seq)
+        if len(self) > self.maxlen:
+            self._start += 1
+            if self._start >= self.maxlen:
+                del self._events[: self._start]
+                del self._seqs[: self._start]
+                self._start = 0
+
+    def after(self, seq: Optional[int]) -> List[LiveEvent]:
+        if seq is None:
+            return self._events[self._start :]
+        index = bisect.bisect_right(self._seqs, seq, lo=self._start)
+        return self._events[index:]
+
+
+def _call_on_loop(loop: asyncio.AbstractEventLoop, callback: Callable[[], Any]) -> None:
+    """Run ``callback`` on ``loop``, hopping threads when called from outside it."""
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        callback()
+        return
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        # The loop is already closed; nobody is left waiting on it.
+        pass
 
 
 @dataclass(eq=False)
 class LiveSubscriber:
     id: str
     queue: "asyncio.Queue[Optional[LiveEvent]]"
+    loop: asyncio.AbstractEventLoop
     active: bool = True
 
     def __hash__(self) -> int:  # pragma: no cover - trivial hash wrapper
@@ -197,9 +612,14 @@ class LiveSubscriber:
             return False
 
     def close(self) -> None:
+        """Wake the reader with the end marker; safe from any thread."""
+
         if not self.active:
             return
         self.active = False
+        _call_on_loop(self.loop, self._put_end)
+
+    def _put_end(self) -> None:
         try:
             self.queue.put_nowait(None)
         except asyncio.QueueFull:  # pragma: no cover - defensive
@@ -207,77 +627,170 @@ class LiveSubscriber:
 
 
 class AudioRing:
-    """Keep a rolling buffer of the most recent audio for live transcription."""
+    """Keep a rolling buffer of the most recent audio for live transcription.
 
-    def __init__(self, max_duration: float) -> None:
-        self.max_duration = max(1.0, float(max_duration))
-        self._audio = (
-            AudioSegment.silent(duration=0, frame_rate=LIVE_AUDIO_SAMPLE_RATE)
-            .set_channels(LIVE_AUDIO_CHANNELS)
-            .set_sample_width(LIVE_AUDIO_SAMPLE_WIDTH)
-        )
-        self._total_duration = 0.0
+    Samples are stored in a preallocated int16 array. Every sample is written
+    twice (at ``i`` and ``i + capacity``) so any window of the ring is a
+    contiguous, zero-copy view and appends cost O(chunk).
+    """
 
-    def append(self, segment: AudioSegment) -> None:
-        if len(segment) <= 0:
+    def __init__(
+        self, max_duration: float, sample_rate: int = LIVE_AUDIO_SAMPLE_RATE
+    ) -> None:
+        self.max_duration = max(1.0, float(max_duration))
+        self.sample_rate = int(sample_rate)
+        self.capacity = int(round(self.max_duration * self.sample_rate))
+        self._buffer = np.zeros(self.capacity * 2, dtype=np.int16)
+        self._total_samples = 0
+
+    def append(self, segment: "AudioSegment | np.ndarray") -> None:
+        if isinstance(segment, AudioSegment):
+            samples = _segment_to_samples(segment)
+        else:
+            samples = np.asarray(segment, dtype=np.int16)
+        count = len(samples)
+        if count <= 0:
             return
-        self._total_duration += len(segment) / 1000.0
-        combined = self._audio + segment
-        max_ms = int(self.max_duration * 1000)
-        if len(combined) > max_ms:
-            combined = combined[-max_ms:]
-        self._audio = combined
+        self._total_samples += count
+        if count > self.capacity:
+            samples = samples[-self.capacity :]
+            count = self.capacity
+        pos = (self._total_samples - count) % self.capacity
+        first = min(count, self.capacity - pos)
+        rest = count - first
+        self._buffer[pos : pos + first] = samples[:first]
+        self._buffer[pos + self.capacity : pos + self.capacity + first] = samples[:first]
+        if rest:
+            self._buffer[:rest] = samples[first:]
+            self._buffer[self.capacity : self.capacity + rest] = samples[first:]
+
+    @property
+    def sample_count(self) -> int:
+        return min(self._total_samples, self.capacity)
+
+    @property
+    def start_sample(self) -> int:
+        return self._total_samples - self.sample_count
 
     @property
     def duration(self) -> float:
-        return len(self._audio) / 1000.0
+        return self.sample_count / self.sample_rate
 
     @property
     def start(self) -> float:
-        return max(0.0, self._total_duration - self.duration)
+        return self.start_sample / self.sample_rate
 
     @property
     def end(self) -> float:
-        return self.start + self.duration
+        return self._total_samples / self.sample_rate
+
+    def window(self, start_time: float) -> Tuple[np.ndarray, float, float]:
+        """Return a read-only int16 view from ``start_time`` to the newest sample."""
+
+        if self.sample_count <= 0:
+            raise ValueError("No hay audio en el búfer para exportar")
+        first_sample = max(
+            self.start_sample, int(round(max(0.0, start_time) * self.sample_rate))
+        )
+        length = self._total_samples - first_sample
+        if length <= 0:
+            raise ValueError("La ventana solicitada no contiene audio")
+        pos = first_sample % self.capacity
+        view = self._buffer[pos : pos + length]
+        view.flags.writeable = False
+        return view, first_sample / self.sample_rate, self.end
+
+    def release(self) -> None:
+        """Drop the buffered audio and free the preallocated array."""
+
+        self._buffer = np.zeros(0, dtype=np.int16)
+        self._total_samples = 0
 
     def export_window(
         self, start_time: float, destination: Path
     ) -> Tuple[Path, float, float]:
-        if len(self._audio) <= 0:
-            raise ValueError("No hay audio en el búfer para exportar")
-        actual_start = max(start_time, self.start)
-        offset_ms = int(max(0.0, (actual_start - self.start) * 1000))
-        window = self._audio[offset_ms:]
-        if len(window) <= 0:
-            raise ValueError("La ventana solicitada no contiene audio")
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        window.export(destination, format="wav")
-        return destination, actual_start, self.end
+        samples, actual_start, window_end = self.window(start_time)
+        _write_pcm_wav(samples, self.sample_rate, destination)
+        return destination, actual_start, window_end
 
 
-def _estimate_silence_ratio(segment: AudioSegment) -> float:
-    if len(segment) <= 0:
+def _segment_to_samples(segment: AudioSegment) -> np.ndarray:
+    segment = _normalize_audio_segment(segment)
+    return np.frombuffer(segment.raw_data, dtype="<i2")
+
+
+def _write_pcm_wav(samples: np.ndarray, sample_rate: int, destination: Path) -> Path:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(destination), "wb") as wav_file:
+        wav_file.setnchannels(LIVE_AUDIO_CHANNELS)
+        wav_file.setsampwidth(LIVE_AUDIO_SAMPLE_WIDTH)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype("<i2", copy=False).tobytes())
+    return destination
+
+
+def _supports_array_input(transcriber: BaseTranscriber) -> bool:
+    """Whether ``transcribe`` accepts a float32 array plus ``sample_rate``.
+
+    Batch jobs keep passing file paths; live sessions hand over the ring
+    window directly when the transcriber advertises it and fall back to a
+    temporary WAV otherwise.
+    """
+
+    return bool(getattr(transcriber, "supports_array_input", False))
+
+
+def _estimate_silence_ratio(
+    samples: np.ndarray,
+    sample_rate: int = LIVE_AUDIO_SAMPLE_RATE,
+    min_silence_ms: int = 200,
+) -> float:
+    """Fraction of the chunk covered by 200 ms windows 16 dB below its level.
+
+    Vectorized equivalent of pydub's ``detect_nonsilent`` scan (1 ms step):
+    per-millisecond energy sums are prefix-summed so every sliding window's
+    RMS comes from one subtraction, and the silent windows are merged with a
+    difference array instead of a Python loop.
+    """
+
+    total_ms = int(round(len(samples) * 1000 / sample_rate))
+    if total_ms <= 0:
         return 1.0
-    try:
-        base_threshold = segment.dBFS
-    except Exception:
-        base_threshold = -60.0
-    if not isinstance(base_threshold, (float, int)) or base_threshold == float("-inf"):
-        base_threshold = -60.0
-    threshold = base_threshold - 16
-    windows = detect_nonsilent(segment, min_silence_len=200, silence_thresh=threshold)
-    nonsilent_ms = sum(end - start for start, end in windows)
-    ratio = 1.0 - (nonsilent_ms / len(segment))
-    return min(1.0, max(0.0, ratio))
-
-
-def _should_enable_live_vad(segment: AudioSegment) -> bool:
+    if total_ms < min_silence_ms:
+        return 0.0
+    samples_per_ms = max(1, sample_rate // 1000)
+    squares = np.square(samples.astype(np.float64))
+    overall_rms = float(np.sqrt(squares.mean()))
+    base_threshold = 20 * np.log10(overall_rms / 32768.0) if overall_rms > 0 else -60.0
+    threshold = 10 ** ((base_threshold - 16) / 20) * 32768.0
+
+    usable = min(len(squares), total_ms * samples_per_ms)
+    per_ms = np.zeros(total_ms, dtype=np.float64)
+    per_ms[: usable // samples_per_ms] = (
+        squares[: usable - usable % samples_per_ms]
+        .reshape(-1, samples_per_ms)
+        .sum(axis=1)
+    )
+    prefix = np.concatenate(([0.0], np.cumsum(per_ms)))
+    window_energy = prefix[min_silence_ms:] - prefix[:-min_silence_ms]
+    window_rms = np.sqrt(window_energy / (min_silence_ms * samples_per_ms))
+    silent_starts = np.flatnonzero(window_rms <= threshold)
+    if silent_starts.size == 0:
+        return 0.0
+    coverage = np.zeros(total_ms + 1, dtype=np.int32)
+    coverage[silent_starts] += 1
+    coverage[silent_starts + min_silence_ms] -= 1
+    silent_ms = int(np.count_nonzero(np.cumsum(coverage[:-1]) > 0))
+    return min(1.0, max(0.0, silent_ms / total_ms))
+
+
+def _should_enable_live_vad(samples: np.ndarray, sample_rate: int) -> bool:
     mode = (settings.whisper_vad_mode or "auto").strip().lower()
     if mode in {"off", "false", "0"}:
         return False
     if mode in {"on", "true", "1"}:
         return True
-    return _estimate_silence_ratio(segment) >= LIVE_SILENCE_RATIO_THRESHOLD
+    return _estimate_silence_ratio(samples, sample_rate) >= LIVE_SILENCE_RATIO_THRESHOLD
 
 
 @dataclass
@@ -294,9 +807,13 @@ class LiveSessionState:
     chunk_count: int = 0
     dropped_chunks: int = 0
     last_text: str = ""
+    word_count: int = 0
     last_duration: Optional[float] = None
     last_runtime: Optional[float] = None
     segments: List[dict] = field(default_factory=list)
+    segment_texts: Deque[str] = field(
+        default_factory=lambda: deque(maxlen=LIVE_SNAPSHOT_MAX_SEGMENTS)
+    )
     ring: AudioRing = field(
         default_factory=lambda: AudioRing(LIVE_RING_DURATION_SECONDS)
     )
@@ -308,10 +825,25 @@ class LiveSessionState:
     )
     lock: Lock = field(default_factory=Lock)
     next_seq: int = 1
-    event_history: Deque[LiveEvent] = field(
-        default_factory=lambda: deque(maxlen=LIVE_EVENT_HISTORY_LIMIT)
+    event_history: LiveEventHistory = field(
+        default_factory=lambda: LiveEventHistory(LIVE_EVENT_HISTORY_LIMIT)
     )
+    heartbeat_task: Optional["asyncio.Task[None]"] = None
     subscribers: Set[LiveSubscriber] = field(default_factory=set)
+    decoder: Optional[StreamingDecoder] = None
+    decoder_failed: bool = False
+    last_decode_ms: Optional[float] = None
+    inference_cond: Condition = field(default_factory=Condition)
+    inference_running: bool = False
+    appended_gen: int = 0
+    completed_gen: int = 0
+    pending_since: Optional[float] = None
+    inferred_until: float = 0.0
+    last_new_segments: List[dict] = field(default_factory=list)
+    last_new_text: Optional[str] = None
+    coalesced_chunks: int = 0
+    lag_seconds: float = 0.0
+    closed: bool = False
 
     def snapshot(self) -> Dict[str, Any]:
         return {
@@ -330,15 +862,24 @@ class LiveSessionState:
             "status": _determine_live_status(self),
         }
 
+    def append_segment(self, segment: Dict[str, Any]) -> None:
+        """Record a segment, updating running text and counters in O(segment)."""
+
+        self.segments.append(segment)
+        text = (segment.get("text") or "").strip()
+        if not text:
+            return
+        self.segment_texts.append(text)
+        self.last_text = f"{self.last_text} {text}" if self.last_text else text
+        self.word_count += len(text.split())
+
     def earliest_seq(self) -> Optional[int]:
         if not self.event_history:
             return None
         return self.event_history[0].seq
 
     def iter_history(self, after_seq: Optional[int]) -> List[LiveEvent]:
-        if after_seq is None:
-            return list(self.event_history)
-        return [event for event in self.event_history if event.seq > after_seq]
+        return self.event_history.after(after_seq)
 
     def make_event(
         self, event_type: str, payload: Dict[str, Any], *, store: bool = True
@@ -347,9 +888,7 @@ class LiveSessionState:
         self.next_seq += 1
         base_payload = {"session_id": self.session_id, **payload, "seq": seq}
         data_json = json.dumps(base_payload, ensure_ascii=False)
-        event = LiveEvent(
-            seq=seq, event=event_type, data_json=data_json, created_at=time.time()
-        )
+        event = LiveEvent.create(seq, event_type, data_json, time.time())
         if store:
             self.event_history.append(event)
         return event
@@ -358,18 +897,40 @@ class LiveSessionState:
         self, event_type: str, payload: Dict[str, Any], *, store: bool = True
     ) -> LiveEvent:
         event = self.make_event(event_type, payload, store=store)
+        self.fan_out(event)
+        return event
+
+    def fan_out(self, event: LiveEvent) -> None:
         stale: List[LiveSubscriber] = []
         for subscriber in list(self.subscribers):
             if not subscriber.enqueue(event):
                 stale.append(subscriber)
         for subscriber in stale:
             self.subscribers.discard(subscriber)
-        return event
+
+    def ensure_heartbeat(self) -> None:
+        """Start the session's single heartbeat ticker if it is not running."""
+
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = asyncio.get_running_loop().create_task(
+                self._heartbeat_loop()
+            )
+
+    async def _heartbeat_loop(self) -> None:
+        # Heartbeats carry no id: they must not move clients' Last-Event-ID.
+        while self.subscribers:
+            await asyncio.sleep(LIVE_HEARTBEAT_INTERVAL_SECONDS)
+            if not self.subscribers:
+                break
+            now = time.time()
+            data_json = json.dumps({"session_id": self.session_id, "timestamp": now})
+            self.fan_out(LiveEvent.create(None, "heartbeat", data_json, now))
 
     def add_subscriber(self) -> LiveSubscriber:
         subscriber = LiveSubscriber(
             id=secrets.token_hex(8),
             queue=asyncio.Queue(maxsize=LIVE_EVENT_QUEUE_SIZE),
+            loop=asyncio.get_running_loop(),
         )
         self.subscribers.add(subscriber)
         return subscriber
@@ -379,28 +940,129 @@ class LiveSessionState:
         self.subscribers.discard(subscriber)
 
     def close_all_subscribers(self) -> None:
+        """Close every stream; called from the reaper and threadpool too."""
+
         for subscriber in list(self.subscribers):
             subscriber.close()
         self.subscribers.clear()
+        task, self.heartbeat_task = self.heartbeat_task, None
+        if task is not None:
+            _call_on_loop(task.get_loop(), task.cancel)
 
 
 LIVE_SESSIONS: Dict[str, LiveSessionState] = {}
 LIVE_SESSION_TTL_SECONDS = 3600
+LIVE_REGISTRY = create_live_registry(
+    settings.live_session_store, settings.live_session_store_path
+)
+_live_worker_url = settings.live_worker_url or f"local-{os.getpid()}"
+_live_worker_listener: Optional[LiveWorkerListener] = None
+
+
+def _start_live_worker_listener() -> None:
+    """Give this worker an address other workers can forward live requests to.
+
+    Only needed with a shared registry; ``live_worker_url`` skips the private
+    listener when each worker already has its own reachable port.
+    """
+
+    global _live_worker_url, _live_worker_listener
+    if settings.live_session_store == "memory" or settings.live_worker_url:
+        return
+    if _live_worker_listener is not None:
+        return
+    from fastapi import FastAPI
+
+    internal_app = FastAPI()
+    internal_app.include_router(router, prefix=settings.api_prefix)
+    listener = LiveWorkerListener(internal_app)
+    try:
+        _live_worker_url = listener.start()
+    except Exception as exc:  # pragma: no cover - depende del runtime
+        logger.warning("Sesiones en vivo sin enrutado entre workers: %s", exc)
+        return
+    _live_worker_listener = listener
+
+
+def _stop_live_worker_listener() -> None:
+    global _live_worker_listener
+    LIVE_REGISTRY.release_owner(_live_worker_url)
+    if _live_worker_listener is not None:
+        _live_worker_listener.stop()
+        _live_worker_listener = None
+
+
+router.add_event_handler("startup", _start_live_worker_listener)
+router.add_event_handler("shutdown", _stop_live_worker_listener)
+
+
+def _live_session_owner(session_id: str) -> Optional[str]:
+    """Base URL of the worker holding ``session_id`` when it is not this one."""
+
+    if session_id in LIVE_SESSIONS:
+        return None
+    owner = LIVE_REGISTRY.owner_of(session_id)
+    if not owner or owner == _live_worker_url:
+        return None
+    if not owner.startswith(("http://", "https://")):
+        return None
+    return owner
+
+
+def _live_owner_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=httpx.Timeout(None, connect=5.0))
+
+
+async def _route_to_live_owner(
+    owner: str,
+    method: str,
+    session_id: str,
+    suffix: str = "",
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    files: Optional[Dict[str, Any]] = None,
+    json_body: Optional[Dict[str, Any]] = None,
+) -> Response:
+    url = f"{owner.rstrip('/')}{settings.api_prefix}{router.prefix}/live/sessions/{session_id}{suffix}"
+    params = {key: value for key, value in (params or {}).items() if value is not None}
+    if settings.live_session_routing == "redirect":
+        target = httpx.URL(url, params=params)
+        return RedirectResponse(str(target), status_code=307)
+    client = _live_owner_client()
+    try:
+        upstream = await client.send(
+            client.build_request(
+                method, url, params=params, headers=headers, files=files, json=json_body
+            ),
+            stream=True,
+        )
+    except httpx.HTTPError as exc:
+        await client.aclose()
+        raise HTTPException(
+            status_code=503,
+            detail=f"El worker propietario de la sesión en vivo no responde: {exc}",
+        ) from exc
+
+    async def _close_upstream() -> None:
+        await upstream.aclose()
+        await client.aclose()
+
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        status_code=upstream.status_code,
+        media_type=upstream.headers.get("content-type"),
+        background=BackgroundTask(_close_upstream),
+    )
 
 
 def _collect_segments_texts(
     state: LiveSessionState, limit: Optional[int] = None
 ) -> List[str]:
-    raw_texts = [
-        (segment.get("text") or "").strip()
-        for segment in state.segments
-        if isinstance(segment, dict)
-    ]
-    trimmed = [text for text in raw_texts if text]
-    max_items = limit or LIVE_SNAPSHOT_MAX_SEGMENTS
-    if max_items:
-        return trimmed[-max_items:]
-    return trimmed
+    texts = list(state.segment_texts)
+    if limit:
+        return texts[-limit:]
+    return texts
 
 
 def _determine_live_status(state: LiveSessionState) -> str:
@@ -410,16 +1072,21 @@ def _determine_live_status(state: LiveSessionState) -> str:
 
 
 def _compute_live_metrics(state: LiveSessionState) -> Dict[str, Any]:
-    text = state.last_text or ""
-    words = len(text.split()) if text else 0
+    words = state.word_count
     duration = state.last_duration or 0.0
     wpm = 0
     if duration > 0 and words > 0:
         wpm = int(round((words / duration) * 60.0))
     latency_ms = int(max(0.0, (state.last_runtime or 0.0) * 1000.0))
+    decode_ms = (
+        int(round(state.last_decode_ms)) if state.last_decode_ms is not None else None
+    )
     return {
         "wpm": wpm,
         "latency_ms": latency_ms,
+        "decode_ms": decode_ms,
+        "lag_ms": int(round(state.lag_seconds * 1000.0)),
+        "coalesced_chunks": state.coalesced_chunks,
         "dropped_chunks": state.dropped_chunks,
         "chunk_count": state.chunk_count,
         "runtime_seconds": state.last_runtime,
@@ -427,15 +1094,48 @@ def _compute_live_metrics(state: LiveSessionState) -> Dict[str, Any]:
     }
 
 
-def purge_expired_live_sessions() -> None:
-    now = time.time()
-    expired_ids = []
-    for session_id, state in list(LIVE_SESSIONS.items()):
-        last_seen = state.last_activity or state.created_at
-        if now - last_seen > LIVE_SESSION_TTL_SECONDS:
-            expired_ids.append(session_id)
-    for session_id in expired_ids:
+def _live_session_deadline(session_id: str) -> Optional[float]:
+    state = LIVE_SESSIONS.get(session_id)
+    if state is None:
+        return None
+    return (state.last_activity or state.created_at) + LIVE_SESSION_TTL_SECONDS
+
+
+def _expire_live_session(session_id: str) -> None:
+    """Drop an idle session unless a request is using it right now.
+
+    Busy sessions are retried shortly instead of blocking the reaper thread;
+    the deadline is checked again under the lock because a chunk may have
+    landed since the reaper looked.
+    """
+
+    state = LIVE_SESSIONS.get(session_id)
+    if state is None:
+        return
+    with state.inference_cond:
+        busy = state.inference_running
+    if busy or not state.lock.acquire(blocking=False):
+        LIVE_REAPER.track(session_id, time.time() + LIVE_EXPIRY_RETRY_SECONDS)
+        return
+    try:
+        deadline = _live_session_deadline(session_id)
+        if deadline is not None and deadline > time.time():
+            LIVE_REAPER.track(session_id, deadline)
+            return
+        logger.info("Sesión en vivo %s expirada por inactividad", session_id)
         _cleanup_live_session(session_id)
+    finally:
+        state.lock.release()
+
+
+LIVE_REAPER = ExpiryReaper(_live_session_deadline, _expire_live_session)
+router.add_event_handler("shutdown", LIVE_REAPER.stop)
+
+
+def purge_expired_live_sessions() -> None:
+    """Expire idle sessions now instead of waiting for the reaper thread."""
+
+    LIVE_REAPER.run_pending()
 
 
 def _get_session() -> Session:
@@ -448,13 +1148,8 @@ def healthcheck() -> HealthResponse:
     return HealthResponse(status="ok", app_name=settings.app_name)
 
 
-def _validate_upload_size(upload: UploadFile) -> None:
-    upload.file.seek(0, 2)
-    size = upload.file.tell()
-    upload.file.seek(0)
-    max_bytes = settings.max_upload_size_mb * 1024 * 1024
-    if size > max_bytes:
-        raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+def _max_upload_bytes() -> int:
+    return settings.max_upload_size_mb * 1024 * 1024
 
 
 def _resolve_model_choice(value: Optional[str]) -> str:
@@ -511,7 +1206,6 @@ def _model_status_to_schema(
 
 
 def _require_live_session(session_id: str) -> LiveSessionState:
-    purge_expired_live_sessions()
     state = LIVE_SESSIONS.get(session_id)
     if state is None:
         raise HTTPException(status_code=404, detail="Sesión en vivo no encontrada")
@@ -532,10 +1226,18 @@ def prepare_model(
 ) -> ModelPreparationStatus:
     resolved_model = _resolve_model_choice(payload.model_size)
     resolved_device = _resolve_device_choice(payload.device_preference)
-    info = request_model_preparation(resolved_model, resolved_device)
-    if info.status == "ready":
+    MODEL_POOL.prepare(resolved_model, resolved_device)
+    prepared = _model_preparation(resolved_model, resolved_device)
+    if prepared.status == "ready":
         response.status_code = status.HTTP_200_OK
-    return _model_status_to_schema(resolved_model, resolved_device, info)
+    return prepared
+
+
+@router.get("/scheduler/status")
+def get_scheduler_status() -> Dict[str, Any]:
+    """Slots, queue depth and wait times of the shared inference scheduler."""
+
+    return {"devices": INFERENCE_SCHEDULER.status()}
 
 
 @router.get("/models/status", response_model=ModelPreparationStatus)
@@ -545,8 +1247,54 @@ def get_model_status(
 ) -> ModelPreparationStatus:
     resolved_model = _resolve_model_choice(model_size)
     resolved_device = _resolve_device_choice(device_preference)
-    info = get_model_preparation_status(resolved_model, resolved_device)
-    return _model_status_to_schema(resolved_model, resolved_device, info)
+    return _model_preparation(resolved_model, resolved_device)
+
+
+def _model_preparation(model_size: str, device: str) -> ModelPreparationStatus:
+    """Download progress from the service, ready only once the pool holds it."""
+
+    info = get_model_preparation_status(model_size, device)
+    prepared = _model_status_to_schema(model_size, device, info)
+    if MODEL_POOL.is_resident(model_size, device):
+        prepared.status = "ready"
+        prepared.progress = 100
+        prepared.error = None
+    return prepared
+
+
+@router.get("/models/status/resident")
+def get_resident_models() -> Dict[str, Any]:
+    """Models held by the pool: state, references and memory charged to each.
+
+    ``/models/status`` answers for one model; this lists every resident one.
+    """
+
+    return MODEL_POOL.status()
+
+
+def _preload_models() -> None:
+    """Warm the models listed in ``preload_models`` without delaying startup.
+
+    Entries are ``"<model>"`` or ``"<model>:<device>"``; the device defaults
+    to ``whisper_device``.
+    """
+
+    pairs = []
+    for entry in settings.preload_models.split(","):
+        model_size, _, device = entry.strip().partition(":")
+        if not model_size:
+            continue
+        pairs.append(
+            (_resolve_model_choice(model_size), _resolve_device_choice(device or None))
+        )
+    if not pairs:
+        return
+    Thread(
+        target=MODEL_POOL.preload, args=(pairs,), name="model-preload", daemon=True
+    ).start()
+
+
+router.add_event_handler("startup", _preload_models)
 
 
 def _format_srt_timestamp(seconds: float) -> str:
@@ -654,10 +1402,13 @@ def _merge_live_chunk(
         # No hay audio nuevo; mantenemos el acumulado existente.
         return segment
 
-    frames = segment.raw_data
+    _append_live_audio(state, segment.raw_data)
+    return segment
+
 
+def _append_live_audio(state: LiveSessionState, frames: bytes) -> None:
     if len(frames) <= 0:
-        return segment
+        return
 
     state.audio_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -670,7 +1421,7 @@ def _merge_live_chunk(
                 wav_file.writeframes(frames)
         except Exception as exc:  # pragma: no cover - depende del runtime
             raise RuntimeError(f"No se pudo guardar el audio acumulado: {exc}") from exc
-        return segment
+        return
 
     try:
         with open(state.audio_path, "r+b") as wav_file:
@@ -690,161 +1441,235 @@ def _merge_live_chunk(
             wav_file.write(struct.pack("<I", new_data_size))
     except Exception as exc:  # pragma: no cover - depende del runtime
         raise RuntimeError(f"No se pudo guardar el audio acumulado: {exc}") from exc
-    return segment
+
+
+def _get_live_decoder(
+    state: LiveSessionState, suffix: str
+) -> Optional[StreamingDecoder]:
+    if not settings.live_stream_decoder or state.decoder_failed:
+        return None
+    container_format = STREAMING_FORMATS.get(suffix.lower())
+    if container_format is None:
+        return None
+    if state.decoder is None:
+        if not is_streaming_decoder_available():
+            return None
+        state.decoder = StreamingDecoder(container_format, LIVE_AUDIO_SAMPLE_RATE)
+    return state.decoder
+
+
+def _decode_live_chunk(
+    state: LiveSessionState, chunk_bytes: bytes, suffix: str, index: int
+) -> Optional[AudioSegment]:
+    """Decode a chunk, through the session's persistent decoder when possible.
+
+    webm/ogg chunks from MediaRecorder continue one container stream and go to
+    a long-lived ffmpeg process; anything else (or a decoder that keeps
+    failing) falls back to decoding the chunk file on its own.
+    """
+
+    decoder = _get_live_decoder(state, suffix)
+    if decoder is not None:
+        try:
+            samples = decoder.decode(chunk_bytes)
+        except StreamDecoderError as exc:
+            logger.warning(
+                "Decodificador persistente desactivado para la sesión en vivo %s: %s",
+                state.session_id,
+                exc,
+            )
+            decoder.close()
+            state.decoder = None
+            state.decoder_failed = True
+        else:
+            _append_live_audio(state, samples.tobytes())
+            return AudioSegment(
+                data=samples.tobytes(),
+                sample_width=LIVE_AUDIO_SAMPLE_WIDTH,
+                frame_rate=LIVE_AUDIO_SAMPLE_RATE,
+                channels=LIVE_AUDIO_CHANNELS,
+            )
+
+    chunk_path = state.directory / f"chunk-{index:05d}{suffix}"
+    chunk_path.parent.mkdir(parents=True, exist_ok=True)
+    chunk_path.write_bytes(chunk_bytes)
+    try:
+        return _merge_live_chunk(state, chunk_path)
+    finally:
+        chunk_path.unlink(missing_ok=True)
 
 
 def _process_live_chunk_sync(
-    state: LiveSessionState, chunk_bytes: bytes, suffix: str
-) -> Tuple[LiveChunkResponse, Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any]]:
+    state: LiveSessionState,
+    chunk_bytes: bytes,
+    suffix: str,
+    cursor: Optional[int] = None,
+) -> Tuple[
+    LiveChunkResponse,
+    Optional[Dict[str, Any]],
+    Optional[Dict[str, Any]],
+    Optional[Dict[str, Any]],
+]:
+    """Ingest a chunk and transcribe, coalescing with chunks queued meanwhile.
+
+    Requests whose audio was covered by another request's pass return that
+    result with no event payloads, so SSE clients do not see it twice.
+    """
+
     with state.lock:
+        _ensure_live_session_open(state)
         index = state.chunk_count
-        chunk_path = state.directory / f"chunk-{index:05d}{suffix}"
-        chunk_path.parent.mkdir(parents=True, exist_ok=True)
-        chunk_path.write_bytes(chunk_bytes)
+        decode_started = time.perf_counter()
         try:
-            try:
-                segment = _merge_live_chunk(state, chunk_path)
-            except RuntimeError as exc:
-                raise HTTPException(status_code=400, detail=str(exc)) from exc
-        finally:
-            chunk_path.unlink(missing_ok=True)
+            segment = _decode_live_chunk(state, chunk_bytes, suffix, index)
+        except RuntimeError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        state.last_decode_ms = (time.perf_counter() - decode_started) * 1000.0
 
         if segment is None or len(segment) <= 0:
             state.chunk_count = index + 1
             state.dropped_chunks += 1
             state.last_activity = time.time()
-            response = LiveChunkResponse(
-                session_id=state.session_id,
-                text=state.last_text or "",
-                duration=state.last_duration,
-                runtime_seconds=state.last_runtime,
-                chunk_count=state.chunk_count,
-                model_size=state.model_size,
-                device_preference=state.device,
-                language=state.language,
-                beam_size=state.beam_size,
-                segments=list(state.segments),
-                new_segments=[],
-                new_text=None,
-                dropped_chunks=state.dropped_chunks,
+            return _live_chunk_outputs(state, [], None, cursor)
+
+        state.ring.append(_segment_to_samples(segment))
+        state.chunk_count = index + 1
+        state.appended_gen += 1
+        generation = state.appended_gen
+        if state.pending_since is None:
+            state.pending_since = time.time()
+
+    # Chunks that arrive while an inference is running wait here; the next
+    # pass covers all of them and every waiter answers with that result.
+    with state.inference_cond:
+        while state.completed_gen < generation and state.inference_running:
+            state.inference_cond.wait()
+        covered = state.completed_gen >= generation
+        if not covered:
+            state.inference_running = True
+    if covered:
+        with state.lock:
+            _ensure_live_session_open(state)
+            response = _live_chunk_response(
+                state, state.last_new_segments, state.last_new_text, cursor
             )
-            metrics_payload = _compute_live_metrics(state)
-            delta_payload = {
-                "text": state.last_text or "",
-                "new_text": None,
-                "segments": _collect_segments_texts(state),
-                "chunk_count": state.chunk_count,
-                "language": state.language,
-                "model_size": state.model_size,
-                "device_preference": state.device,
-                "beam_size": state.beam_size,
-                "status": _determine_live_status(state),
-                **metrics_payload,
-            }
-            return response, delta_payload, None, metrics_payload
+        return response, None, None, None
+
+    try:
+        return _run_live_inference(state, cursor)
+    finally:
+        with state.inference_cond:
+            state.inference_running = False
+            state.inference_cond.notify_all()
 
-        state.ring.append(segment)
-        window_file = state.directory / "window.wav"
+
+def _run_live_inference(
+    state: LiveSessionState, cursor: Optional[int]
+) -> Tuple[LiveChunkResponse, Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any]]:
+    with state.lock:
+        _ensure_live_session_open(state)
+        target_gen = state.appended_gen
+        state.coalesced_chunks = target_gen - state.completed_gen
+        oldest_pending = state.pending_since or time.time()
+        state.pending_since = None
         try:
-            try:
-                window_start = max(0.0, state.last_t_end - LIVE_WINDOW_OVERLAP_SECONDS)
-                window_path, window_offset, window_end = state.ring.export_window(
-                    window_start, window_file
-                )
-            except ValueError:
-                state.chunk_count = index + 1
-                state.dropped_chunks += 1
-                state.last_activity = time.time()
-                window_file.unlink(missing_ok=True)
-                response = LiveChunkResponse(
-                    session_id=state.session_id,
-                    text=state.last_text or "",
-                    duration=state.last_duration,
-                    runtime_seconds=state.last_runtime,
-                    chunk_count=state.chunk_count,
-                    model_size=state.model_size,
-                    device_preference=state.device,
-                    language=state.language,
-                    beam_size=state.beam_size,
-                    segments=list(state.segments),
-                    new_segments=[],
-                    new_text=None,
-                    dropped_chunks=state.dropped_chunks,
-                )
-                metrics_payload = _compute_live_metrics(state)
-                delta_payload = {
-                    "text": state.last_text or "",
-                    "new_text": None,
-                    "segments": _collect_segments_texts(state),
-                    "chunk_count": state.chunk_count,
-                    "language": state.language,
-                    "model_size": state.model_size,
-                    "device_preference": state.device,
-                    "beam_size": state.beam_size,
-                    "status": _determine_live_status(state),
-                    **metrics_payload,
-                }
-                return response, delta_payload, None, metrics_payload
-
-            transcriber = get_transcriber(state.model_size, state.device)
-            decode_options_raw = {
-                "batch_size": settings.whisper_batch_size,
-                "temperature": 0.0,
-                "condition_on_previous_text": False,
-                "word_timestamps": False,
-                "vad_filter": _should_enable_live_vad(segment),
-                "compression_ratio_threshold": settings.whisper_compression_ratio_threshold,
-                "log_prob_threshold": settings.whisper_log_prob_threshold,
-            }
-            decode_options = {
-                k: v for k, v in decode_options_raw.items() if v is not None
-            }
+            window_start = max(0.0, state.last_t_end - LIVE_WINDOW_OVERLAP_SECONDS)
+            window_view, window_offset, window_end = state.ring.window(window_start)
+        except ValueError:
+            state.dropped_chunks += 1
+            state.last_activity = time.time()
+            _complete_live_generation(state, target_gen, oldest_pending, [], None)
+            return _live_chunk_outputs(state, [], None, cursor)
+        try:
+            pending_view, _, _ = state.ring.window(state.inferred_until)
+        except ValueError:
+            pending_view = window_view
+        # Copy while holding the lock: appends may wrap over the ring
+        # while the model runs.
+        window_samples = window_view.copy()
+        vad_filter = _should_enable_live_vad(pending_view, state.ring.sample_rate)
+
+    window_file = state.directory / "window.wav"
+    models = ExitStack()
+    try:
+        transcriber = models.enter_context(MODEL_POOL.use(state.model_size, state.device))
+        decode_options_raw = {
+            "batch_size": settings.whisper_batch_size,
+            "temperature": 0.0,
+            "condition_on_previous_text": False,
+            "word_timestamps": False,
+            "vad_filter": vad_filter,
+            "compression_ratio_threshold": settings.whisper_compression_ratio_threshold,
+            "log_prob_threshold": settings.whisper_log_prob_threshold,
+        }
+        decode_options = {
+            k: v for k, v in decode_options_raw.items() if v is not None
+        }
 
-            def _normalize_device(value: Optional[str]) -> str:
-                normalized = (value or "").lower()
-                return "gpu" if normalized in {"cuda", "gpu"} else "cpu"
+        def _normalize_device(value: Optional[str]) -> str:
+            normalized = (value or "").lower()
+            return "gpu" if normalized in {"cuda", "gpu"} else "cpu"
 
-            def _transcribe_live(current_transcriber: BaseTranscriber):
+        def _transcribe_live(current_transcriber: BaseTranscriber):
+            if _supports_array_input(current_transcriber):
+                audio_input = window_samples.astype(np.float32) / 32768.0
+                extra = {"sample_rate": state.ring.sample_rate}
+            else:
+                audio_input = _write_pcm_wav(
+                    window_samples, state.ring.sample_rate, window_file
+                )
+                extra = {}
+            with _inference_slot(
+                current_transcriber,
+                state.device,
+                Priority.LIVE,
+                f"live:{state.session_id}",
+            ):
                 return current_transcriber.transcribe(
-                    window_path,
+                    audio_input,
                     state.language,
                     beam_size=state.beam_size or settings.whisper_live_beam,
                     decode_options=decode_options,
+                    **extra,
                 )
 
-            try:
-                result = _transcribe_live(transcriber)
-            except Exception as exc:
-                should_retry_cpu = (
-                    not settings.whisper_force_cuda
-                    and _normalize_device(state.device) == "gpu"
-                    and is_cuda_dependency_error(exc)
+        try:
+            result = _transcribe_live(transcriber)
+        except Exception as exc:
+            should_retry_cpu = (
+                not settings.whisper_force_cuda
+                and _normalize_device(state.device) == "gpu"
+                and is_cuda_dependency_error(exc)
+            )
+            if should_retry_cpu:
+                logger.warning(
+                    "CUDA no disponible en sesión en vivo; reintentando en CPU: %s",
+                    exc,
                 )
-                if should_retry_cpu:
-                    logger.warning(
-                        "CUDA no disponible en sesión en vivo; reintentando en CPU: %s",
-                        exc,
-                    )
-                    state.device = "cpu"
-                    transcriber = get_transcriber(state.model_size, state.device)
-                    try:
-                        result = _transcribe_live(transcriber)
-                    except Exception as retry_exc:
-                        raise HTTPException(
-                            status_code=500,
-                            detail=f"Error al transcribir el fragmento en CPU: {retry_exc}",
-                        ) from retry_exc
-                else:
-                    if isinstance(exc, RuntimeError):
-                        raise HTTPException(status_code=500, detail=str(exc)) from exc
+                state.device = "cpu"
+                transcriber = models.enter_context(
+                    MODEL_POOL.use(state.model_size, state.device)
+                )
+                try:
+                    result = _transcribe_live(transcriber)
+                except Exception as retry_exc:
                     raise HTTPException(
                         status_code=500,
-                        detail=f"Error al transcribir el fragmento: {exc}",
-                    ) from exc
-        finally:
-            window_file.unlink(missing_ok=True)
+                        detail=f"Error al transcribir el fragmento en CPU: {retry_exc}",
+                    ) from retry_exc
+            else:
+                if isinstance(exc, RuntimeError):
+                    raise HTTPException(status_code=500, detail=str(exc)) from exc
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error al transcribir el fragmento: {exc}",
+                ) from exc
+    finally:
+        models.close()
+        window_file.unlink(missing_ok=True)
 
-        state.chunk_count = index + 1
+    with state.lock:
+        _ensure_live_session_open(state)
         appended_parts: List[str] = []
         new_segments: List[dict] = []
         epsilon = 1e-3
@@ -884,67 +1709,132 @@ def _process_live_chunk_sync(
                 "speaker": seg.speaker,
                 "text": text,
             }
-            state.segments.append(normalized)
+            state.append_segment(normalized)
             state.recent_texts.append((text, absolute_start))
             new_segments.append(normalized)
             appended_parts.append(text)
 
         appended_text = " ".join(appended_parts).strip() or None
-        if appended_text:
-            state.last_text = " ".join(
-                segment.get("text", "").strip() for segment in state.segments
-            ).strip()
         state.last_duration = max(
             state.last_duration or 0.0, window_end, state.last_t_end
         )
         state.last_runtime = result.runtime_seconds
         state.language = result.language or state.language
         state.last_activity = time.time()
-
-        response = LiveChunkResponse(
-            session_id=state.session_id,
-            text=state.last_text or "",
-            duration=state.last_duration,
-            runtime_seconds=state.last_runtime,
-            chunk_count=state.chunk_count,
-            model_size=state.model_size,
-            device_preference=state.device,
-            language=state.language,
-            beam_size=state.beam_size,
-            segments=list(state.segments),
-            new_segments=new_segments,
-            new_text=appended_text,
-            dropped_chunks=state.dropped_chunks,
+        state.inferred_until = window_end
+        _complete_live_generation(
+            state, target_gen, oldest_pending, new_segments, appended_text
         )
 
-        metrics_payload = _compute_live_metrics(state)
-        delta_payload = {
-            "text": state.last_text or "",
-            "new_text": appended_text,
-            "segments": _collect_segments_texts(state),
+        return _live_chunk_outputs(state, new_segments, appended_text, cursor)
+
+
+def _complete_live_generation(
+    state: LiveSessionState,
+    generation: int,
+    oldest_pending: float,
+    new_segments: List[dict],
+    new_text: Optional[str],
+) -> None:
+    """Publish a finished pass; ``lag`` is how long its oldest chunk waited."""
+
+    state.lag_seconds = max(0.0, time.time() - oldest_pending)
+    state.last_new_segments = new_segments
+    state.last_new_text = new_text
+    with state.inference_cond:
+        state.completed_gen = max(state.completed_gen, generation)
+
+
+def _live_chunk_response(
+    state: LiveSessionState,
+    new_segments: List[dict],
+    appended_text: Optional[str],
+    cursor: Optional[int],
+) -> LiveChunkCursorResponse:
+    """Build the chunk response; with ``cursor`` only segments from that index.
+
+    In cursor mode ``text`` carries the text of the returned segments, so
+    clients append it to what they already have. ``next_cursor`` is the value
+    to send with the following chunk.
+    """
+
+    if cursor is None:
+        segments = list(state.segments)
+        text = state.last_text or ""
+    else:
+        segments = state.segments[cursor:]
+        text = " ".join(segment.get("text", "") for segment in segments).strip()
+    return LiveChunkCursorResponse(
+        session_id=state.session_id,
+        text=text,
+        duration=state.last_duration,
+        runtime_seconds=state.last_runtime,
+        chunk_count=state.chunk_count,
+        model_size=state.model_size,
+        device_preference=state.device,
+        language=state.language,
+        beam_size=state.beam_size,
+        segments=segments,
+        new_segments=new_segments,
+        new_text=appended_text,
+        dropped_chunks=state.dropped_chunks,
+        next_cursor=len(state.segments),
+    )
+
+
+def _live_chunk_outputs(
+    state: LiveSessionState,
+    new_segments: List[dict],
+    appended_text: Optional[str],
+    cursor: Optional[int],
+) -> Tuple[LiveChunkResponse, Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any]]:
+    response = _live_chunk_response(state, new_segments, appended_text, cursor)
+    metrics_payload = _compute_live_metrics(state)
+    delta_payload = {
+        "text": state.last_text or "",
+        "new_text": appended_text,
+        "segments": _collect_segments_texts(state),
+        "chunk_count": state.chunk_count,
+        "language": state.language,
+        "model_size": state.model_size,
+        "device_preference": state.device,
+        "beam_size": state.beam_size,
+        "status": _determine_live_status(state),
+        **metrics_payload,
+    }
+    segment_payload = None
+    if new_segments:
+        segment_payload = {
+            "segments": new_segments,
             "chunk_count": state.chunk_count,
-            "language": state.language,
-            "model_size": state.model_size,
-            "device_preference": state.device,
-            "beam_size": state.beam_size,
-            "status": _determine_live_status(state),
-            **metrics_payload,
         }
-        segment_payload = None
-        if new_segments:
-            segment_payload = {
-                "segments": new_segments,
-                "chunk_count": state.chunk_count,
-            }
-
-        return response, delta_payload, segment_payload, metrics_payload
+    return response, delta_payload, segment_payload, metrics_payload
 
 
 def _cleanup_live_session(session_id: str) -> None:
+    """Tear a session down; callers hold ``state.lock`` of a local session.
+
+    Chunk and finalize handlers check ``closed`` once they hold the lock, so
+    nothing writes to the ring or the decoder after this returns.
+    """
+
     state = LIVE_SESSIONS.pop(session_id, None)
+    LIVE_REGISTRY.release(session_id)
     if state:
+        state.closed = True
         state.close_all_subscribers()
-        shutil.rmtree(state.directory, ignore_errors=True)
+        if state.decoder is not None:
+            state.decoder.close()
+            state.decoder = None
+        state.ring.release()
+        LIVE_REAPER.remove_later(state.directory)
+
+
+def _ensure_live_session_open(state: LiveSessionState) -> None:
+    """Reject a request that got ``state.lock`` after the session was torn down."""
+
+    if state.closed:
+        raise HTTPException(status_code=404, detail="Sesión en vivo no encontrada")
 
 
 def _enqueue_transcription(
@@ -957,82 +1847,276 @@ def _enqueue_transcription(
     model_size: Optional[str] = None,
     device_preference: Optional[str] = None,
     beam_size: Optional[int] = None,
+    bypass_result_cache: bool = False,
 ) -> Transcription:
     if not _is_supported_media(upload):
         raise HTTPException(
             status_code=400,
             detail="Solo se permiten archivos de audio o video",
         )
-    _validate_upload_size(upload)
+
+    def _store(destination: Path) -> IngestResult:
+        try:
+            upload.file.seek(0)
+            return ingest_stream(upload.file, destination, _max_upload_bytes())
+        finally:
+            upload.file.close()
+
+    return _create_transcription_job(
+        session,
+        background_tasks,
+        upload.filename,
+        _store,
+        language,
+        subject,
+        destination_folder,
+        model_size,
+        device_preference,
+        beam_size,
+        bypass_result_cache,
+    )
+
+
+def _new_transcription(
+    filename: str,
+    language: Optional[str],
+    subject: Optional[str],
+    destination_folder: str,
+    model_size: Optional[str],
+    device_preference: Optional[str],
+    beam_size: Optional[int],
+) -> Transcription:
     if not destination_folder or not destination_folder.strip():
         raise HTTPException(
             status_code=400, detail="Debes indicar una carpeta de destino"
         )
-    sanitized_folder = sanitize_folder_name(destination_folder)
-    resolved_model = _resolve_model_choice(model_size)
-    resolved_device = _resolve_device_choice(device_preference)
-    transcription = Transcription(
-        original_filename=upload.filename,
+    return Transcription(
+        original_filename=filename,
         stored_path="",
         language=language,
-        model_size=resolved_model,
+        model_size=_resolve_model_choice(model_size),
         beam_size=beam_size,
-        device_preference=resolved_device,
+        device_preference=_resolve_device_choice(device_preference),
         subject=subject,
-        output_folder=sanitized_folder,
+        output_folder=sanitize_folder_name(destination_folder),
         status=TranscriptionStatus.PROCESSING.value,
         text="",
         speakers=[],
     )
-    session.add(transcription)
-    session.flush()
 
-    storage_dir = ensure_storage_subdir(str(transcription.id))
-    dest_path = storage_dir / upload.filename
-    save_upload_file(upload, dest_path)
-    upload.file.close()
 
-    transcription.stored_path = str(dest_path)
+def _attach_stored_audio(transcription: Transcription, stored: IngestResult) -> None:
+    transcription.stored_path = str(stored.path)
     planned_txt_path = compute_txt_path(
         transcription.id,
-        folder=sanitized_folder,
-        original_filename=upload.filename,
+        folder=transcription.output_folder,
+        original_filename=transcription.original_filename,
         ensure_unique=True,
     )
     transcription.transcript_path = str(planned_txt_path)
-    session.commit()
 
-    append_debug_event(
+
+def _job_payload(
+    transcription: Transcription, stored: IngestResult, bypass_result_cache: bool = False
+) -> Dict[str, Any]:
+    record_debug_event(
         transcription.id,
         "enqueued",
         "Archivo encolado para transcripción",
         extra={
             "filename": transcription.original_filename,
-            "language": language,
-            "subject": subject,
-            "model": resolved_model,
-            "beam_size": beam_size,
-            "device": resolved_device,
-            "output_folder": sanitized_folder,
+            "language": transcription.language,
+            "subject": transcription.subject,
+            "model": transcription.model_size,
+            "beam_size": transcription.beam_size,
+            "device": transcription.device_preference,
+            "output_folder": transcription.output_folder,
+            "size": stored.size,
+            "sha256": stored.sha256,
         },
     )
+    return {
+        "language": transcription.language,
+        "model_size": transcription.model_size,
+        "device_preference": transcription.device_preference,
+        "beam_size": transcription.beam_size,
+        "content_hash": stored.sha256,
+        "bypass_result_cache": bypass_result_cache,
+    }
+
+
+def _create_transcription_job(
+    session: Session,
+    background_tasks: BackgroundTasks,
+    filename: str,
+    store: Callable[[Path], IngestResult],
+    language: Optional[str],
+    subject: Optional[str],
+    destination_folder: str,
+    model_size: Optional[str] = None,
+    device_preference: Optional[str] = None,
+    beam_size: Optional[int] = None,
+    bypass_result_cache: bool = False,
+) -> Transcription:
+    """Register a transcription, let ``store`` put its audio in place, enqueue it."""
+
+    transcription = _new_transcription(
+        filename,
+        language,
+        subject,
+        destination_folder,
+        model_size,
+        device_preference,
+        beam_size,
+    )
+    session.add(transcription)
+    session.flush()
+
+    storage_dir = ensure_storage_subdir(str(transcription.id))
+    try:
+        stored = store(storage_dir / filename)
+    except UploadTooLargeError as exc:
+        session.rollback()
+        shutil.rmtree(storage_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail="Archivo demasiado grande") from exc
+    except UploadOffsetError as exc:
+        # A chunked upload changed size after the caller checked it.
+        session.rollback()
+        shutil.rmtree(storage_dir, ignore_errors=True)
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "La subida está incompleta", "offset": exc.expected},
+        ) from exc
+
+    _attach_stored_audio(transcription, stored)
+    if not bypass_result_cache and _complete_from_result_cache(transcription, stored):
+        session.commit()
+        return transcription
+    session.commit()
+
+    job_id = JOB_QUEUE.enqueue(
+        transcription.id, _job_payload(transcription, stored, bypass_result_cache)
+    )
+    if settings.transcription_queue == "inline":
+        background_tasks.add_task(_run_inline_job, job_id)
+    return transcription
+
+
+def _estimated_seconds(stored: IngestResult) -> float:
+    """Audio length from the container headers, or a guess from the file size."""
+
+    try:
+        duration = probe_media(stored.path).duration
+    except MediaProbeError:
+        duration = None
+    if duration:
+        return float(duration)
+    # 16 kHz mono 16-bit PCM; compressed formats are underestimated, which only
+    # matters for ordering.
+    return stored.size / 32_000.0
+
+
+def _create_transcription_group(
+    session: Session,
+    background_tasks: BackgroundTasks,
+    uploads: List[UploadFile],
+    language: Optional[str],
+    subject: Optional[str],
+    destination_folder: str,
+    model_size: Optional[str] = None,
+    device_preference: Optional[str] = None,
+    beam_size: Optional[int] = None,
+    bypass_result_cache: bool = False,
+) -> Tuple[str, List[Transcription]]:
+    """Ingest ``uploads`` concurrently and enqueue them as one job group.
+
+    The rows are inserted and committed in a single transaction once every
+    file is on disk; if any file is rejected nothing from the batch is kept.
+    Jobs are enqueued after that commit so workers never lease a job whose
+    row they cannot see; if enqueueing fails the rows are marked failed.
+    """
+
+    for upload in uploads:
+        if not _is_supported_media(upload):
+            raise HTTPException(
+                status_code=400,
+                detail="Solo se permiten archivos de audio o video",
+            )
+
+    transcriptions = [
+        _new_transcription(
+            upload.filename,
+            language,
+            subject,
+            destination_folder,
+            model_size,
+            device_preference,
+            beam_size,
+        )
+        for upload in uploads
+    ]
+    session.add_all(transcriptions)
+    session.flush()
 
-    background_tasks.add_task(
-        process_transcription,
-        transcription.id,
-        language,
-        resolved_model,
-        resolved_device,
-        beam_size,
-    )
-    return transcription
+    storage_dirs = [ensure_storage_subdir(str(item.id)) for item in transcriptions]
+    max_bytes = _max_upload_bytes()
+
+    def _ingest(index: int) -> Tuple[IngestResult, float]:
+        upload = uploads[index]
+        try:
+            upload.file.seek(0)
+            stored = ingest_stream(upload.file, storage_dirs[index] / upload.filename, max_bytes)
+        finally:
+            upload.file.close()
+        return stored, _estimated_seconds(stored)
+
+    workers = max(1, min(settings.batch_ingest_workers, len(uploads)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-ingest") as pool:
+        futures = [pool.submit(_ingest, index) for index in range(len(uploads))]
+        wait(futures)
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    if errors:
+        session.rollback()
+        for directory in storage_dirs:
+            shutil.rmtree(directory, ignore_errors=True)
+        if any(isinstance(error, UploadTooLargeError) for error in errors):
+            raise HTTPException(status_code=413, detail="Archivo demasiado grande") from errors[0]
+        raise errors[0]
+
+    results = [future.result() for future in futures]
+    for transcription, (stored, _estimate) in zip(transcriptions, results):
+        _attach_stored_audio(transcription, stored)
+    session.commit()
+
+    group_id = secrets.token_hex(8)
+    try:
+        JOB_QUEUE.enqueue_group(
+            group_id,
+            [
+                (
+                    transcription.id,
+                    _job_payload(transcription, stored, bypass_result_cache),
+                    estimate,
+                )
+                for transcription, (stored, estimate) in zip(transcriptions, results)
+            ],
+        )
+    except sqlite3.Error as exc:
+        logger.error("No se pudo encolar el lote %s: %s", group_id, exc)
+        for transcription in transcriptions:
+            mark_transcription_failed(transcription.id, f"No se pudo encolar el lote: {exc}")
+        raise HTTPException(
+            status_code=503, detail="No se pudo encolar el lote; inténtalo de nuevo"
+        ) from exc
+    if settings.transcription_queue == "inline":
+        background_tasks.add_task(_run_inline_group, group_id)
+    return group_id, transcriptions
 
 
 @router.post(
     "/live/sessions", response_model=LiveSessionCreateResponse, status_code=201
 )
 def create_live_session(payload: LiveSessionCreateRequest) -> LiveSessionCreateResponse:
-    purge_expired_live_sessions()
     session_id = secrets.token_urlsafe(12)
     resolved_model = _resolve_model_choice(payload.model_size)
     resolved_device = _resolve_device_choice(payload.device_preference)
@@ -1048,6 +2132,8 @@ def create_live_session(payload: LiveSessionCreateRequest) -> LiveSessionCreateR
         audio_path=directory / "stream.wav",
     )
     LIVE_SESSIONS[session_id] = state
+    LIVE_REGISTRY.claim(session_id, _live_worker_url)
+    LIVE_REAPER.track(session_id, state.created_at + LIVE_SESSION_TTL_SECONDS)
     state.make_event("init", state.snapshot(), store=True)
     return LiveSessionCreateResponse(
         session_id=session_id,
@@ -1065,9 +2151,19 @@ async def stream_live_session_events(
     last_event_query: Optional[int] = Query(default=None, alias="last_event_id"),
     last_event_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
 ) -> StreamingResponse:
-    purge_expired_live_sessions()
+    owner = _live_session_owner(session_id)
+    if owner is not None:
+        return await _route_to_live_owner(
+            owner,
+            "GET",
+            session_id,
+            "/events",
+            params={"last_event_id": last_event_query},
+            headers={"Last-Event-ID": last_event_header} if last_event_header else None,
+        )
     state = _require_live_session(session_id)
     subscriber = state.add_subscriber()
+    state.ensure_heartbeat()
 
     last_event_id = last_event_query
     if last_event_id is None and last_event_header:
@@ -1106,15 +2202,7 @@ async def stream_live_session_events(
                     # The connection scope is gone; treat as disconnect.
                     break
                 try:
-                    event = await asyncio.wait_for(
-                        subscriber.queue.get(), timeout=LIVE_HEARTBEAT_INTERVAL_SECONDS
-                    )
-                except asyncio.TimeoutError:
-                    heartbeat_event = state.make_event(
-                        "heartbeat", {"timestamp": time.time()}, store=False
-                    )
-                    yield _event_to_sse_bytes(heartbeat_event)
-                    continue
+                    event = await subscriber.queue.get()
                 except asyncio.CancelledError:
                     break
                 if event is None:
@@ -1126,16 +2214,35 @@ async def stream_live_session_events(
     return StreamingResponse(event_publisher(), media_type="text/event-stream")
 
 
-@router.post("/live/sessions/{session_id}/chunk", response_model=LiveChunkResponse)
+@router.post(
+    "/live/sessions/{session_id}/chunk", response_model=LiveChunkCursorResponse
+)
 async def push_live_chunk(
-    session_id: str, chunk: UploadFile = File(...)
+    session_id: str,
+    chunk: UploadFile = File(...),
+    cursor: Annotated[Optional[int], Query(ge=0)] = None,
 ) -> LiveChunkResponse:
-    purge_expired_live_sessions()
-    state = _require_live_session(session_id)
+    owner = _live_session_owner(session_id)
+    state = _require_live_session(session_id) if owner is None else None
     data = await chunk.read()
     await chunk.close()
     if not data:
         raise HTTPException(status_code=400, detail="El fragmento está vacío")
+    if owner is not None:
+        return await _route_to_live_owner(
+            owner,
+            "POST",
+            session_id,
+            "/chunk",
+            params={"cursor": cursor},
+            files={
+                "chunk": (
+                    chunk.filename or "chunk.webm",
+                    data,
+                    chunk.content_type or "application/octet-stream",
+                )
+            },
+        )
     suffix = Path(chunk.filename or "").suffix or ".webm"
     (
         response,
@@ -1147,14 +2254,33 @@ async def push_live_chunk(
         state,
         data,
         suffix,
+        cursor,
     )
-    state.broadcast_event("delta", delta_payload)
+    if delta_payload is not None:
+        state.broadcast_event("delta", delta_payload)
     if segment_payload and segment_payload.get("segments"):
         state.broadcast_event("segment", segment_payload)
-    state.broadcast_event("metrics", metrics_payload)
+    if metrics_payload is not None:
+        state.broadcast_event("metrics", metrics_payload)
     return response
 
 
+@router.get(
+    "/live/sessions/{session_id}/snapshot", response_model=LiveChunkCursorResponse
+)
+def get_live_session_snapshot(session_id: str) -> LiveChunkResponse:
+    # Sync on purpose: state.lock is held through inference and finalize, so
+    # waiting for it must happen in the threadpool, not on the event loop.
+    owner = _live_session_owner(session_id)
+    if owner is not None:
+        return anyio.from_thread.run(
+            partial(_route_to_live_owner, owner, "GET", session_id, "/snapshot")
+        )
+    state = _require_live_session(session_id)
+    with state.lock:
+        return _live_chunk_response(state, [], None, None)
+
+
 @router.post(
     "/live/sessions/{session_id}/finalize", response_model=LiveFinalizeResponse
 )
@@ -1163,8 +2289,21 @@ def finalize_live_session(
     payload: LiveFinalizeRequest,
     session: Session = Depends(_get_session),
 ) -> LiveFinalizeResponse:
+    owner = _live_session_owner(session_id)
+    if owner is not None:
+        return anyio.from_thread.run(
+            partial(
+                _route_to_live_owner,
+                owner,
+                "POST",
+                session_id,
+                "/finalize",
+                json_body=payload.dict(exclude_none=True),
+            )
+        )
     state = _require_live_session(session_id)
-    with state.lock:
+    with state.lock, ExitStack() as models:
+        _ensure_live_session_open(state)
         if not state.audio_path.exists():
             raise HTTPException(
                 status_code=400, detail="No se capturó audio en la sesión en vivo"
@@ -1177,10 +2316,10 @@ def finalize_live_session(
         resolved_language = payload.language or state.language
         if payload.beam_size is not None:
             state.beam_size = payload.beam_size
-        transcriber = get_transcriber(resolved_model, resolved_device)
+        transcriber = models.enter_context(MODEL_POOL.use(resolved_model, resolved_device))
         beam_value = payload.beam_size or state.beam_size or settings.whisper_final_beam
         state.beam_size = beam_value
-        normalized_audio = ensure_normalized_audio(state.audio_path)
+        normalized_audio = _normalized_audio(state.audio_path)
         decode_options_raw = {
             "batch_size": settings.whisper_batch_size,
             "temperature": 0.0,
@@ -1216,12 +2355,18 @@ def finalize_live_session(
             return default_label
 
         def _transcribe_final(current_transcriber: BaseTranscriber):
-            return current_transcriber.transcribe(
-                normalized_audio,
-                resolved_language,
-                beam_size=beam_value,
-                decode_options=decode_options,
-            )
+            with _inference_slot(
+                current_transcriber,
+                resolved_device,
+                Priority.FINALIZE,
+                f"live:{session_id}",
+            ):
+                return current_transcriber.transcribe(
+                    normalized_audio,
+                    resolved_language,
+                    beam_size=beam_value,
+                    decode_options=decode_options,
+                )
 
         transcriber_in_use: BaseTranscriber = transcriber
         used_cpu_fallback = False
@@ -1244,7 +2389,7 @@ def finalize_live_session(
                 session_id,
                 fallback_reason,
             )
-            transcriber_in_use = get_transcriber(resolved_model, "cpu")
+            transcriber_in_use = models.enter_context(MODEL_POOL.use(resolved_model, "cpu"))
             result = _transcribe_final(transcriber_in_use)
 
         effective_device = _determine_effective_device(
@@ -1291,7 +2436,7 @@ def finalize_live_session(
         }
         if fallback_reason:
             finalize_extra["fallback_reason"] = fallback_reason
-        append_debug_event(
+        record_debug_event(
             transcription.id,
             "live-finalized",
             "Sesión en vivo finalizada y almacenada",
@@ -1310,26 +2455,36 @@ def finalize_live_session(
             language=result.language or resolved_language,
             beam_size=beam_value,
         )
-    _cleanup_live_session(session_id)
+        _cleanup_live_session(session_id)
     return response
 
 
 @router.delete("/live/sessions/{session_id}", status_code=204)
 def discard_live_session(session_id: str) -> Response:
+    owner = _live_session_owner(session_id)
+    if owner is not None:
+        return anyio.from_thread.run(
+            partial(_route_to_live_owner, owner, "DELETE", session_id)
+        )
     state = LIVE_SESSIONS.get(session_id)
-    if state is not None:
+    if state is None:
+        _cleanup_live_session(session_id)
+    else:
         with state.lock:
-            pass
-    _cleanup_live_session(session_id)
+            _cleanup_live_session(session_id)
     return Response(status_code=204)
 
 
 def _is_supported_media(upload: UploadFile) -> bool:
-    content_type = (upload.content_type or "").lower()
+    return _is_supported_media_name(upload.filename, upload.content_type)
+
+
+def _is_supported_media_name(filename: Optional[str], content_type: Optional[str]) -> bool:
+    content_type = (content_type or "").lower()
     if any(content_type.startswith(prefix) for prefix in ALLOWED_MEDIA_PREFIXES):
         return True
 
-    filename = (upload.filename or "").lower()
+    filename = (filename or "").lower()
     suffix = Path(filename).suffix
     if suffix in ALLOWED_MEDIA_EXTENSIONS:
         return True
@@ -1338,6 +2493,7 @@ def _is_supported_media(upload: UploadFile) -> bool:
 
 
 @router.post("", response_model=TranscriptionCreateResponse, status_code=201)
+@_single_upload
 def create_transcription(
     background_tasks: BackgroundTasks,
     upload: UploadFile = File(...),
@@ -1349,6 +2505,7 @@ def create_transcription(
     model_size: Optional[str] = Form(default=None),
     device_preference: Optional[str] = Form(default=None),
     beam_size: Annotated[Optional[int], Form()] = None,
+    bypass_result_cache: Annotated[bool, Form()] = False,
     session: Session = Depends(_get_session),
 ) -> TranscriptionCreateResponse:
     transcription = _enqueue_transcription(
@@ -1361,6 +2518,7 @@ def create_transcription(
         model_size,
         device_preference,
         beam_size,
+        bypass_result_cache,
     )
 
     return TranscriptionCreateResponse(
@@ -1373,6 +2531,7 @@ def create_transcription(
 @router.post("/batch", response_model=BatchTranscriptionCreateResponse, status_code=201)
 def create_batch_transcriptions(
     background_tasks: BackgroundTasks,
+    response: Response,
     uploads: List[UploadFile] = File(...),
     language: Optional[str] = Form(default=None),
     subject: Optional[str] = Form(default=None),
@@ -1380,35 +2539,375 @@ def create_batch_transcriptions(
     model_size: Optional[str] = Form(default=None),
     device_preference: Optional[str] = Form(default=None),
     beam_size: Annotated[Optional[int], Form()] = None,
+    bypass_result_cache: Annotated[bool, Form()] = False,
     session: Session = Depends(_get_session),
 ) -> BatchTranscriptionCreateResponse:
+    """Queue several files as one job group.
+
+    The group's progress is served at the URL in the ``Location`` header.
+    """
+
     if not uploads:
         raise HTTPException(
             status_code=400, detail="Debes adjuntar al menos un archivo"
         )
 
-    responses: List[TranscriptionCreateResponse] = []
-    for upload in uploads:
-        transcription = _enqueue_transcription(
-            session,
-            background_tasks,
-            upload,
-            language,
-            subject,
-            destination_folder,
-            model_size,
-            device_preference,
-            beam_size,
-        )
-        responses.append(
+    group_id, transcriptions = _create_transcription_group(
+        session,
+        background_tasks,
+        uploads,
+        language,
+        subject,
+        destination_folder,
+        model_size,
+        device_preference,
+        beam_size,
+        bypass_result_cache,
+    )
+    response.headers["Location"] = f"{settings.api_prefix}{router.prefix}/batch/{group_id}"
+    response.headers["X-Batch-Group"] = group_id
+
+    return BatchTranscriptionCreateResponse(
+        items=[
             TranscriptionCreateResponse(
                 id=transcription.id,
                 status=TranscriptionStatus(transcription.status),
                 original_filename=transcription.original_filename,
             )
+            for transcription in transcriptions
+        ]
+    )
+
+
+@router.get("/batch/{group_id}")
+def get_batch_progress(group_id: str) -> Dict[str, Any]:
+    """Per-status job counts and the finished share of the group's audio."""
+
+    progress = JOB_QUEUE.group_progress(group_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Lote no encontrado")
+    return progress
+
+
+_chunked_upload_stores: Dict[Path, ChunkedUploadStore] = {}
+
+
+def _chunked_uploads() -> ChunkedUploadStore:
+    root = Path(settings.storage_dir) / "_partial"
+    store = _chunked_upload_stores.get(root)
+    if store is None:
+        store = _chunked_upload_stores.setdefault(
+            root,
+            ChunkedUploadStore(
+                root,
+                max_bytes=_max_upload_bytes(),
+                ttl_seconds=settings.chunked_upload_ttl_seconds,
+            ),
+        )
+    return store
+
+
+def _upload_status(upload_id: str) -> Dict[str, Any]:
+    store = _chunked_uploads()
+    try:
+        return {**store.meta(upload_id), "offset": store.offset(upload_id)}
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Subida no encontrada") from exc
+
+
+@router.post("/uploads", status_code=201)
+def create_chunked_upload(
+    filename: str = Form(...),
+    content_type: Optional[str] = Form(default=None),
+    size: Annotated[Optional[int], Form()] = None,
+) -> Dict[str, Any]:
+    """Start a resumable upload; send the bytes with ``/uploads/{id}/append``."""
+
+    if not _is_supported_media_name(filename, content_type):
+        raise HTTPException(
+            status_code=400,
+            detail="Solo se permiten archivos de audio o video",
+        )
+    try:
+        meta = _chunked_uploads().create(filename, content_type, size)
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail="Archivo demasiado grande") from exc
+    return {**meta, "offset": 0}
+
+
+@router.get("/uploads/{upload_id}")
+def get_chunked_upload(upload_id: str) -> Dict[str, Any]:
+    return _upload_status(upload_id)
+
+
+@router.post("/uploads/{upload_id}/append")
+async def append_chunked_upload(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+) -> Dict[str, Any]:
+    """Stream the request body to the upload's partial file at ``offset``.
+
+    A mismatched offset answers 409 with the offset the server has, so a
+    client that lost a response knows where to resume.
+    """
+
+    try:
+        written = await _chunked_uploads().append(upload_id, offset, request.stream())
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Subida no encontrada") from exc
+    except UploadOffsetError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Offset incorrecto", "offset": exc.expected},
+        ) from exc
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail="Archivo demasiado grande") from exc
+    return {"upload_id": upload_id, "offset": written}
+
+
+@router.post(
+    "/uploads/{upload_id}/commit",
+    response_model=TranscriptionCreateResponse,
+    status_code=201,
+)
+def commit_chunked_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    language: Optional[str] = Form(default=None),
+    subject: Optional[str] = Form(default=None),
+    destination_folder: str = Form(...),
+    model_size: Optional[str] = Form(default=None),
+    device_preference: Optional[str] = Form(default=None),
+    beam_size: Annotated[Optional[int], Form()] = None,
+    bypass_result_cache: Annotated[bool, Form()] = False,
+    session: Session = Depends(_get_session),
+) -> TranscriptionCreateResponse:
+    """Turn a finished chunked upload into a transcription job.
+
+    The partial file is renamed into the transcription's storage directory,
+    so the audio is not copied again.
+    """
+
+    store = _chunked_uploads()
+    meta = _upload_status(upload_id)
+    expected_size = meta.get("expected_size")
+    if expected_size is not None and meta["offset"] != expected_size:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "La subida está incompleta", "offset": meta["offset"]},
         )
 
-    return BatchTranscriptionCreateResponse(items=responses)
+    transcription = _create_transcription_job(
+        session,
+        background_tasks,
+        str(meta["filename"]),
+        partial(store.commit, upload_id),
+        language,
+        subject,
+        destination_folder,
+        model_size,
+        device_preference,
+        beam_size,
+        bypass_result_cache,
+    )
+    return TranscriptionCreateResponse(
+        id=transcription.id,
+        status=TranscriptionStatus(transcription.status),
+        original_filename=transcription.original_filename,
+    )
+
+
+@router.delete("/uploads/{upload_id}", status_code=204, response_class=Response)
+def delete_chunked_upload(upload_id: str) -> Response:
+    _upload_status(upload_id)
+    _chunked_uploads().abort(upload_id)
+    return Response(status_code=204)
+
+
+def _inline_worker() -> JobWorker:
+    """A job runner of this process with a lease owner id of its own.
+
+    The polling thread and each background task lease and heartbeat jobs
+    independently, so they must not share an id.
+    """
+
+    return JobWorker(JOB_QUEUE, worker_id=f"api-{os.getpid()}-{secrets.token_hex(4)}")
+
+
+def _run_inline_job(job_id: int) -> None:
+    _inline_worker().run_once(job_id=job_id)
+
+
+def _run_inline_group(group_id: str) -> None:
+    _inline_worker().run_group(group_id)
+
+
+def _recover_unqueued_transcriptions() -> None:
+    """Give rows left ``processing`` without a job one at startup.
+
+    Transcriptions used to run straight from ``BackgroundTasks``; rows in
+    flight when such a process stopped have no job, so ``expire_leases``
+    never recovers them. Those whose upload is still on disk are enqueued
+    again and the rest are marked failed.
+    """
+
+    with get_session() as session:
+        rows = [
+            (row.id, row.stored_path, row.language, row.model_size, row.device_preference, row.beam_size)
+            for row in session.query(Transcription).filter(
+                Transcription.status == TranscriptionStatus.PROCESSING.value
+            )
+        ]
+    if not rows:
+        return
+    try:
+        known = JOB_QUEUE.transcriptions_with_jobs([row[0] for row in rows])
+        for transcription_id, stored_path, language, model_size, device, beam_size in rows:
+            if transcription_id in known:
+                continue
+            if not stored_path or not Path(stored_path).exists():
+                mark_transcription_failed(
+                    transcription_id, "El archivo original ya no está disponible"
+                )
+                continue
+            JOB_QUEUE.enqueue(
+                transcription_id,
+                {
+                    "language": language,
+                    "model_size": model_size,
+                    "device_preference": device,
+                    "beam_size": beam_size,
+                },
+            )
+            record_debug_event(
+                transcription_id,
+                "enqueued",
+                "Transcripción sin trabajo encolada de nuevo al arrancar",
+            )
+            logger.warning("Transcripción %s sin trabajo; se encola de nuevo", transcription_id)
+    except sqlite3.Error as exc:
+        logger.error("No se pudieron recuperar las transcripciones sin trabajo: %s", exc)
+
+
+def _start_inline_job_worker() -> None:
+    """Run queued jobs, retries and jobs of dead workers in this process.
+
+    With ``transcription_queue = "worker"`` this is the job of ``app.worker``
+    processes and the API only enqueues.
+    """
+
+    global _inline_worker_thread
+    if settings.transcription_queue != "inline" or _inline_worker_thread is not None:
+        return
+    _inline_worker_stop.clear()
+    worker = _inline_worker()
+    _inline_worker_thread = Thread(
+        target=worker.run,
+        kwargs={"stop": _inline_worker_stop},
+        name="inline-transcription-worker",
+        daemon=True,
+    )
+    _inline_worker_thread.start()
+
+
+def _stop_inline_job_worker() -> None:
+    global _inline_worker_thread
+    _inline_worker_stop.set()
+    if _inline_worker_thread is not None:
+        _inline_worker_thread.join(timeout=5.0)
+        _inline_worker_thread = None
+
+
+router.add_event_handler("startup", _recover_unqueued_transcriptions)
+router.add_event_handler("startup", _start_inline_job_worker)
+router.add_event_handler("shutdown", _stop_inline_job_worker)
+
+
+class PartialTextWriter:
+    """Persist the growing partial text of a batch job at a bounded rate.
+
+    Segments only replace the buffered text; it is written when
+    ``interval_seconds`` have passed or ``max_segments`` arrived since the
+    last write, and a trailing timer writes whatever is left when segments
+    stop. ``close`` flushes and must run before the final result is stored.
+    """
+
+    def __init__(
+        self,
+        transcription_id: int,
+        interval_seconds: float = 1.0,
+        max_segments: int = 20,
+    ) -> None:
+        self.transcription_id = transcription_id
+        self.interval_seconds = max(0.0, float(interval_seconds))
+        self.max_segments = max(1, int(max_segments))
+        self.writes = 0
+        self._lock = Lock()
+        self._pending: Optional[str] = None
+        self._written: Optional[str] = None
+        self._segments_since_write = 0
+        self._last_write = time.monotonic()
+        self._timer: Optional[Timer] = None
+        self._closed = False
+
+    def update(self, text: str) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._pending = text
+            self._segments_since_write += 1
+            due = (
+                self._segments_since_write >= self.max_segments
+                or time.monotonic() - self._last_write >= self.interval_seconds
+            )
+            if not due and self._timer is None:
+                remaining = self.interval_seconds - (time.monotonic() - self._last_write)
+                self._timer = Timer(max(0.0, remaining), self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text = self._pending
+            self._segments_since_write = 0
+            self._last_write = time.monotonic()
+            if text is None or text == self._written:
+                return
+            with get_session() as update_session:
+                row = update_session.get(Transcription, self.transcription_id)
+                if row is not None and (row.text or "").strip() != text:
+                    row.text = text
+                    update_session.commit()
+                    self.writes += 1
+            self._written = text
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._closed = True
+
+
+def mark_transcription_failed(transcription_id: int, error_message: str) -> None:
+    with get_session() as session:
+        transcription = session.get(Transcription, transcription_id)
+        if transcription is None:
+            return
+        transcription.status = TranscriptionStatus.FAILED.value
+        transcription.error_message = error_message
+
+    record_debug_event(
+        transcription_id,
+        "processing-error",
+        "Error durante la transcripción",
+        extra={"error": error_message},
+        level="error",
+    )
 
 
 def process_transcription(
@@ -1417,10 +2916,28 @@ def process_transcription(
     model_size: Optional[str],
     device_preference: Optional[str],
     beam_size: Optional[int],
+    raise_errors: bool = False,
+    content_hash: Optional[str] = None,
+    bypass_result_cache: bool = False,
+    cancelled: Optional[Callable[[], bool]] = None,
 ) -> None:
+    """Transcribe a stored upload and persist the result.
+
+    With ``raise_errors`` a failure propagates to the caller (the job worker,
+    which decides between a retry and a final failure) instead of marking the
+    transcription as failed here. A result cached for the same audio, model
+    and decode options is reused unless ``bypass_result_cache`` is set. When
+    ``cancelled`` returns true once the model is done (the job worker lost its
+    lease), the result is dropped instead of written.
+    """
+
     resolved_model = _resolve_model_choice(model_size)
     resolved_device = _resolve_device_choice(device_preference)
-    transcriber = get_transcriber(resolved_model, resolved_device)
+    progress_writer = PartialTextWriter(
+        transcription_id,
+        interval_seconds=settings.transcription_progress_flush_ms / 1000.0,
+        max_segments=settings.transcription_progress_flush_segments,
+    )
 
     def debug_callback(
         stage: str,
@@ -1428,20 +2945,13 @@ def process_transcription(
         extra: Optional[Dict[str, object]],
         level: str = "info",
     ) -> None:
-        append_debug_event(transcription_id, stage, message, extra=extra, level=level)
+        record_debug_event(transcription_id, stage, message, extra=extra, level=level)
         if stage == "transcribe.segment" and extra:
             partial_text = str(extra.get("partial_text") or "").strip()
             if partial_text:
-                with get_session() as update_session:
-                    partial = update_session.get(Transcription, transcription_id)
-                    if (
-                        partial is not None
-                        and (partial.text or "").strip() != partial_text
-                    ):
-                        partial.text = partial_text
-                        update_session.commit()
+                progress_writer.update(partial_text)
 
-    append_debug_event(
+    record_debug_event(
         transcription_id,
         "processing-start",
         "Procesamiento iniciado",
@@ -1466,6 +2976,7 @@ def process_transcription(
             transcription.runtime_seconds = None
             stored_path = transcription.stored_path
             existing_duration = transcription.duration
+            scheduler_owner = f"folder:{transcription.output_folder or transcription_id}"
 
         assert stored_path is not None
         audio_path = Path(stored_path)
@@ -1476,7 +2987,7 @@ def process_transcription(
                 if transcription is not None:
                     transcription.status = TranscriptionStatus.FAILED.value
                     transcription.error_message = message
-            append_debug_event(
+            record_debug_event(
                 transcription_id,
                 "processing-missing-file",
                 message,
@@ -1487,38 +2998,33 @@ def process_transcription(
         duration_hint: Optional[float] = existing_duration
         if duration_hint is None:
             try:
-                audio_info = AudioSegment.from_file(audio_path)
-                duration_hint = len(audio_info) / 1000.0
-            except Exception as exc:  # pragma: no cover - depende del runtime
+                media_info = probe_media(audio_path)
+                duration_hint = media_info.duration
+            except (MediaProbeError, OSError) as exc:
                 logger.debug(
                     "No se pudo estimar la duración preliminar para %s: %s",
                     audio_path,
                     exc,
                 )
             else:
-                append_debug_event(
+                record_debug_event(
                     transcription_id,
                     "analyze.duration",
                     "Duración estimada del audio",
-                    extra={"seconds": duration_hint},
+                    extra={
+                        "seconds": duration_hint,
+                        "sample_rate": media_info.sample_rate,
+                        "channels": media_info.channels,
+                        "source": media_info.source,
+                    },
                 )
                 with get_session() as update_session:
-                    partial = update_session.get(Transcription, transcription_id)
-                    if partial is not None and not partial.duration:
-                        partial.duration = duration_hint
+                    row = update_session.get(Transcription, transcription_id)
+                    if row is not None and not row.duration:
+                        row.duration = duration_hint
 
-        normalized_audio = ensure_normalized_audio(audio_path)
         effective_beam = beam_size or settings.whisper_final_beam
-        decode_options_raw = {
-            "batch_size": settings.whisper_batch_size,
-            "temperature": 0.0,
-            "word_timestamps": settings.whisper_word_timestamps,
-            "condition_on_previous_text": settings.whisper_condition_on_previous_text,
-            "vad_filter": settings.whisper_vad_mode,
-            "compression_ratio_threshold": settings.whisper_compression_ratio_threshold,
-            "log_prob_threshold": settings.whisper_log_prob_threshold,
-        }
-        decode_options = {k: v for k, v in decode_options_raw.items() if v is not None}
+        decode_options = _decode_options()
 
         def _normalize_device_label(value: Optional[str], fallback: str) -> str:
             normalized = (value or "").strip().lower()
@@ -1543,46 +3049,124 @@ def process_transcription(
                     return default_label
             return default_label
 
-        def _transcribe_once(
-            current_transcriber: BaseTranscriber,
-        ) -> TranscriptionResult:
-            return current_transcriber.transcribe(
-                normalized_audio,
+        use_pieces = _splits_long_audio(duration_hint)
+
+        def _on_piece(piece: AudioPiece, piece_result: TranscriptionResult, finished: int) -> None:
+            record_debug_event(
+                transcription_id,
+                "transcribe.piece",
+                "Fragmento de audio largo transcrito",
+                extra={
+                    "piece": piece.index,
+                    "finished": finished,
+                    "runtime_seconds": piece_result.runtime_seconds,
+                },
+            )
+
+        def _transcribe_once(device: str, models: ExitStack) -> TranscriptionResult:
+            nonlocal transcriber_in_use
+            if use_pieces:
+                # Every piece process loads its own copy of the model, so the
+                # parent only charges those copies and never loads one itself.
+                with MODEL_POOL.reserve(
+                    resolved_model, device, settings.whisper_parallel_pipelines
+                ):
+                    return transcribe_in_pieces(
+                        normalized_audio,
+                        model_size=resolved_model,
+                        device=device,
+                        language=language or transcription.language,
+                        beam_size=effective_beam,
+                        decode_options=decode_options,
+                        workers=settings.whisper_parallel_pipelines,
+                        piece_seconds=settings.whisper_long_audio_piece_seconds,
+                        overlap_seconds=settings.whisper_long_audio_overlap_seconds,
+                        slot=partial(
+                            INFERENCE_SCHEDULER.slot, device, Priority.BATCH, scheduler_owner
+                        ),
+                        on_piece=_on_piece,
+                    )
+            transcriber = models.enter_context(MODEL_POOL.use(resolved_model, device))
+            transcriber_in_use = transcriber
+            with _inference_slot(transcriber, device, Priority.BATCH, scheduler_owner):
+                return transcriber.transcribe(
+                    normalized_audio,
+                    language or transcription.language,
+                    beam_size=effective_beam,
+                    decode_options=decode_options,
+                    debug_callback=debug_callback,
+                )
+
+        result_cache = None if bypass_result_cache else _result_cache()
+        result_key: Optional[str] = None
+        cached_result: Optional[TranscriptionResult] = None
+        if result_cache is not None:
+            if content_hash is None:
+                # Hash once; the audio cache below reuses it for its key.
+                content_hash = hash_file(audio_path)
+            result_key = _transcription_result_key(
+                audio_path,
+                content_hash,
+                resolved_model,
                 language or transcription.language,
-                beam_size=effective_beam,
-                decode_options=decode_options,
-                debug_callback=debug_callback,
+                effective_beam,
+                decode_options,
+                use_pieces,
             )
+            cached_result = _cached_transcription_result(result_cache, result_key)
 
-        transcriber_in_use: BaseTranscriber = transcriber
+        transcriber_in_use: Optional[BaseTranscriber] = None
         used_cpu_fallback = False
         fallback_reason: Optional[str] = None
 
-        try:
-            result = _transcribe_once(transcriber_in_use)
-        except Exception as exc:
-            if (
-                not settings.whisper_force_cuda
-                and requested_device == "gpu"
-                and is_cuda_dependency_error(exc)
-            ):
-                used_cpu_fallback = True
-                fallback_reason = summarize_cuda_dependency_error(exc)
-                append_debug_event(
-                    transcription_id,
-                    "device.fallback",
-                    "CUDA no disponible; reintentando en CPU",
-                    extra={"error": fallback_reason},
-                    level="warning",
-                )
-                transcriber_in_use = get_transcriber(resolved_model, "cpu")
-                result = _transcribe_once(transcriber_in_use)
-            else:
-                raise
-
-        effective_device = _determine_effective_device(
-            transcriber_in_use,
-            "cpu" if used_cpu_fallback else requested_device,
+        if cached_result is not None:
+            progress_writer.close()
+            result = cached_result
+            record_debug_event(
+                transcription_id,
+                "cache.hit",
+                "Resultado reutilizado de la caché",
+                extra={"key": result_key, "segments": len(result.segments)},
+            )
+        else:
+            normalized_audio = _normalized_audio(audio_path, content_hash)
+            models = ExitStack()
+            try:
+                result = _transcribe_once(resolved_device, models)
+            except Exception as exc:
+                if (
+                    not settings.whisper_force_cuda
+                    and requested_device == "gpu"
+                    and is_cuda_dependency_error(exc)
+                ):
+                    used_cpu_fallback = True
+                    fallback_reason = summarize_cuda_dependency_error(exc)
+                    record_debug_event(
+                        transcription_id,
+                        "device.fallback",
+                        "CUDA no disponible; reintentando en CPU",
+                        extra={"error": fallback_reason},
+                        level="warning",
+                    )
+                    result = _transcribe_once("cpu", models)
+                else:
+                    raise
+            finally:
+                progress_writer.close()
+                models.close()
+            if result_cache is not None and result_key is not None:
+                try:
+                    result_cache.put(result_key, _result_payload(result))
+                except sqlite3.Error as exc:
+                    logger.warning("No se pudo guardar el resultado en caché: %s", exc)
+
+        effective_device = (
+            _determine_effective_device(
+                transcriber_in_use,
+                "cpu" if used_cpu_fallback else requested_device,
+            )
+            if transcriber_in_use is not None
+            else "cpu" if used_cpu_fallback else requested_device
         )
         if used_cpu_fallback and not fallback_reason:
             reason_callable = getattr(transcriber_in_use, "last_cuda_failure", None)
@@ -1601,35 +3185,29 @@ def process_transcription(
         if used_cpu_fallback and fallback_reason:
             completion_extra["fallback_reason"] = fallback_reason
 
+        if cancelled is not None and cancelled():
+            record_debug_event(
+                transcription_id,
+                "processing-abandoned",
+                "Resultado descartado: el trabajo pasó a otro worker",
+                level="warning",
+            )
+            return
+
         with get_session() as session:
             transcription = session.get(Transcription, transcription_id)
             if transcription is None:
                 return
-            transcription.text = result.text
-            transcription.language = result.language or language
-            transcription.model_size = resolved_model
-            transcription.beam_size = effective_beam
-            transcription.device_preference = effective_device
-            transcription.duration = result.duration
-            transcription.runtime_seconds = result.runtime_seconds
-            transcription.speakers = serialize_segments(result.segments)
-            transcription.status = TranscriptionStatus.COMPLETED.value
-            transcription.error_message = None
-            stored_folder = transcription.output_folder or "transcripciones"
-            target_path = (
-                Path(transcription.transcript_path)
-                if transcription.transcript_path
-                else compute_txt_path(
-                    transcription.id,
-                    folder=stored_folder,
-                    original_filename=transcription.original_filename,
-                )
+            _store_transcription_result(
+                transcription,
+                result,
+                language,
+                resolved_model,
+                effective_beam,
+                effective_device,
             )
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            write_atomic_text(target_path, transcription.to_txt())
-            transcription.transcript_path = str(target_path)
 
-        append_debug_event(
+        record_debug_event(
             transcription_id,
             "processing-complete",
             "Transcripción finalizada correctamente",
@@ -1637,21 +3215,9 @@ def process_transcription(
         )
     except Exception as exc:  # pragma: no cover - runtime safeguard
         logger.exception("Failed to transcribe %s", transcription_id)
-        error_message = str(exc)
-        with get_session() as session:
-            transcription = session.get(Transcription, transcription_id)
-            if transcription is None:
-                return
-            transcription.status = TranscriptionStatus.FAILED.value
-            transcription.error_message = error_message
-
-        append_debug_event(
-            transcription_id,
-            "processing-error",
-            "Error durante la transcripción",
-            extra={"error": error_message},
-            level="error",
-        )
+        if raise_errors:
+            raise
+        mark_transcription_failed(transcription_id, str(exc))
 
 
 @router.get("", response_model=SearchResponse)
@@ -1676,7 +3242,14 @@ def list_transcriptions(
             )
         )
     query = query.order_by(Transcription.created_at.desc())
-    results = [TranscriptionDetail.from_orm(item) for item in query.all()]
+    # Logged events are read per transcription on the detail endpoint only;
+    # listing every row's log file would cost one open per result.
+    results = []
+    for item in query.all():
+        detail = TranscriptionDetail.from_orm(item)
+        if detail.debug_events is None:
+            detail.debug_events = []
+        results.append(detail)
     return SearchResponse(results=results, total=len(results))
 
 
@@ -1685,7 +3258,8 @@ def get_transcription(
     transcription_id: int, session: Session = Depends(_get_session)
 ) -> TranscriptionDetail:
     transcription = _get_transcription_or_404(session, transcription_id)
-    return TranscriptionDetail.from_orm(transcription)
+    DEBUG_EVENT_LOG.flush()
+    return _with_logged_events(TranscriptionDetail.from_orm(transcription))
 
 
 @router.get("/{transcription_id}/audio")
@@ -1705,32 +3279,65 @@ def download_transcription_audio(
     )
 
 
+def _format_debug_event(event: Dict[str, Any]) -> str:
+    timestamp = event.get("timestamp", "")
+    stage = event.get("stage", "")
+    level = event.get("level", "info")
+    message = event.get("message", "")
+    extra = event.get("extra")
+    line = f"[{timestamp}] {level.upper()} · {stage}: {message}\n"
+    if extra:
+        formatted_extra = json.dumps(extra, ensure_ascii=False, sort_keys=True)
+        line += f"    extra: {formatted_extra}\n"
+    return line
+
+
 @router.get("/{transcription_id}/logs")
 def download_transcription_logs(
     transcription_id: int,
+    stage: Optional[List[str]] = Query(default=None),
+    level: Optional[List[str]] = Query(default=None),
+    after: int = Query(default=0, ge=0, description="Primer evento a devolver"),
+    output: str = Query(default="text", alias="format", pattern="^(text|jsonl)$"),
     session: Session = Depends(_get_session),
 ) -> Response:
     transcription = _get_transcription_or_404(session, transcription_id)
-    events = list(transcription.debug_events or [])
-    if not events:
-        content = "No hay eventos de depuración registrados aún.\n"
+    DEBUG_EVENT_LOG.flush()
+    stages = set(stage or [])
+    levels = {value.lower() for value in level or []}
+    if DEBUG_EVENT_LOG.count(transcription_id):
+        events: Iterable[Dict[str, Any]] = DEBUG_EVENT_LOG.read(
+            transcription_id, after=after, stages=stages, levels=levels
+        )
     else:
-        lines: List[str] = []
+        events = [
+            {**event, "seq": seq}
+            for seq, event in enumerate(transcription.debug_events or [])
+            if seq >= after
+            and (not stages or event.get("stage") in stages)
+            and (not levels or event.get("level", "info") in levels)
+        ]
+
+    def _render() -> Iterator[bytes]:
+        empty = True
         for event in events:
-            timestamp = event.get("timestamp", "")
-            stage = event.get("stage", "")
-            level = event.get("level", "info")
-            message = event.get("message", "")
-            extra = event.get("extra")
-            lines.append(f"[{timestamp}] {level.upper()} · {stage}: {message}")
-            if extra:
-                formatted_extra = json.dumps(extra, ensure_ascii=False, sort_keys=True)
-                lines.append(f"    extra: {formatted_extra}")
-        content = "\n".join(lines) + "\n"
-    filename = f"transcription-{transcription_id}-logs.txt"
-    return Response(
-        content=content,
-        media_type="text/plain; charset=utf-8",
+            empty = False
+            if output == "jsonl":
+                yield (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+            else:
+                yield _format_debug_event(event).encode("utf-8")
+        if empty and output == "text":
+            yield "No hay eventos de depuración registrados aún.\n".encode("utf-8")
+
+    extension, media_type = (
+        ("jsonl", "application/x-ndjson")
+        if output == "jsonl"
+        else ("txt", "text/plain; charset=utf-8")
+    )
+    filename = f"transcription-{transcription_id}-logs.{extension}"
+    return StreamingResponse(
+        _render(),
+        media_type=media_type,
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
@@ -1803,6 +3410,7 @@ def delete_transcription(
     )
     session.delete(transcription)
     session.commit()
+    DEBUG_EVENT_LOG.delete(transcription_id)
     if stored_path.exists():  # pragma: no cover - filesystem side effects
         stored_path.unlink()
     if txt_path.exists():  # pragma: no cover - filesystem side effects
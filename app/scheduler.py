@@ -0,0 +1,237 @@
+"""Inference slots shared by live sessions and batch transcriptions."""
+from __future__ import annotations
+
+import fcntl
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import IO, Deque, Dict, Iterator, List, Optional
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    LIVE = 0
+    FINALIZE = 1
+    BATCH = 2
+
+
+@dataclass
+class _Ticket:
+    seq: int
+    device: str
+    priority: Priority
+    owner: str
+    enqueued_at: float = field(default_factory=time.monotonic)
+    granted: bool = False
+
+
+@dataclass
+class _DeviceState:
+    slots: int
+    active: int = 0
+    # priority -> owner -> pending tickets; owners rotate round-robin.
+    queues: Dict[Priority, "OrderedDict[str, Deque[_Ticket]]"] = field(
+        default_factory=lambda: {priority: OrderedDict() for priority in Priority}
+    )
+    waits: Dict[Priority, Deque[float]] = field(
+        default_factory=lambda: {priority: deque(maxlen=256) for priority in Priority}
+    )
+    served: Dict[Priority, int] = field(
+        default_factory=lambda: {priority: 0 for priority in Priority}
+    )
+
+
+def normalize_device(value: Optional[str]) -> str:
+    normalized = (value or "").strip().lower()
+    return "gpu" if normalized in {"cuda", "gpu", "auto"} else "cpu"
+
+
+# How often a call waiting for a slot held by another process retries, by
+# priority: live chunks poll fastest so they tend to win freed slots.
+SHARED_POLL_SECONDS = {Priority.LIVE: 0.005, Priority.FINALIZE: 0.02, Priority.BATCH: 0.1}
+
+
+class SharedSlots:
+    """Cap concurrent calls per device across processes with locked files.
+
+    Slot ``i`` of a device is an exclusive ``fcntl.flock`` on
+    ``<root>/<device>-<i>.lock``; the lock goes away with the process that
+    held it, so a crashed worker never leaks a slot. There is no queue
+    between processes: waiters poll, faster for higher priorities.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _try_acquire(self, device: str, slots: int) -> Optional[IO[bytes]]:
+        for index in range(slots):
+            handle = open(self.root / f"{device}-{index}.lock", "a+b")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            return handle
+        return None
+
+    def acquire(
+        self, device: str, slots: int, priority: Priority, timeout: Optional[float] = None
+    ) -> IO[bytes]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            handle = self._try_acquire(device, slots)
+            if handle is not None:
+                return handle
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("No hay capacidad de inferencia disponible")
+            time.sleep(SHARED_POLL_SECONDS[priority])
+
+    @staticmethod
+    def release(handle: IO[bytes]) -> None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            handle.close()
+
+
+class InferenceScheduler:
+    """Grant model calls a concurrency slot on their device.
+
+    Each device has ``slots`` concurrent calls. Waiting calls are served by
+    priority class (live before finalize before batch) and, inside a class,
+    round-robin across owners (a live session, a user or a batch) so one
+    owner's backlog cannot monopolise the device.
+
+    Queues and fairness are per process. With ``shared`` a granted call also
+    takes one of the device's ``SharedSlots``, so API and job worker
+    processes on the same host together stay within ``slots``; between
+    processes only the polling rate favours live calls.
+    """
+
+    def __init__(
+        self,
+        slots: int = 1,
+        device_slots: Optional[Dict[str, int]] = None,
+        shared: Optional[SharedSlots] = None,
+    ) -> None:
+        self.default_slots = max(1, int(slots))
+        self._device_slots = {
+            normalize_device(device): max(1, int(count))
+            for device, count in (device_slots or {}).items()
+        }
+        self.shared = shared
+        self._devices: Dict[str, _DeviceState] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+
+    def _device(self, device: str) -> _DeviceState:
+        state = self._devices.get(device)
+        if state is None:
+            state = _DeviceState(slots=self._device_slots.get(device, self.default_slots))
+            self._devices[device] = state
+        return state
+
+    def _dispatch(self, state: _DeviceState) -> None:
+        while state.active < state.slots:
+            ticket = self._next_ticket(state)
+            if ticket is None:
+                return
+            ticket.granted = True
+            state.active += 1
+            state.served[ticket.priority] += 1
+            state.waits[ticket.priority].append(time.monotonic() - ticket.enqueued_at)
+
+    @staticmethod
+    def _next_ticket(state: _DeviceState) -> Optional[_Ticket]:
+        for priority in Priority:
+            owners = state.queues[priority]
+            if not owners:
+                continue
+            owner, pending = next(iter(owners.items()))
+            ticket = pending.popleft()
+            del owners[owner]
+            if pending:
+                owners[owner] = pending
+            return ticket
+        return None
+
+    def acquire(self, device: Optional[str], priority: Priority, owner: str, timeout: Optional[float] = None) -> _Ticket:
+        key = normalize_device(device)
+        ticket = _Ticket(seq=next(self._seq), device=key, priority=priority, owner=owner)
+        with self._cond:
+            state = self._device(key)
+            state.queues[priority].setdefault(owner, deque()).append(ticket)
+            self._dispatch(state)
+            if not self._cond.wait_for(lambda: ticket.granted, timeout=timeout):
+                pending = state.queues[priority].get(owner)
+                if pending is not None and ticket in pending:
+                    pending.remove(ticket)
+                    if not pending:
+                        del state.queues[priority][owner]
+                raise TimeoutError("No hay capacidad de inferencia disponible")
+        return ticket
+
+    def release(self, ticket: _Ticket) -> None:
+        with self._cond:
+            state = self._device(ticket.device)
+            state.active = max(0, state.active - 1)
+            self._dispatch(state)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(
+        self,
+        device: Optional[str],
+        priority: Priority,
+        owner: str,
+        timeout: Optional[float] = None,
+    ) -> Iterator[None]:
+        started = time.monotonic()
+        ticket = self.acquire(device, priority, owner, timeout=timeout)
+        handle = None
+        try:
+            if self.shared is not None:
+                remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - started))
+                with self._cond:
+                    slots = self._device(ticket.device).slots
+                handle = self.shared.acquire(ticket.device, slots, priority, timeout=remaining)
+            yield
+        finally:
+            if handle is not None:
+                self.shared.release(handle)
+            self.release(ticket)
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        now = time.monotonic()
+        report: Dict[str, Dict[str, object]] = {}
+        with self._cond:
+            for device, state in self._devices.items():
+                classes: Dict[str, Dict[str, object]] = {}
+                for priority in Priority:
+                    pending: List[_Ticket] = [
+                        ticket for queue in state.queues[priority].values() for ticket in queue
+                    ]
+                    waits = list(state.waits[priority])
+                    classes[priority.name.lower()] = {
+                        "queued": len(pending),
+                        "owners": len(state.queues[priority]),
+                        "served": state.served[priority],
+                        "oldest_wait_ms": int(max((now - t.enqueued_at for t in pending), default=0.0) * 1000),
+                        "avg_wait_ms": int(sum(waits) / len(waits) * 1000) if waits else 0,
+                        "max_wait_ms": int(max(waits) * 1000) if waits else 0,
+                    }
+                report[device] = {
+                    "slots": state.slots,
+                    "active": state.active,
+                    "shared": self.shared is not None,
+                    "queued": sum(entry["queued"] for entry in classes.values()),
+                    "classes": classes,
+                }
+        return report
@@ -0,0 +1,170 @@
+"""Content-addressed cache of normalized (16 kHz mono PCM) audio."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the normalization output changes so stale artifacts are not reused.
+NORMALIZATION_VERSION = "16k-mono-s16le-v1"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def normalized_audio_key(content_hash: str) -> str:
+    """Cache key of the normalized output for source bytes hashing to ``content_hash``."""
+
+    return hashlib.sha256(f"{NORMALIZATION_VERSION}:{content_hash}".encode()).hexdigest()
+
+
+class NormalizedAudioCache:
+    """Keep normalized copies of uploads keyed by the hash of their bytes.
+
+    ``get`` returns the cached artifact for a source file, converting it with
+    ``normalize`` only on a miss. Artifacts are written to a temporary name
+    and renamed into place, so readers never see a partial file; concurrent
+    misses for the same content wait on a single conversion. Artifacts that
+    another process sharing ``root`` published are picked up from disk. The
+    directory is kept under ``max_bytes`` by evicting the least recently used
+    artifacts.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        normalize: Callable[[Path], Path],
+        max_bytes: int = 2 * 1024**3,
+    ) -> None:
+        self.root = Path(root)
+        self.normalize = normalize
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        found = []
+        for path in self.root.glob("*/*.wav"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found.append((stat.st_mtime, path.stem, stat.st_size))
+        for _mtime, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def key_for(self, source: Path, content_hash: Optional[str] = None) -> str:
+        """Key of ``source``; pass ``content_hash`` when known to skip reading it."""
+
+        return normalized_audio_key(content_hash or hash_file(source))
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.wav"
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, source: Path, content_hash: Optional[str] = None) -> Path:
+        source = Path(source)
+        key = self.key_for(source, content_hash)
+        target = self.path_for(key)
+        with self._lock:
+            if key not in self._entries and key not in self._inflight:
+                self._adopt_locked(key, target)
+            if key in self._entries and target.exists():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                leader = False
+                future = None
+            else:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+                    self.misses += 1
+        if future is None:
+            try:
+                os.utime(target)
+            except FileNotFoundError:  # pragma: no cover - evicted by another process
+                return self.get(source, content_hash)
+            return target
+        if not leader:
+            return future.result()
+        try:
+            self._publish(source, key, target)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(target)
+        return target
+
+    def _adopt_locked(self, key: str, target: Path) -> None:
+        """Index an artifact another process published after ``_load`` ran."""
+
+        try:
+            size = target.stat().st_size
+        except FileNotFoundError:
+            return
+        self._entries[key] = size
+        self._total_bytes += size
+        self._evict_locked(keep=key)
+
+    def _publish(self, source: Path, key: str, target: Path) -> None:
+        normalized = Path(self.normalize(source))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            # Hard-link (or move) the converter's output instead of keeping a
+            # second copy next to the source; copy only across filesystems.
+            try:
+                os.link(normalized, tmp)
+            except OSError:
+                shutil.copyfile(normalized, tmp)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        if normalized.resolve() != source.resolve():
+            normalized.unlink(missing_ok=True)
+        size = target.stat().st_size
+        with self._lock:
+            previous = self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total_bytes += size - previous
+            self._evict_locked(keep=key)
+
+    def _evict_locked(self, keep: str) -> None:
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._total_bytes -= size
+            self.path_for(key).unlink(missing_ok=True)
+            logger.debug("Audio normalizado %s expulsado de la caché", key)
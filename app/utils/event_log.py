@@ -0,0 +1,182 @@
+"""Append-only per-transcription debug event log (JSONL plus offset index)."""
+from __future__ import annotations
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_OFFSET = struct.Struct("<Q")
+
+
+class DebugEventLog:
+    """Store debug events as ``<id>.jsonl`` with a fixed-width ``<id>.idx``.
+
+    Events are buffered in memory and appended in batches by a flusher
+    thread (or when ``batch_size`` events are waiting); nothing already
+    written is ever rewritten. The index holds the byte offset of every line,
+    so ``read(after=n)`` and ``tail(n)`` seek straight to the events they
+    need. Appends take an exclusive ``flock`` so API and worker processes can
+    share the same directory.
+    """
+
+    def __init__(self, root: Path, flush_interval: float = 0.2, batch_size: int = 64) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.batch_size = max(1, int(batch_size))
+        self._pending: Dict[int, List[bytes]] = defaultdict(list)
+        self._pending_count = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    def _paths(self, transcription_id: int):
+        return self.root / f"{transcription_id}.jsonl", self.root / f"{transcription_id}.idx"
+
+    def append(
+        self,
+        transcription_id: int,
+        stage: str,
+        message: str,
+        extra: Optional[Dict[str, Any]] = None,
+        level: str = "info",
+    ) -> None:
+        event = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "stage": stage,
+            "level": level,
+            "message": message,
+            "extra": extra,
+        }
+        line = json.dumps(event, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        with self._cond:
+            self._pending[transcription_id].append(line)
+            self._pending_count += 1
+            flush_now = self._pending_count >= self.batch_size
+            self._ensure_thread()
+            self._cond.notify()
+        if flush_now:
+            self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="debug-event-log", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending_count > 0)
+            # Let a burst accumulate into one write.
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._cond:
+                pending, self._pending = self._pending, defaultdict(list)
+                self._pending_count = 0
+            for transcription_id, lines in pending.items():
+                try:
+                    self._write(transcription_id, lines)
+                except OSError as exc:  # pragma: no cover - depende del disco
+                    logger.warning("No se pudieron guardar eventos de %s: %s", transcription_id, exc)
+
+    def _write(self, transcription_id: int, lines: List[bytes]) -> None:
+        log_path, index_path = self._paths(transcription_id)
+        with open(log_path, "ab") as log_file:
+            fcntl.flock(log_file, fcntl.LOCK_EX)
+            try:
+                offset = log_file.seek(0, os.SEEK_END)
+                offsets = bytearray()
+                for line in lines:
+                    offsets += _OFFSET.pack(offset)
+                    offset += len(line)
+                log_file.write(b"".join(lines))
+                log_file.flush()
+                with open(index_path, "ab") as index_file:
+                    index_file.write(offsets)
+            finally:
+                fcntl.flock(log_file, fcntl.LOCK_UN)
+
+    def count(self, transcription_id: int) -> int:
+        _, index_path = self._paths(transcription_id)
+        try:
+            return index_path.stat().st_size // _OFFSET.size
+        except FileNotFoundError:
+            return 0
+
+    def _offset_of(self, transcription_id: int, position: int) -> Optional[int]:
+        _, index_path = self._paths(transcription_id)
+        try:
+            with open(index_path, "rb") as index_file:
+                index_file.seek(position * _OFFSET.size)
+                raw = index_file.read(_OFFSET.size)
+        except FileNotFoundError:
+            return None
+        if len(raw) < _OFFSET.size:
+            return None
+        return _OFFSET.unpack(raw)[0]
+
+    def read(
+        self,
+        transcription_id: int,
+        *,
+        after: int = 0,
+        stages: Optional[Collection[str]] = None,
+        levels: Optional[Collection[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield events from position ``after`` on, optionally filtered.
+
+        Each event carries its ``seq`` (position in the log) so clients can
+        resume with ``after=seq + 1``.
+        """
+
+        total = self.count(transcription_id)
+        start = self._offset_of(transcription_id, max(0, after)) if after < total else None
+        if start is None:
+            return
+        log_path, _ = self._paths(transcription_id)
+        yielded = 0
+        with open(log_path, "rb") as log_file:
+            log_file.seek(start)
+            for seq in range(max(0, after), total):
+                line = log_file.readline()
+                if not line:
+                    return
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if stages and event.get("stage") not in stages:
+                    continue
+                if levels and event.get("level") not in levels:
+                    continue
+                event["seq"] = seq
+                yield event
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+
+    def tail(self, transcription_id: int, limit: int) -> List[Dict[str, Any]]:
+        total = self.count(transcription_id)
+        return list(self.read(transcription_id, after=max(0, total - limit)))
+
+    def delete(self, transcription_id: int) -> None:
+        self.flush()
+        for path in self._paths(transcription_id):
+            path.unlink(missing_ok=True)
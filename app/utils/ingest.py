@@ -0,0 +1,285 @@
+"""Single-pass upload ingestion and resumable chunked uploads."""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Tuple
+
+import anyio
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_BYTES = 1024 * 1024
+_UPLOAD_ID = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+class UploadTooLargeError(ValueError):
+    """The upload went past ``max_upload_size_mb``."""
+
+
+class UploadOffsetError(ValueError):
+    """An append did not start where the stored data ends."""
+
+    def __init__(self, expected: int) -> None:
+        super().__init__(f"offset esperado {expected}")
+        self.expected = expected
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    path: Path
+    size: int
+    sha256: str
+
+
+def ingest_stream(source: BinaryIO, destination: Path, max_bytes: int) -> IngestResult:
+    """Copy ``source`` to ``destination`` once, measuring and hashing as it goes.
+
+    The data lands in a temporary sibling and is renamed into place, so an
+    upload rejected half-way for being too large leaves nothing behind.
+    """
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destination.with_name(f".{destination.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp, "wb") as handle:
+            for block in iter(lambda: source.read(COPY_CHUNK_BYTES), b""):
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLargeError("Archivo demasiado grande")
+                digest.update(block)
+                handle.write(block)
+        os.replace(tmp, destination)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return IngestResult(path=destination, size=size, sha256=digest.hexdigest())
+
+
+class ChunkedUploadStore:
+    """Resumable uploads kept as ``<root>/<id>/data.part`` until committed.
+
+    Clients append byte ranges at the current offset; a dropped connection
+    keeps whatever reached the disk and ``offset`` tells the client where to
+    resume. Appends and commits hold an ``fcntl.flock`` on the partial file,
+    so API worker processes sharing the directory take turns. The running
+    SHA-256 lives in the memory of the process that wrote the bytes and is
+    only trusted while the file is still the size it hashed; otherwise it is
+    recomputed from the file at commit time. Uploads left untouched for
+    ``ttl_seconds`` are removed by ``sweep``.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int,
+        ttl_seconds: float = 24 * 3600.0,
+        sweep_interval: float = 600.0,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = float(ttl_seconds)
+        self.sweep_interval = float(sweep_interval)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+        self._next_sweep = 0.0
+
+    def _directory(self, upload_id: str) -> Path:
+        if not _UPLOAD_ID.match(upload_id or ""):
+            raise KeyError(upload_id)
+        directory = self.root / upload_id
+        if not (directory / "meta.json").exists():
+            raise KeyError(upload_id)
+        return directory
+
+    def create(
+        self,
+        filename: str,
+        content_type: Optional[str] = None,
+        expected_size: Optional[int] = None,
+    ) -> Dict[str, object]:
+        if expected_size is not None and expected_size > self.max_bytes:
+            raise UploadTooLargeError("Archivo demasiado grande")
+        self.maybe_sweep()
+        upload_id = secrets.token_urlsafe(12)
+        directory = self.root / upload_id
+        directory.mkdir(parents=True)
+        (directory / "data.part").touch()
+        meta = {
+            "upload_id": upload_id,
+            "filename": Path(filename).name,
+            "content_type": content_type,
+            "expected_size": expected_size,
+            "created_at": time.time(),
+        }
+        (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        self._hashers[upload_id] = (0, hashlib.sha256())
+        return meta
+
+    def meta(self, upload_id: str) -> Dict[str, object]:
+        directory = self._directory(upload_id)
+        return json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+
+    def offset(self, upload_id: str) -> int:
+        return (self._directory(upload_id) / "data.part").stat().st_size
+
+    def _open_locked(self, upload_id: str) -> Tuple[BinaryIO, int]:
+        """Open the partial file for appending under an exclusive flock."""
+
+        directory = self._directory(upload_id)
+        expected_size = self.meta(upload_id).get("expected_size")
+        limit = min(self.max_bytes, expected_size) if expected_size is not None else self.max_bytes
+        try:
+            handle = open(directory / "data.part", "r+b")
+        except FileNotFoundError as exc:
+            raise KeyError(upload_id) from exc
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.seek(0, os.SEEK_END)
+            if not (directory / "meta.json").exists():
+                # Committed or aborted while we waited for the lock.
+                raise KeyError(upload_id)
+        except BaseException:
+            handle.close()
+            raise
+        return handle, limit
+
+    @staticmethod
+    def _write(handle: BinaryIO, data: bytes, digest: Optional["hashlib._Hash"]) -> None:
+        handle.write(data)
+        if digest is not None:
+            digest.update(data)
+
+    @staticmethod
+    def _unlock(handle: BinaryIO) -> None:
+        try:
+            handle.flush()
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Write ``chunks`` at ``offset`` and return the new offset.
+
+        File I/O and waiting for the lock run on worker threads; blocks are
+        gathered into writes of about ``COPY_CHUNK_BYTES``.
+        """
+
+        handle, limit = await anyio.to_thread.run_sync(self._open_locked, upload_id)
+        digest = None
+        written = offset
+        try:
+            current = os.fstat(handle.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetError(current)
+            hashed = self._hashers.get(upload_id)
+            digest = hashed[1] if hashed is not None and hashed[0] == current else None
+            buffer = bytearray()
+            async for block in chunks:
+                if written + len(buffer) + len(block) > limit:
+                    await anyio.to_thread.run_sync(handle.truncate, offset)
+                    written = offset
+                    buffer.clear()
+                    digest = None
+                    raise UploadTooLargeError("Archivo demasiado grande")
+                buffer += block
+                if len(buffer) >= COPY_CHUNK_BYTES:
+                    await anyio.to_thread.run_sync(self._write, handle, bytes(buffer), digest)
+                    written += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await anyio.to_thread.run_sync(self._write, handle, bytes(buffer), digest)
+                written += len(buffer)
+        finally:
+            if digest is not None:
+                self._hashers[upload_id] = (written, digest)
+            else:
+                self._hashers.pop(upload_id, None)
+            await anyio.to_thread.run_sync(self._unlock, handle)
+        return written
+
+    def commit(self, upload_id: str, destination: Path) -> IngestResult:
+        """Move the finished upload to ``destination`` without copying it."""
+
+        handle, _ = self._open_locked(upload_id)
+        try:
+            directory = self.root / upload_id
+            meta = self.meta(upload_id)
+            part = directory / "data.part"
+            size = os.fstat(handle.fileno()).st_size
+            expected_size = meta.get("expected_size")
+            if expected_size is not None and size != expected_size:
+                raise UploadOffsetError(size)
+            hashed = self._hashers.pop(upload_id, None)
+            if hashed is not None and hashed[0] == size:
+                sha256 = hashed[1].hexdigest()
+            else:
+                digest = hashlib.sha256()
+                with open(part, "rb") as source:
+                    for block in iter(lambda: source.read(COPY_CHUNK_BYTES), b""):
+                        digest.update(block)
+                sha256 = digest.hexdigest()
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part, destination)
+            self.abort(upload_id)
+        finally:
+            self._unlock(handle)
+        return IngestResult(path=destination, size=size, sha256=sha256)
+
+    def abort(self, upload_id: str) -> None:
+        if not _UPLOAD_ID.match(upload_id or ""):
+            return
+        self._hashers.pop(upload_id, None)
+        shutil.rmtree(self.root / upload_id, ignore_errors=True)
+
+    def maybe_sweep(self, now: Optional[float] = None) -> int:
+        """Run ``sweep`` at most once per ``sweep_interval``."""
+
+        current = time.time() if now is None else now
+        if current < self._next_sweep:
+            return 0
+        self._next_sweep = current + self.sweep_interval
+        return self.sweep(current)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Remove uploads with no append for ``ttl_seconds``; return how many.
+
+        Uploads whose lock is held, i.e. with an append in flight, are kept.
+        """
+
+        if self.ttl_seconds <= 0:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.ttl_seconds
+        removed = 0
+        for directory in self.root.iterdir():
+            part = directory / "data.part"
+            try:
+                if not directory.is_dir() or part.stat().st_mtime >= cutoff:
+                    continue
+                handle = open(part, "rb")
+            except FileNotFoundError:
+                # Committed meanwhile, or a creation that never finished.
+                if directory.is_dir() and directory.stat().st_mtime < cutoff:
+                    shutil.rmtree(directory, ignore_errors=True)
+                continue
+            with handle:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                self._hashers.pop(directory.name, None)
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        if removed:
+            logger.info("Eliminadas %s subidas por partes abandonadas", removed)
+        return removed
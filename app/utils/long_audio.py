@@ -0,0 +1,275 @@
+"""Split long recordings at silences, transcribe the pieces in parallel, stitch."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+import wave
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..whisper_service import SegmentResult, TranscriptionResult, get_transcriber
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16_000
+FRAME_SECONDS = 0.03
+
+
+@dataclass(frozen=True)
+class AudioPiece:
+    """A piece of the recording.
+
+    ``start``/``end`` delimit the audio handed to the model (with overlap);
+    ``own_start``/``own_end`` the part whose segments the piece contributes.
+    All values are sample offsets.
+    """
+
+    index: int
+    start: int
+    end: int
+    own_start: int
+    own_end: int
+
+
+def load_pcm(path: Path, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Return mono int16 samples at ``sample_rate`` for ``path``."""
+
+    try:
+        with wave.open(str(path), "rb") as wav_file:
+            if (
+                wav_file.getnchannels() == 1
+                and wav_file.getsampwidth() == 2
+                and wav_file.getframerate() == sample_rate
+            ):
+                return np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+    except (wave.Error, EOFError):
+        pass
+    from pydub import AudioSegment
+
+    segment = (
+        AudioSegment.from_file(path)
+        .set_channels(1)
+        .set_frame_rate(sample_rate)
+        .set_sample_width(2)
+    )
+    return np.frombuffer(segment.raw_data, dtype="<i2")
+
+
+def _write_wav(samples: np.ndarray, sample_rate: int, destination: Path) -> Path:
+    with wave.open(str(destination), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype("<i2", copy=False).tobytes())
+    return destination
+
+
+def _quietest_point(samples: np.ndarray, lo: int, hi: int, target: int, frame: int) -> int:
+    window = samples[lo:hi].astype(np.float32)
+    frames = len(window) // frame
+    if frames < 1:
+        return target
+    energy = np.square(window[: frames * frame]).reshape(frames, frame).mean(axis=1)
+    quietest = np.flatnonzero(energy <= energy.min() * 1.0001 + 1e-6)
+    centres = lo + quietest * frame + frame // 2
+    # Among equally quiet frames, prefer the one closest to the target.
+    return int(centres[np.argmin(np.abs(centres - target))])
+
+
+def plan_pieces(
+    samples: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    piece_seconds: float = 600.0,
+    overlap_seconds: float = 5.0,
+    search_seconds: float = 15.0,
+) -> List[AudioPiece]:
+    """Cut roughly every ``piece_seconds`` at the quietest nearby frame."""
+
+    total = len(samples)
+    piece = max(1, int(piece_seconds * sample_rate))
+    overlap = max(0, int(overlap_seconds * sample_rate))
+    search = max(0, min(int(search_seconds * sample_rate), piece // 4))
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+    cuts: List[int] = [0]
+    while total - cuts[-1] > piece + piece // 4:
+        target = cuts[-1] + piece
+        if search:
+            cut = _quietest_point(samples, target - search, min(total, target + search), target, frame)
+        else:
+            cut = target
+        cuts.append(cut)
+    cuts.append(total)
+    return [
+        AudioPiece(
+            index=index,
+            start=max(0, own_start - overlap),
+            end=min(total, own_end + overlap),
+            own_start=own_start,
+            own_end=own_end,
+        )
+        for index, (own_start, own_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
+def _normalize_words(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def stitch_pieces(
+    pieces: Sequence[AudioPiece],
+    results: Sequence[TranscriptionResult],
+    sample_rate: int = SAMPLE_RATE,
+) -> List[SegmentResult]:
+    """Move piece segments to absolute time and drop overlap duplicates.
+
+    A segment belongs to the piece whose own range contains its midpoint, so a
+    word heard by two neighbouring pieces is kept once; an identical text that
+    still overlaps the previous kept segment is dropped as well.
+    """
+
+    stitched: List[SegmentResult] = []
+    last_index = len(pieces) - 1
+    for piece, result in zip(pieces, results):
+        offset = piece.start / sample_rate
+        own_start = piece.own_start / sample_rate
+        own_end = piece.own_end / sample_rate
+        for segment in result.segments:
+            text = (segment.text or "").strip()
+            if not text:
+                continue
+            start = offset + float(segment.start)
+            end = offset + float(segment.end)
+            middle = (start + end) / 2.0
+            if middle < own_start or (middle >= own_end and piece.index != last_index):
+                continue
+            if stitched:
+                previous = stitched[-1]
+                if _normalize_words(previous.text) == _normalize_words(text) and start < previous.end:
+                    continue
+            stitched.append(SegmentResult(start=start, end=end, text=text, speaker=segment.speaker))
+    return stitched
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+_piece_transcriber = None
+
+
+def _init_piece_worker(factory: Callable[[str, str], Any], model_size: str, device: str) -> None:
+    global _piece_transcriber
+    _piece_transcriber = factory(model_size, device)
+
+
+def _transcribe_piece(
+    path: str,
+    language: Optional[str],
+    beam_size: Optional[int],
+    decode_options: Optional[Dict[str, Any]],
+) -> TranscriptionResult:
+    return _piece_transcriber.transcribe(
+        path, language, beam_size=beam_size, decode_options=decode_options
+    )
+
+
+def transcribe_in_pieces(
+    audio_path: Path,
+    *,
+    model_size: str,
+    device: str,
+    language: Optional[str] = None,
+    beam_size: Optional[int] = None,
+    decode_options: Optional[Dict[str, Any]] = None,
+    workers: int = 2,
+    piece_seconds: float = 600.0,
+    overlap_seconds: float = 5.0,
+    search_seconds: float = 15.0,
+    slot: Optional[Callable[[], ContextManager[Any]]] = None,
+    on_piece: Optional[Callable[[AudioPiece, TranscriptionResult, int], None]] = None,
+    transcriber_factory: Callable[[str, str], Any] = get_transcriber,
+    mp_context: str = "spawn",
+    sample_rate: int = SAMPLE_RATE,
+) -> TranscriptionResult:
+    """Transcribe ``audio_path`` as overlapping pieces on ``workers`` processes.
+
+    Each worker process loads its own model once. ``slot`` wraps every piece
+    so the inference scheduler still accounts for the device capacity it
+    uses; ``on_piece`` is called in the parent as pieces finish.
+    """
+
+    started = time.perf_counter()
+    samples = load_pcm(audio_path, sample_rate)
+    pieces = plan_pieces(samples, sample_rate, piece_seconds, overlap_seconds, search_seconds)
+    workers = max(1, min(int(workers), len(pieces)))
+    results: List[Optional[TranscriptionResult]] = [None] * len(pieces)
+    finished = 0
+    progress_lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory(prefix="long-audio-") as tmp, ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(mp_context),
+        initializer=_init_piece_worker,
+        initargs=(transcriber_factory, model_size, device),
+    ) as pool:
+        paths = [
+            _write_wav(samples[piece.start : piece.end], sample_rate, Path(tmp) / f"piece-{piece.index:04d}.wav")
+            for piece in pieces
+        ]
+
+        def run(piece: AudioPiece) -> TranscriptionResult:
+            nonlocal finished
+            with (slot() if slot is not None else nullcontext()):
+                result = pool.submit(
+                    _transcribe_piece, str(paths[piece.index]), language, beam_size, decode_options
+                ).result()
+            with progress_lock:
+                results[piece.index] = result
+                finished += 1
+                if on_piece is not None:
+                    on_piece(piece, result, finished)
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="long-audio") as threads:
+            list(threads.map(run, pieces))
+
+    segments = stitch_pieces(pieces, results, sample_rate)
+    languages = Counter(result.language for result in results if result.language)
+    logger.info(
+        "Audio largo transcrito en %s piezas con %s procesos en %.1fs",
+        len(pieces),
+        workers,
+        time.perf_counter() - started,
+    )
+    return TranscriptionResult(
+        text=" ".join(segment.text for segment in segments).strip(),
+        segments=segments,
+        language=language or (languages.most_common(1)[0][0] if languages else None),
+        duration=len(samples) / sample_rate,
+        runtime_seconds=time.perf_counter() - started,
+    )
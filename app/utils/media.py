@@ -0,0 +1,143 @@
+"""Read audio duration and format from container headers without decoding."""
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import struct
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+FFPROBE_TIMEOUT_SECONDS = 15.0
+
+
+class MediaProbeError(RuntimeError):
+    """The file's duration could not be determined from its headers."""
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    duration: Optional[float]
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    codec: Optional[str] = None
+    source: str = "riff"
+
+
+def probe_wav(path: Path) -> Optional[MediaInfo]:
+    """Parse RIFF/WAVE chunk headers; ``None`` when ``path`` is not a WAV file.
+
+    Only the chunk headers are read, so the cost does not depend on the size
+    of the audio. Streaming writers that leave the ``data`` size as 0 or
+    0xFFFFFFFF are measured from the file size instead.
+    """
+
+    path = Path(path)
+    file_size = path.stat().st_size
+    with path.open("rb") as handle:
+        header = handle.read(12)
+        if len(header) < 12 or header[:4] not in {b"RIFF", b"RF64"} or header[8:12] != b"WAVE":
+            return None
+        fmt = None
+        data_size: Optional[int] = None
+        data_offset = 0
+        while True:
+            chunk_header = handle.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"fmt ":
+                body = handle.read(chunk_size)
+                if len(body) < 16:
+                    return None
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if chunk_size % 2:
+                    handle.seek(1, 1)
+            elif chunk_id == b"data":
+                data_offset = handle.tell()
+                data_size = chunk_size
+                break
+            else:
+                handle.seek(chunk_size + (chunk_size % 2), 1)
+    if fmt is None:
+        return None
+    audio_format, channels, sample_rate, byte_rate, _block_align, _bits = fmt
+    duration: Optional[float] = None
+    if data_size is not None and byte_rate:
+        available = max(0, file_size - data_offset)
+        if data_size in {0, 0xFFFFFFFF} or data_size > available:
+            data_size = available
+        duration = data_size / byte_rate
+    return MediaInfo(
+        duration=duration,
+        sample_rate=sample_rate or None,
+        channels=channels or None,
+        codec=f"wav:{audio_format:#06x}",
+        source="riff",
+    )
+
+
+def is_ffprobe_available() -> bool:
+    return shutil.which("ffprobe") is not None
+
+
+def probe_ffprobe(path: Path) -> Optional[MediaInfo]:
+    """Ask ``ffprobe`` for the container and first audio stream metadata."""
+
+    if not is_ffprobe_available():
+        return None
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "format=duration:stream=duration,sample_rate,channels,codec_name",
+        "-of",
+        "json",
+        str(path),
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            capture_output=True,
+            check=True,
+            timeout=FFPROBE_TIMEOUT_SECONDS,
+        )
+        payload = json.loads(completed.stdout or b"{}")
+    except (OSError, subprocess.SubprocessError, ValueError) as exc:
+        logger.debug("ffprobe no pudo leer %s: %s", path, exc)
+        return None
+    streams = payload.get("streams") or [{}]
+    stream = streams[0]
+    raw_duration = (payload.get("format") or {}).get("duration") or stream.get("duration")
+
+    def _number(value, cast):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+
+    return MediaInfo(
+        duration=_number(raw_duration, float),
+        sample_rate=_number(stream.get("sample_rate"), int),
+        channels=_number(stream.get("channels"), int),
+        codec=stream.get("codec_name"),
+        source="ffprobe",
+    )
+
+
+def probe_media(path: Path) -> MediaInfo:
+    """Duration, sample rate and channels of ``path`` from headers only."""
+
+    info = probe_wav(path)
+    if info is None or info.duration is None:
+        info = probe_ffprobe(path) or info
+    if info is None or info.duration is None:
+        raise MediaProbeError(f"No se pudo leer la duración de {Path(path).name}")
+    return info
@@ -0,0 +1,141 @@
+"""Finished transcription results keyed by audio content and decode settings."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload or the meaning of a key changes.
+RESULT_CACHE_VERSION = "result-v1"
+
+
+def result_cache_key(audio_fingerprint: str, model_size: str, options: Mapping[str, Any]) -> str:
+    """Hash of the normalized audio fingerprint, model and every decode option.
+
+    ``options`` must hold everything that changes the decoded text (language,
+    beam size, decode options, long-audio splitting); values are serialized
+    with sorted keys so equal settings always produce the same key.
+    """
+
+    fingerprint = json.dumps(
+        {
+            "version": RESULT_CACHE_VERSION,
+            "audio": audio_fingerprint,
+            "model": model_size,
+            "options": options,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+class TranscriptionResultCache:
+    """Serialized results in a SQLite file shared by API and worker processes.
+
+    Payloads are stored zlib-compressed; once their total size passes
+    ``max_bytes`` the least recently used entries are deleted.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024**2) -> None:
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcription_results ("
+                "key TEXT PRIMARY KEY, "
+                "payload BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "hits INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, "
+                "last_used_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_transcription_results_used "
+                "ON transcription_results (last_used_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT payload FROM transcription_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE transcription_results SET hits = hits + 1, last_used_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        try:
+            payload = json.loads(zlib.decompress(row["payload"]))
+        except (zlib.error, ValueError):
+            logger.warning("Resultado en caché %s ilegible; se descarta", key)
+            self.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return payload
+
+    def put(self, key: str, payload: Mapping[str, Any]) -> None:
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcription_results "
+                    "(key, payload, size, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, now),
+                )
+                self._evict(conn, keep=key)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcription_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM transcription_results WHERE key != ? ORDER BY last_used_at, key",
+            (keep,),
+        ).fetchall()
+        stale = []
+        for row in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((row["key"],))
+            total -= row["size"]
+        conn.executemany("DELETE FROM transcription_results WHERE key = ?", stale)
+        if stale:
+            logger.debug("Expulsados %s resultados de la caché", len(stale))
+
+    def delete(self, key: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM transcription_results WHERE key = ?", (key,))
+
+    def total_bytes(self) -> int:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcription_results").fetchone()
+        return int(row[0])
@@ -0,0 +1,251 @@
+"""Long-lived ffmpeg decoder for the chunks of a single live stream."""
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import termios
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STREAMING_FORMATS = {".webm": "webm", ".ogg": "ogg", ".oga": "ogg"}
+
+
+class StreamDecoderError(RuntimeError):
+    """The decoder process could not handle a chunk."""
+
+
+def is_streaming_decoder_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def build_ffmpeg_command(container_format: Optional[str], sample_rate: int) -> List[str]:
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-fflags",
+        "nobuffer",
+        "-flags",
+        "low_delay",
+        # Chunks carry a known container: start decoding without probing.
+        "-probesize",
+        "32",
+        "-analyzeduration",
+        "0",
+    ]
+    if container_format:
+        command += ["-f", container_format]
+    command += [
+        "-i",
+        "pipe:0",
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "s16le",
+        "-flush_packets",
+        "1",
+        "pipe:1",
+    ]
+    return command
+
+
+class StreamingDecoder:
+    """Keep one ffmpeg process per live session fed through stdin.
+
+    MediaRecorder chunks are continuation fragments of a single container, so
+    they are written as-is to the same process and the mono s16le PCM it
+    produces is collected incrementally. When the process dies it is started
+    again and primed with the first chunk (which carries the container
+    header); the audio produced by that priming is discarded. A process that
+    stops reading its input for ``stall_timeout`` is restarted the same way.
+    """
+
+    def __init__(
+        self,
+        container_format: Optional[str] = None,
+        sample_rate: int = 16_000,
+        command: Optional[Sequence[str]] = None,
+        stall_timeout: float = 2.0,
+        settle_seconds: float = 0.03,
+        poll_seconds: float = 0.005,
+    ) -> None:
+        self.container_format = container_format
+        self.sample_rate = sample_rate
+        self.command = list(command or build_ffmpeg_command(container_format, sample_rate))
+        self.stall_timeout = stall_timeout
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.restarts = 0
+        self.chunks = 0
+        self.last_decode_ms: Optional[float] = None
+        self._total_decode_ms = 0.0
+        self._header: Optional[bytes] = None
+        self._pending = bytearray()
+        self._cond = threading.Condition()
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def average_decode_ms(self) -> Optional[float]:
+        if not self.chunks:
+            return None
+        return self._total_decode_ms / self.chunks
+
+    def _start(self) -> None:
+        process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        reader = threading.Thread(
+            target=self._read_loop, args=(process,), name="live-stream-decoder", daemon=True
+        )
+        with self._cond:
+            self._pending.clear()
+        self._process = process
+        self._reader = reader
+        reader.start()
+
+    def _read_loop(self, process: subprocess.Popen) -> None:
+        fd = process.stdout.fileno()
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                data = b""
+            with self._cond:
+                if not data:
+                    self._cond.notify_all()
+                    return
+                if process is self._process:
+                    self._pending.extend(data)
+                self._cond.notify_all()
+
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        if process.stdout:
+            process.stdout.close()
+        if self._reader is not None:
+            self._reader.join(timeout=1.0)
+        self._reader = None
+
+    def _write(self, data: bytes) -> None:
+        process = self._process
+        if process is None or process.poll() is not None:
+            raise BrokenPipeError("el decodificador no está en ejecución")
+        process.stdin.write(data)
+        process.stdin.flush()
+
+    @staticmethod
+    def _unread_input(process: subprocess.Popen) -> int:
+        """Bytes written to the process that it has not read yet."""
+
+        try:
+            raw = fcntl.ioctl(process.stdin.fileno(), termios.FIONREAD, struct.pack("i", 0))
+        except (OSError, ValueError):
+            return 0
+        return struct.unpack("i", raw)[0]
+
+    def _collect(self) -> bytes:
+        """Return the whole samples decoded from everything written so far.
+
+        Raw PCM carries no per-chunk framing, so a chunk is done once the
+        process has read all of it and its output has not grown for
+        ``settle_seconds``. Raises ``TimeoutError`` if the input is still
+        unread after ``stall_timeout`` and ``BrokenPipeError`` if the process
+        exits without output, so ``decode`` restarts it.
+        """
+
+        process = self._process
+        if process is None:
+            raise BrokenPipeError("el decodificador no está en ejecución")
+        deadline = time.monotonic() + self.stall_timeout
+        with self._cond:
+            while process.poll() is None and self._unread_input(process):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("el decodificador dejó de leer la entrada")
+                self._cond.wait(timeout=min(remaining, self.poll_seconds))
+            size = -1
+            while len(self._pending) != size:
+                size = len(self._pending)
+                self._cond.wait(timeout=self.settle_seconds)
+            if not self._pending and process.poll() is not None:
+                raise BrokenPipeError("el decodificador terminó sin producir audio")
+            usable = len(self._pending) - len(self._pending) % 2
+            data = bytes(self._pending[:usable])
+            del self._pending[:usable]
+        return data
+
+    def _restart(self, prime: bool) -> None:
+        self._stop()
+        self.restarts += 1
+        self._start()
+        if prime and self._header is not None:
+            self._write(self._header)
+            self._collect()
+
+    def decode(self, chunk: bytes) -> np.ndarray:
+        """Decode one chunk and return the new int16 samples."""
+
+        if self._closed:
+            raise StreamDecoderError("el decodificador está cerrado")
+        started = time.perf_counter()
+        is_header = self._header is None
+        if is_header:
+            self._header = bytes(chunk)
+        try:
+            if self._process is None:
+                self._start()
+            self._write(chunk)
+            data = self._collect()
+        except OSError as exc:
+            # Covers write errors, a dead process and a stalled one alike.
+            logger.warning("Reiniciando el decodificador en vivo: %s", exc)
+            try:
+                self._restart(prime=not is_header)
+                self._write(chunk)
+                data = self._collect()
+            except OSError as retry_exc:
+                self._stop()
+                raise StreamDecoderError(
+                    f"No se pudo reiniciar el decodificador: {retry_exc}"
+                ) from retry_exc
+        samples = np.frombuffer(data, dtype="<i2")
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.chunks += 1
+        self.last_decode_ms = elapsed_ms
+        self._total_decode_ms += elapsed_ms
+        return samples
+
+    def close(self) -> None:
+        self._closed = True
+        self._stop()
@@ -0,0 +1,193 @@
+"""Worker processes that run queued transcription jobs.
+
+Usage: ``python -m app.worker --processes 2``. Each process leases jobs from
+the queue configured by ``transcription_queue_path`` and heartbeats while the
+model runs, so a killed worker's job is picked up by another one.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from .config import settings
+from .jobs import LEASE_EXPIRED_ERROR, Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+def create_job_queue() -> JobQueue:
+    return JobQueue(
+        settings.transcription_queue_path,
+        lease_seconds=settings.transcription_job_lease_seconds,
+        max_attempts=settings.transcription_job_max_attempts,
+        backoff_seconds=settings.transcription_job_backoff_seconds,
+    )
+
+
+class JobWorker:
+    """Lease jobs one at a time and run them through ``process_transcription``."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.queue = queue
+        self.worker_id = worker_id or f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.poll_interval = poll_interval
+
+    def _heartbeat(self, job: Job, done: threading.Event, lost: threading.Event) -> None:
+        interval = max(0.5, self.queue.lease_seconds / 3.0)
+        while not done.wait(interval):
+            if not self.queue.heartbeat(job.id, self.worker_id):
+                logger.warning("El trabajo %s perdió su concesión", job.id)
+                lost.set()
+                return
+
+    def expire_abandoned(self) -> None:
+        """Requeue jobs of dead workers; fail those with no attempts left."""
+
+        exhausted = self.queue.expire_leases()
+        if not exhausted:
+            return
+        from .routers.transcriptions import mark_transcription_failed
+
+        for transcription_id in exhausted:
+            mark_transcription_failed(transcription_id, LEASE_EXPIRED_ERROR)
+
+    def run_job(self, job: Job) -> bool:
+        """Run a leased job; returns ``True`` when it finished successfully.
+
+        If the lease is lost mid-run (another worker took the job over), the
+        result is not persisted and the job is left to its new owner.
+        """
+
+        from .routers.transcriptions import (
+            DEBUG_EVENT_LOG,
+            mark_transcription_failed,
+            process_transcription,
+        )
+
+        done = threading.Event()
+        lost = threading.Event()
+        beater = threading.Thread(
+            target=self._heartbeat,
+            args=(job, done, lost),
+            name=f"job-heartbeat-{job.id}",
+            daemon=True,
+        )
+        beater.start()
+        try:
+            process_transcription(
+                job.transcription_id, raise_errors=True, cancelled=lost.is_set, **job.payload
+            )
+        except Exception as exc:
+            if lost.is_set():
+                logger.warning("Trabajo %s abandonado tras perder la concesión: %s", job.id, exc)
+                return False
+            error = str(exc) or exc.__class__.__name__
+            if self.queue.fail(job.id, self.worker_id, error):
+                logger.warning(
+                    "Trabajo %s falló (intento %s/%s); se reintentará: %s",
+                    job.id,
+                    job.attempts,
+                    job.max_attempts,
+                    error,
+                )
+            else:
+                mark_transcription_failed(job.transcription_id, error)
+            return False
+        finally:
+            done.set()
+            beater.join()
+            DEBUG_EVENT_LOG.flush()
+        if lost.is_set() or not self.queue.complete(job.id, self.worker_id):
+            logger.warning("Trabajo %s terminado sin concesión; no se marca como hecho", job.id)
+            return False
+        return True
+
+    def run_once(self, job_id: Optional[int] = None, group_id: Optional[str] = None) -> bool:
+        """Lease and run one job; ``False`` when nothing was runnable."""
+
+        self.expire_abandoned()
+        job = self.queue.lease(self.worker_id, job_id=job_id, group_id=group_id)
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
+
+    def run_group(self, group_id: str) -> int:
+        """Run the runnable jobs of ``group_id`` back to back, longest first.
+
+        One worker draining the group keeps a single transcriber warm for the
+        whole batch instead of each file racing to load its own. Retries that
+        are still backing off are left to the regular workers.
+        """
+
+        completed = 0
+        while self.run_once(group_id=group_id):
+            completed += 1
+        return completed
+
+    def run(self, stop: Optional[threading.Event] = None, until_empty: bool = False) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if self.run_once():
+                continue
+            if until_empty and not self.queue.pending_count():
+                return
+            stop.wait(self.poll_interval)
+
+
+def _worker_main(poll_interval: float) -> None:
+    logging.basicConfig(level=settings.log_level)
+    queue = create_job_queue()
+    worker = JobWorker(queue, poll_interval=poll_interval)
+    logger.info("Worker de transcripción %s iniciado", worker.worker_id)
+    worker.run()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run transcription job workers")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    logging.basicConfig(level=settings.log_level)
+    if args.processes <= 1:
+        _worker_main(args.poll_interval)
+        return
+    context = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.Process] = []
+    for index in range(args.processes):
+        process = context.Process(
+            target=_worker_main, args=(args.poll_interval,), name=f"transcription-worker-{index}"
+        )
+        process.start()
+        processes.append(process)
+    try:
+        while True:
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.warning("Worker %s terminó (código %s); reiniciando", process.name, process.exitcode)
+                    replacement = context.Process(
+                        target=_worker_main, args=(args.poll_interval,), name=process.name
+                    )
+                    replacement.start()
+                    processes[index] = replacement
+            time.sleep(1.0)
+    except KeyboardInterrupt:  # pragma: no cover - CLI entry point
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    main()
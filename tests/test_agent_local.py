@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from agent_local.asr import AudioChunk, IncrementalTranscriber, Segment
+from agent_local.capture import CaptureBuffer, SyntheticSource
+from agent_local.config import AgentConfig
+from agent_local.session import LocalAgent
+
+
+class _PackedModel:
+    """Fake faster-whisper model that returns one word per non-silent region."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def transcribe(self, audio, **_kwargs):
+        self.calls += 1
+        sample_rate = 16000
+        active = np.abs(audio) > 0.01
+        words = []
+        idx = 0
+        while idx < len(active):
+            if not active[idx]:
+                idx += 1
+                continue
+            end = idx
+            while end < len(active) and active[end]:
+                end += 1
+            words.append(SimpleNamespace(word=f" w{len(words)}", start=idx / sample_rate, end=end / sample_rate))
+            idx = end
+        segment = SimpleNamespace(
+            text="".join(word.word for word in words),
+            start=words[0].start,
+            end=words[-1].end,
+            avg_logprob=-0.2,
+            words=words,
+        )
+        return [segment], None
+
+
+def _tone(seconds: float, sample_rate: int = 16000) -> np.ndarray:
+    samples = int(seconds * sample_rate)
+    return (0.3 + 0.1 * np.sin(np.linspace(0, 200 * np.pi * seconds, samples))).astype(np.float32)
+
+
+def test_transcribe_batch_maps_segments_back_to_chunks():
+    transcriber = IncrementalTranscriber.__new__(IncrementalTranscriber)
+    transcriber.model_size = "tiny"
+    transcriber._device = "cpu"
+    transcriber._model = _PackedModel()
+
+    chunks = [
+        AudioChunk(audio=_tone(1.0), sample_rate=16000, start_ts=10.0),
+        AudioChunk(audio=_tone(0.5), sample_rate=16000, start_ts=42.0),
+        AudioChunk(audio=np.zeros(0, dtype=np.float32), sample_rate=16000, start_ts=50.0),
+        AudioChunk(audio=_tone(2.0), sample_rate=16000, start_ts=100.0),
+    ]
+    results = transcriber.transcribe_batch(chunks)
+
+    assert transcriber._model.calls == 1
+    assert [len(segments) for segments in results] == [1, 1, 0, 1]
+    assert [segments[0].text for segments in (results[0], results[1], results[3])] == ["w0", "w1", "w2"]
+    for chunk, segments in zip(chunks, results):
+        for segment in segments:
+            assert abs(segment.start - chunk.start_ts) < 1e-3
+            assert abs(segment.end - (chunk.start_ts + chunk.duration)) < 1e-3
+
+
+def test_transcribe_batch_splits_on_max_duration():
+    transcriber = IncrementalTranscriber.__new__(IncrementalTranscriber)
+    transcriber.model_size = "tiny"
+    transcriber._device = "cpu"
+    transcriber._model = _PackedModel()
+
+    chunks = [AudioChunk(audio=_tone(2.0), sample_rate=16000, start_ts=float(i * 3)) for i in range(4)]
+    results = transcriber.transcribe_batch(chunks, max_batch_seconds=5.0)
+
+    assert transcriber._model.calls == 2
+    assert all(len(segments) == 1 for segments in results)
+
+
+def test_transcribe_batch_keeps_sample_rates_apart():
+    transcriber = IncrementalTranscriber.__new__(IncrementalTranscriber)
+    transcriber.model_size = "tiny"
+    transcriber._device = "cpu"
+    transcriber._model = _PackedModel()
+
+    chunks = [
+        AudioChunk(audio=_tone(1.0), sample_rate=16000, start_ts=0.0),
+        AudioChunk(audio=_tone(1.0, 8000), sample_rate=8000, start_ts=5.0),
+        AudioChunk(audio=_tone(1.0), sample_rate=16000, start_ts=10.0),
+    ]
+    results = transcriber.transcribe_batch(chunks)
+
+    assert transcriber._model.calls == 2
+    assert all(len(segments) == 1 for segments in results)
+    assert [segments[0].text for segments in (results[0], results[2])] == ["w0", "w1"]
+
+
+class _LabelTranscriber:
+    def __init__(self, label: str) -> None:
+        self.label = label
+
+    def transcribe(self, audio, sample_rate: int, start_ts: float):
+        return [Segment(text=self.label, start=start_ts, end=start_ts + len(audio) / sample_rate, confidence=0.8, speaker=None)]
+
+
+def test_two_tier_emits_rev2_with_same_segment_id(tmp_path):
+    config = AgentConfig(
+        transcript_id="tr_two_tier",
+        org_id="org_1",
+        storage_dir=tmp_path,
+        websocket_url="ws://testserver/sync",
+        jwt="token",
+        two_tier=True,
+    )
+    agent = LocalAgent(
+        config,
+        transcriber=_LabelTranscriber("final"),
+        provisional_transcriber=_LabelTranscriber("draft"),
+    )
+    try:
+        audio = np.sin(np.linspace(0, 8 * np.pi, agent.sample_rate * 2)).astype(np.float32)
+        provisional = agent.process_audio(audio, start_ts=0.0)
+        assert provisional and all(delta.rev == 1 and delta.text == "draft" for delta in provisional)
+        assert agent.metrics()["rev1_latency_ms"] is not None
+
+        assert agent.wait_for_refinements(timeout=5.0)
+        assert agent.metrics()["rev2_backlog"] == 0
+
+        stored = agent.delta_queue.list_all()
+        finals = {delta.segment_id: delta for delta in stored if delta.rev == 2}
+        assert set(finals) == {delta.segment_id for delta in provisional}
+        assert all(delta.text == "final" for delta in finals.values())
+
+        exports = agent.export_session()
+        assert "draft" not in exports["md"].read_text(encoding="utf-8")
+    finally:
+        agent.close()
+
+
+def test_capture_buffer_wraps_with_zero_copy_views():
+    buffer = CaptureBuffer(capacity=10)
+    buffer.write(np.arange(8, dtype=np.float32))
+    buffer.release(6)
+    assert buffer.write(np.arange(8, 14, dtype=np.float32)) == 0
+
+    window = buffer.view(6, 8)
+    assert np.shares_memory(window, buffer._data)
+    assert window.tolist() == list(range(6, 14))
+
+    lost = buffer.write(np.arange(14, 20, dtype=np.float32))
+    assert lost == 4
+    assert buffer.overruns == 1
+    assert buffer.view(buffer.oldest, 10).tolist() == list(range(10, 20))
+
+
+def test_process_capture_chunks_with_overlap_without_duplicates(tmp_path):
+    config = AgentConfig(
+        transcript_id="tr_capture",
+        org_id="org_1",
+        storage_dir=tmp_path,
+        websocket_url="ws://testserver/sync",
+        jwt="token",
+        chunk_size_seconds=3.0,
+        chunk_overlap_seconds=1.0,
+        capture_buffer_seconds=8.0,
+    )
+    agent = LocalAgent(config, transcriber=_LabelTranscriber("hola"))
+    deltas = agent.process_capture(SyntheticSource(duration_seconds=12.0))
+
+    assert deltas
+    spans = sorted((delta.t0, delta.t1) for delta in deltas)
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert start >= previous_end - 1e-3
+    assert spans[-1][1] <= 12.0 + 1e-3
+    stats = agent.metrics()
+    assert stats["overruns"] == 0
+
+
+def test_detect_hardware_caches_on_disk_and_invalidates(tmp_path, monkeypatch):
+    from agent_local import hardware
+
+    cache_path = tmp_path / "hardware.json"
+    calls = []
+
+    def fake_probe():
+        calls.append(1)
+        return hardware.HardwareProfile(device="cpu", compute_type="int8", source="environment")
+
+    monkeypatch.setattr(hardware, "_probe", fake_probe)
+    hardware._MEMO.clear()
+
+    first = hardware.detect_hardware(cache_path)
+    assert cache_path.exists()
+    hardware._MEMO.clear()
+    assert hardware.detect_hardware(cache_path) == first
+    assert len(calls) == 1
+
+    hardware._MEMO.clear()
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "-1")
+    hardware.detect_hardware(cache_path)
+    assert len(calls) == 2
+    hardware._MEMO.clear()
+
+
+def test_calibration_persists_profile_picked_up_by_agent(tmp_path, monkeypatch):
+    from agent_local import calibration
+    from agent_local.hardware import HardwareProfile
+
+    # The agent must detect the CPU profile that was calibrated, on any host.
+    monkeypatch.setenv("AGENT_DEVICE", "cpu")
+
+    hardware = HardwareProfile(device="cpu", compute_type="int8")
+    measured = {"small": 1.9, "base": 0.9, "tiny": 0.3}
+
+    def factory(model_size, compute_type, cpu_threads, profile):
+        return SimpleNamespace(model_size=model_size, compute_type=compute_type, cpu_threads=cpu_threads)
+
+    def measure(transcriber, clip, sample_rate):
+        assert len(clip) == 2 * sample_rate
+        penalty = 0.0 if transcriber.compute_type == "int8" else 0.2
+        return measured[transcriber.model_size] + penalty
+
+    profile = calibration.calibrate(
+        tmp_path, hardware=hardware, factory=factory, measure=measure, clip_seconds=2.0
+    )
+    assert (profile.model_size, profile.compute_type, profile.meets_target) == ("base", "int8", True)
+    assert calibration.load_tuning(tmp_path, HardwareProfile(device="cuda", compute_type="float16")) is None
+
+    config = AgentConfig(
+        transcript_id="tr_tuned",
+        org_id="org_1",
+        storage_dir=tmp_path,
+        websocket_url="ws://testserver/sync",
+        jwt="token",
+    )
+    agent = LocalAgent(config)
+    assert agent.hardware.device == "cpu"
+    assert agent.transcriber.model_size == "base"
+    assert agent.transcriber.cpu_threads == profile.cpu_threads
+
+    explicit = LocalAgent(
+        AgentConfig(
+            transcript_id="tr_explicit",
+            org_id="org_1",
+            storage_dir=tmp_path,
+            websocket_url="ws://testserver/sync",
+            jwt="token",
+            model_size="small",
+        )
+    )
+    # Asking for the default size explicitly still wins over the calibration.
+    assert explicit.transcriber.model_size == "small"
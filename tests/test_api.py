@@ -3,8 +3,10 @@ from __future__ import annotations
 import asyncio
 import inspect
 import io
+import json
 import os
 import sys
+import time
 import typing
 import wave
 from pathlib import Path
@@ -109,6 +111,76 @@ def _run_background_tasks(background_tasks: BackgroundTasks) -> None:
     asyncio.run(runner())
 
 
+_TONE_WORDS = ["uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho"]
+
+
+def _tone_frequency(index: int) -> float:
+    return 400.0 + 150.0 * index
+
+
+class _ToneTranscriber:
+    """Recognises each tone burst of a synthetic recording as one word."""
+
+    seconds_per_audio_second = 0.02
+
+    def __init__(self, model_size, device):
+        self.device = device
+
+    def transcribe(self, audio, language=None, *, beam_size=None, decode_options=None, debug_callback=None):
+        import numpy as np
+
+        from app.utils.long_audio import load_pcm
+        from app.whisper_service import SegmentResult, TranscriptionResult
+
+        samples = load_pcm(Path(audio)).astype(np.float32)
+        duration = len(samples) / 16_000
+        time.sleep(duration * self.seconds_per_audio_second)
+        frame = 160
+        frames = len(samples) // frame
+        active = np.abs(samples[: frames * frame]).reshape(frames, frame).max(axis=1) > 1000
+        edges = np.diff(np.concatenate([[0], active.astype(np.int8), [0]]))
+        segments = []
+        for first, last in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            burst = samples[first * frame : last * frame]
+            if len(burst) < frame * 3:
+                continue
+            crossings = np.count_nonzero(np.diff(np.signbit(burst)))
+            frequency = crossings / 2 / (len(burst) / 16_000)
+            index = int(round((frequency - 400.0) / 150.0))
+            word = _TONE_WORDS[min(max(index, 0), len(_TONE_WORDS) - 1)]
+            segments.append(SegmentResult(start=first * frame / 16_000, end=last * frame / 16_000, text=word))
+        return TranscriptionResult(
+            text=" ".join(segment.text for segment in segments),
+            segments=segments,
+            language=language or "es",
+            duration=duration,
+            runtime_seconds=duration * self.seconds_per_audio_second,
+        )
+
+
+def _write_tone_wav(path: Path, count: int, seed: int = 7):
+    """Write ``count`` random tone words; returns the samples and the reference text."""
+
+    import random
+
+    import numpy as np
+
+    rng = random.Random(seed)
+    words = [rng.randrange(len(_TONE_WORDS)) for _ in range(count)]
+    tone = np.arange(int(0.35 * 16_000)) / 16_000
+    gap = np.zeros(int(0.15 * 16_000))
+    signal = np.concatenate(
+        [part for index in words for part in (np.sin(2 * np.pi * _tone_frequency(index) * tone), gap)]
+    )
+    samples = (signal * 12_000).astype(np.int16)
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16_000)
+        wav_file.writeframes(samples.tobytes())
+    return samples, " ".join(_TONE_WORDS[index] for index in words)
+
+
 @pytest.fixture()
 def test_env(tmp_path_factory: pytest.TempPathFactory):
     tmp_dir = tmp_path_factory.mktemp("data")
@@ -129,7 +201,14 @@ def test_env(tmp_path_factory: pytest.TempPathFactory):
     config.settings.whisper_model_size = "large-v2"
     config.settings.audio_cache_dir = tmp_dir / "audio-cache"
     config.settings.audio_cache_dir.mkdir(parents=True, exist_ok=True)
+    config.settings.result_cache_path = tmp_dir / "result-cache.db"
     whisper_service._transcriber_cache.clear()
+    from app.routers import transcriptions
+
+    transcriptions.DEBUG_EVENT_LOG.root = tmp_dir / "debug-events"
+    transcriptions.DEBUG_EVENT_LOG.root.mkdir(parents=True, exist_ok=True)
+    transcriptions._result_caches.clear()
+    transcriptions.MODEL_POOL.clear()
     return tmp_dir
 
 
@@ -211,6 +290,859 @@ def test_transcription_lifecycle(test_env):
     assert not txt_path.exists()
 
 
+def test_job_queue_retries_with_backoff_and_recovers_leases(test_env, tmp_path, monkeypatch):
+    _prepare_database()
+    from app.database import get_session
+    from contextlib import closing
+
+    from app.jobs import DONE, FAILED, LEASED, QUEUED, JobQueue
+    from app.models import Transcription, TranscriptionStatus
+    from app.routers import transcriptions
+    from app.worker import JobWorker
+
+    queue = JobQueue(tmp_path / "jobs.db", lease_seconds=30, max_attempts=2, backoff_seconds=0)
+    with get_session() as session:
+        transcription = Transcription(
+            original_filename="clase.wav",
+            stored_path=str(tmp_path / "clase.wav"),
+            status=TranscriptionStatus.PROCESSING.value,
+            text="",
+            speakers=[],
+        )
+        session.add(transcription)
+        session.commit()
+        transcription_id = transcription.id
+
+    calls = []
+
+    def flaky(transcription_id, language, model_size, device_preference, beam_size, raise_errors=False, **kwargs):
+        calls.append((transcription_id, language, raise_errors))
+        raise RuntimeError("GPU ocupada")
+
+    monkeypatch.setattr(transcriptions, "process_transcription", flaky)
+    payload = {"language": "es", "model_size": "tiny", "device_preference": "cpu", "beam_size": None}
+    job_id = queue.enqueue(transcription_id, payload)
+    worker = JobWorker(queue, worker_id="w1")
+
+    assert worker.run_once()
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED and job["attempts"] == 1
+    assert job["last_error"] == "GPU ocupada"
+    with get_session() as session:
+        assert session.get(Transcription, transcription_id).status == TranscriptionStatus.PROCESSING.value
+
+    assert worker.run_once()
+    assert queue.get(job_id)["status"] == FAILED
+    assert calls == [(transcription_id, "es", True)] * 2
+    with get_session() as session:
+        failed = session.get(Transcription, transcription_id)
+        assert failed.status == TranscriptionStatus.FAILED.value
+        assert failed.error_message == "GPU ocupada"
+    assert not worker.run_once()
+
+    assert queue.backoff_for(1) == 0
+    assert JobQueue(tmp_path / "other.db", backoff_seconds=5).backoff_for(3) == 20
+
+    def crash(worker_id):
+        queue.lease_seconds = -1
+        leased = queue.lease(worker_id)
+        queue.lease_seconds = 30
+        return leased
+
+    stuck_id = queue.enqueue(transcription_id, payload)
+    assert crash("crashed-worker").id == stuck_id
+    assert queue.lease("w2") is None
+    assert not queue.heartbeat(stuck_id, "w2")
+    monkeypatch.setattr(transcriptions, "process_transcription", lambda *args, **kwargs: None)
+    assert worker.run_once(job_id=stuck_id)
+    recovered = queue.get(stuck_id)
+    assert recovered["status"] == DONE and recovered["attempts"] == 2
+    assert not queue.complete(stuck_id, "crashed-worker")
+
+    # A job that kills its worker every time stops after max_attempts.
+    with get_session() as session:
+        session.get(Transcription, transcription_id).status = TranscriptionStatus.PROCESSING.value
+        session.commit()
+    poison_id = queue.enqueue(transcription_id, payload)
+    assert crash("w3").id == poison_id
+    assert queue.expire_leases() == []
+    assert queue.get(poison_id)["status"] == QUEUED
+    assert crash("w4").id == poison_id
+    assert not worker.run_once()
+    poisoned = queue.get(poison_id)
+    assert poisoned["status"] == FAILED and poisoned["attempts"] == 2
+    with get_session() as session:
+        assert session.get(Transcription, transcription_id).status == TranscriptionStatus.FAILED.value
+
+    # A worker whose lease is taken over neither persists nor completes.
+    taken_id = queue.enqueue(transcription_id, payload)
+    queue.lease_seconds = 1.5
+    seen = []
+
+    def slow(*args, cancelled, **kwargs):
+        with closing(queue._connect()) as conn:
+            conn.execute(
+                "UPDATE transcription_jobs SET lease_owner = 'w5' WHERE id = ?", (taken_id,)
+            )
+        deadline = time.time() + 5
+        while not cancelled() and time.time() < deadline:
+            time.sleep(0.05)
+        seen.append(cancelled())
+
+    monkeypatch.setattr(transcriptions, "process_transcription", slow)
+    assert worker.run_once(job_id=taken_id)
+    assert seen == [True]
+    taken = queue.get(taken_id)
+    assert taken["status"] == LEASED and taken["lease_owner"] == "w5"
+
+    # Inline runners lease under ids of their own.
+    assert transcriptions._inline_worker().worker_id != transcriptions._inline_worker().worker_id
+
+    # Rows left processing by the pre-queue runner get a job, or fail without audio.
+    startup_queue = JobQueue(tmp_path / "startup.db")
+    monkeypatch.setattr(transcriptions, "JOB_QUEUE", startup_queue)
+    (tmp_path / "huerfana.wav").write_bytes(_make_silent_wav_bytes(100))
+    with get_session() as session:
+        orphans = [
+            Transcription(
+                original_filename=name,
+                stored_path=str(tmp_path / name),
+                status=TranscriptionStatus.PROCESSING.value,
+                text="",
+                speakers=[],
+            )
+            for name in ("huerfana.wav", "perdida.wav")
+        ]
+        session.add_all(orphans)
+        session.commit()
+        orphan_id, lost_id = (row.id for row in orphans)
+    transcriptions._recover_unqueued_transcriptions()
+    transcriptions._recover_unqueued_transcriptions()
+    assert startup_queue.transcriptions_with_jobs([orphan_id, lost_id]) == {orphan_id}
+    with closing(startup_queue._connect()) as conn:
+        # Running it again does not enqueue the row twice.
+        count = conn.execute(
+            "SELECT COUNT(*) FROM transcription_jobs WHERE transcription_id = ?", (orphan_id,)
+        ).fetchone()[0]
+    assert count == 1
+    with get_session() as session:
+        assert session.get(Transcription, lost_id).status == TranscriptionStatus.FAILED.value
+
+
+def test_long_audio_split_and_stitch_matches_single_pass(test_env, tmp_path):
+    import numpy as np
+
+    from app.utils.long_audio import plan_pieces, transcribe_in_pieces, word_error_rate
+
+    audio_path = tmp_path / "largo.wav"
+    samples, reference = _write_tone_wav(audio_path, count=60)
+
+    pieces = plan_pieces(samples, piece_seconds=10.1, overlap_seconds=1.0, search_seconds=1.0)
+    assert len(pieces) == 3
+    for piece in pieces[1:]:
+        assert not np.any(samples[piece.own_start - 80 : piece.own_start + 80])
+
+    single = _ToneTranscriber("tiny", "cpu").transcribe(str(audio_path))
+
+    options = dict(
+        model_size="tiny",
+        device="cpu",
+        workers=3,
+        piece_seconds=10.1,
+        transcriber_factory=_ToneTranscriber,
+        mp_context="fork",
+    )
+    stitched = transcribe_in_pieces(audio_path, overlap_seconds=1.0, search_seconds=1.0, **options)
+    naive = transcribe_in_pieces(audio_path, overlap_seconds=0.0, search_seconds=0.0, **options)
+
+    assert word_error_rate(reference, single.text) == 0.0
+    assert word_error_rate(reference, stitched.text) == 0.0
+    assert word_error_rate(reference, naive.text) > 0.0
+    assert stitched.duration == pytest.approx(len(samples) / 16_000)
+    starts = [segment.start for segment in stitched.segments]
+    assert starts == sorted(starts)
+    assert stitched.segments[-1].end == pytest.approx(single.segments[-1].end, abs=0.02)
+
+
+def test_process_transcription_splits_long_audio_into_pieces(test_env, tmp_path, monkeypatch):
+    _prepare_database()
+    from app.config import settings
+    from app.database import get_session
+    from app.models import Transcription, TranscriptionStatus
+    from app.routers import transcriptions
+    from app.utils import long_audio
+
+    audio_path = tmp_path / "clase-larga.wav"
+    _, reference = _write_tone_wav(audio_path, count=40)
+    calls = []
+
+    def pieces_with_tones(audio, **kwargs):
+        calls.append(kwargs)
+        kwargs.update(transcriber_factory=_ToneTranscriber, mp_context="fork")
+        return long_audio.transcribe_in_pieces(audio, **kwargs)
+
+    monkeypatch.setattr(transcriptions, "transcribe_in_pieces", pieces_with_tones)
+    parent_loads = []
+    monkeypatch.setattr(
+        transcriptions.MODEL_POOL, "acquire", lambda *args: parent_loads.append(args)
+    )
+    monkeypatch.setattr(settings, "whisper_parallel_pipelines", 2)
+    monkeypatch.setattr(settings, "whisper_long_audio_seconds", 10.0)
+    monkeypatch.setattr(settings, "whisper_long_audio_piece_seconds", 8.0)
+    monkeypatch.setattr(settings, "whisper_long_audio_overlap_seconds", 1.0)
+
+    background = BackgroundTasks()
+    with get_session() as session:
+        response = transcriptions.create_transcription(
+            background_tasks=background,
+            upload=_make_upload("clase-larga.wav", data=audio_path.read_bytes()),
+            language="es",
+            subject=None,
+            destination_folder="largas",
+            model_size=None,
+            device_preference=None,
+            beam_size=None,
+            bypass_result_cache=True,
+            session=session,
+        )
+    _run_background_tasks(background)
+
+    assert len(calls) == 1 and calls[0]["workers"] == 2
+    # Only the piece processes load the model.
+    assert parent_loads == []
+    with get_session() as session:
+        row = session.get(Transcription, response.id)
+        assert row.status == TranscriptionStatus.COMPLETED.value, row.error_message
+        assert row.text == reference
+
+
+def test_media_probe_reads_wav_headers_without_decoding(tmp_path, monkeypatch):
+    import struct
+
+    from app.utils import media
+
+    wav_path = tmp_path / "clase.wav"
+    wav_path.write_bytes(_make_silent_wav_bytes(2500))
+    info = media.probe_media(wav_path)
+    assert info.duration == pytest.approx(2.5)
+    assert (info.sample_rate, info.channels, info.source) == (16_000, 1, "riff")
+
+    raw = _make_silent_wav_bytes(1000)
+    fmt_chunk = raw[12:36]
+    pcm = raw[44:]
+    list_chunk = b"LIST" + struct.pack("<I", 3) + b"abc" + b"\x00"
+    streamed = b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE" + list_chunk + fmt_chunk
+    streamed += b"data" + struct.pack("<I", 0xFFFFFFFF) + pcm
+    streamed_path = tmp_path / "stream.wav"
+    streamed_path.write_bytes(streamed)
+    assert media.probe_wav(streamed_path).duration == pytest.approx(1.0)
+
+    other = tmp_path / "nota.mp3"
+    other.write_bytes(b"ID3" + b"\x00" * 64)
+    assert media.probe_wav(other) is None
+    monkeypatch.setattr(media, "is_ffprobe_available", lambda: False)
+    with pytest.raises(media.MediaProbeError):
+        media.probe_media(other)
+
+
+def test_partial_text_writer_coalesces_progress_commits(test_env):
+    _prepare_database()
+    from app.database import get_session
+    from app.models import Transcription, TranscriptionStatus
+    from app.routers.transcriptions import PartialTextWriter
+
+    with get_session() as session:
+        transcription = Transcription(
+            original_filename="clase.wav",
+            stored_path="",
+            status=TranscriptionStatus.PROCESSING.value,
+            text="",
+            speakers=[],
+        )
+        session.add(transcription)
+        session.commit()
+        transcription_id = transcription.id
+
+    def stored_text():
+        with get_session() as session:
+            return session.get(Transcription, transcription_id).text
+
+    writer = PartialTextWriter(transcription_id, interval_seconds=60.0, max_segments=25)
+    words = []
+    for index in range(110):
+        words.append(f"palabra{index}")
+        writer.update(" ".join(words))
+    assert writer.writes == 4
+    assert stored_text() == " ".join(words[:100])
+    writer.close()
+    assert writer.writes == 5
+    assert stored_text() == " ".join(words)
+    writer.update("ignorado tras cerrar")
+    assert stored_text() == " ".join(words)
+
+    trailing = PartialTextWriter(transcription_id, interval_seconds=0.05, max_segments=1000)
+    trailing.update("inicio")
+    trailing.update("inicio del texto")
+    deadline = time.monotonic() + 2.0
+    while stored_text() != "inicio del texto" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stored_text() == "inicio del texto"
+    trailing.close()
+
+
+def test_normalized_audio_cache_single_flight_and_lru(tmp_path):
+    import threading
+
+    from app.utils.audio_cache import NormalizedAudioCache
+
+    conversions = []
+    release = threading.Event()
+
+    def normalize(source):
+        conversions.append(source.name)
+        release.wait(timeout=5)
+        output = tmp_path / f"{source.stem}-norm.wav"
+        output.write_bytes(source.read_bytes() * 2)
+        return output
+
+    cache = NormalizedAudioCache(tmp_path / "cache", normalize, max_bytes=2_500)
+    first = tmp_path / "a.wav"
+    first.write_bytes(b"a" * 500)
+    copy = tmp_path / "a-copia.wav"
+    copy.write_bytes(b"a" * 500)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda src=src: results.append(cache.get(src)))
+        for src in (first, copy, first, copy)
+    ]
+    # The first thread leads the conversion; the rest arrive while it is held.
+    threads[0].start()
+    while not conversions:
+        time.sleep(0.005)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(conversions) == 1
+    assert len(set(results)) == 1 and results[0].read_bytes() == b"a" * 1000
+    assert cache.misses == 1
+    assert not list((tmp_path / "cache").rglob("*.tmp"))
+
+    second = tmp_path / "b.wav"
+    second.write_bytes(b"b" * 500)
+    third = tmp_path / "c.wav"
+    third.write_bytes(b"c" * 500)
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+    assert cache.total_bytes <= 2_500
+    assert not cache.path_for(cache.key_for(second)).exists()
+    assert cache.path_for(cache.key_for(first)).exists()
+    assert conversions == ["a.wav", "b.wav", "c.wav"]
+
+    reloaded = NormalizedAudioCache(tmp_path / "cache", normalize, max_bytes=2_500)
+    assert reloaded.get(third) == cache.path_for(cache.key_for(third))
+    assert conversions == ["a.wav", "b.wav", "c.wav"]
+
+
+def test_normalized_audio_cache_shared_between_processes(tmp_path):
+    from app.utils.audio_cache import NormalizedAudioCache
+
+    conversions = []
+
+    def normalize(source):
+        conversions.append(source.name)
+        output = tmp_path / f"{source.stem}-norm.wav"
+        output.write_bytes(source.read_bytes() * 2)
+        return output
+
+    api = NormalizedAudioCache(tmp_path / "cache", normalize)
+    worker = NormalizedAudioCache(tmp_path / "cache", normalize)
+    source = tmp_path / "a.wav"
+    source.write_bytes(b"a" * 500)
+
+    published = worker.get(source)
+    assert not (tmp_path / "a-norm.wav").exists()
+    assert api.get(source) == published
+    assert conversions == ["a.wav"]
+    assert (api.hits, api.misses) == (1, 0)
+    assert api.total_bytes == published.stat().st_size == 1000
+
+
+def test_uploads_ingest_in_one_pass_and_resume_in_chunks(test_env, monkeypatch):
+    _prepare_database()
+    import hashlib
+
+    from fastapi import HTTPException
+
+    from app.config import settings
+    from app.database import get_session
+    from app.models import Transcription
+    from app.routers import transcriptions
+    from app.utils.ingest import (
+        ChunkedUploadStore,
+        UploadOffsetError,
+        UploadTooLargeError,
+        ingest_stream,
+    )
+
+    payload = _make_silent_wav_bytes(500)
+    digest = hashlib.sha256(payload).hexdigest()
+
+    result = ingest_stream(io.BytesIO(payload), test_env / "single" / "a.wav", len(payload))
+    assert result.sha256 == digest and result.path.read_bytes() == payload
+    with pytest.raises(UploadTooLargeError):
+        ingest_stream(io.BytesIO(payload), test_env / "single" / "b.wav", len(payload) - 1)
+    assert sorted(p.name for p in (test_env / "single").iterdir()) == ["a.wav"]
+
+    async def chunks(data: bytes, size: int = 1000):
+        for start in range(0, len(data), size):
+            yield data[start : start + size]
+
+    store = ChunkedUploadStore(test_env / "partial", max_bytes=len(payload))
+    upload_id = store.create("clase.wav", "audio/wav", len(payload))["upload_id"]
+    half = len(payload) // 2
+    assert asyncio.run(store.append(upload_id, 0, chunks(payload[:half]))) == half
+    with pytest.raises(UploadOffsetError) as excinfo:
+        asyncio.run(store.append(upload_id, 0, chunks(payload[half:])))
+    assert excinfo.value.expected == half
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(store.append(upload_id, half, chunks(payload[half:] + b"x")))
+    assert store.offset(upload_id) == half
+    # A restarted process has no running hash and reads the file back once.
+    store = ChunkedUploadStore(test_env / "partial", max_bytes=len(payload))
+    assert asyncio.run(store.append(upload_id, half, chunks(payload[half:]))) == len(payload)
+    committed = store.commit(upload_id, test_env / "committed" / "clase.wav")
+    assert committed.sha256 == digest and committed.path.read_bytes() == payload
+    with pytest.raises(KeyError):
+        store.offset(upload_id)
+
+    # Abandoned uploads go once their last append is older than the TTL.
+    store = ChunkedUploadStore(test_env / "partial", max_bytes=len(payload), ttl_seconds=60)
+    stale = store.create("vieja.wav")["upload_id"]
+    fresh = store.create("nueva.wav")["upload_id"]
+    os.utime(test_env / "partial" / stale / "data.part", (time.time() - 120,) * 2)
+    assert store.sweep() == 1
+    assert store.offset(fresh) == 0
+    with pytest.raises(KeyError):
+        store.offset(stale)
+
+    def shrunk_meanwhile(destination):
+        raise UploadOffsetError(half)
+
+    with get_session() as session, pytest.raises(HTTPException) as excinfo:
+        transcriptions._create_transcription_job(
+            session,
+            BackgroundTasks(),
+            "carrera.wav",
+            shrunk_meanwhile,
+            None,
+            None,
+            "subidas",
+        )
+    assert excinfo.value.status_code == 409
+    assert excinfo.value.detail["offset"] == half
+    with get_session() as session:
+        assert session.query(Transcription).filter_by(original_filename="carrera.wav").count() == 0
+
+    hashes = []
+    monkeypatch.setattr(
+        transcriptions,
+        "_normalized_audio",
+        lambda source, content_hash=None: hashes.append(content_hash) or Path(source),
+    )
+    monkeypatch.setattr(settings, "max_upload_size_mb", 1)
+    monkeypatch.setattr(settings, "result_cache_max_bytes", 0)
+    transcriptions._chunked_upload_stores.clear()
+
+    background = BackgroundTasks()
+    with get_session() as session:
+        response = transcriptions.create_transcription(
+            background_tasks=background,
+            upload=_make_upload("directo.wav", data=payload),
+            language="es",
+            subject=None,
+            destination_folder="subidas",
+            model_size=None,
+            device_preference=None,
+            beam_size=None,
+            session=session,
+        )
+    _run_background_tasks(background)
+    with get_session() as session:
+        stored = Path(session.get(Transcription, response.id).stored_path)
+    assert stored.read_bytes() == payload
+    assert hashes == [digest]
+
+    with get_session() as session, pytest.raises(HTTPException) as excinfo:
+        transcriptions.create_transcription(
+            background_tasks=BackgroundTasks(),
+            upload=_make_upload("enorme.wav", data=b"\0" * (1024 * 1024 + 1)),
+            language=None,
+            subject=None,
+            destination_folder="subidas",
+            model_size=None,
+            device_preference=None,
+            beam_size=None,
+            session=session,
+        )
+    assert excinfo.value.status_code == 413
+    with get_session() as session:
+        assert session.query(Transcription).filter_by(original_filename="enorme.wav").count() == 0
+
+    # A declared Content-Length over the limit is refused before the body is read.
+    from starlette.requests import Request
+
+    async def never_read():
+        raise AssertionError("el cuerpo no debería leerse")
+
+    route = next(
+        item for item in transcriptions.router.routes
+        if getattr(item, "endpoint", None) is transcriptions.create_transcription
+    )
+    oversized = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/transcriptions",
+            "headers": [
+                (b"content-type", b"multipart/form-data; boundary=x"),
+                (b"content-length", str(2 * 1024 * 1024).encode()),
+            ],
+            "query_string": b"",
+        },
+        never_read,
+    )
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(route.get_route_handler()(oversized))
+    assert excinfo.value.status_code == 413
+
+    created = transcriptions.create_chunked_upload(
+        filename="reanudada.wav", content_type="audio/wav", size=len(payload)
+    )
+    upload_id = created["upload_id"]
+    chunked = transcriptions._chunked_uploads()
+    asyncio.run(chunked.append(upload_id, 0, chunks(payload[:half])))
+    assert transcriptions.get_chunked_upload(upload_id)["offset"] == half
+    with get_session() as session, pytest.raises(HTTPException) as excinfo:
+        transcriptions.commit_chunked_upload(
+            upload_id,
+            background_tasks=BackgroundTasks(),
+            language=None,
+            subject=None,
+            destination_folder="subidas",
+            model_size=None,
+            device_preference=None,
+            beam_size=None,
+            session=session,
+        )
+    assert excinfo.value.status_code == 409
+    asyncio.run(chunked.append(upload_id, half, chunks(payload[half:])))
+
+    background = BackgroundTasks()
+    with get_session() as session:
+        response = transcriptions.commit_chunked_upload(
+            upload_id,
+            background_tasks=background,
+            language="es",
+            subject=None,
+            destination_folder="subidas",
+            model_size=None,
+            device_preference=None,
+            beam_size=None,
+            session=session,
+        )
+    _run_background_tasks(background)
+    assert response.original_filename == "reanudada.wav"
+    with get_session() as session:
+        stored = Path(session.get(Transcription, response.id).stored_path)
+    assert stored.read_bytes() == payload
+    assert hashes == [digest, digest]
+    with pytest.raises(HTTPException) as excinfo:
+        transcriptions.get_chunked_upload(upload_id)
+    assert excinfo.value.status_code == 404
+
+
+def test_batch_ingests_together_and_runs_as_longest_first_group(test_env, monkeypatch):
+    _prepare_database()
+    import sqlite3
+
+    from fastapi import HTTPException, Response
+
+    from app.config import settings
+    from app.database import get_session
+    from app.jobs import DONE, JobQueue
+    from app.models import Transcription, TranscriptionStatus
+    from app.routers import transcriptions
+
+    queue = JobQueue(test_env / "jobs.db")
+    first = queue.enqueue_group("g", [(1, {}, 5.0), (2, {}, 30.0), (3, {}, 12.0)])
+    queue.enqueue(4, {})
+    assert [queue.lease("w", group_id="g").transcription_id for _ in range(3)] == [2, 3, 1]
+    assert queue.lease("w", group_id="g") is None
+    queue.complete(first[1], "w")
+    progress = queue.group_progress("g")
+    assert progress["total"] == 3 and progress[DONE] == 1
+    assert progress["progress"] == pytest.approx(30.0 / 47.0, abs=1e-4)
+    assert queue.group_progress("otro") is None
+
+    processed = []
+    real_process = transcriptions.process_transcription
+
+    def recording_process(transcription_id, *args, **kwargs):
+        processed.append(transcription_id)
+        return real_process(transcription_id, *args, **kwargs)
+
+    monkeypatch.setattr(transcriptions, "process_transcription", recording_process)
+    monkeypatch.setattr(settings, "max_upload_size_mb", 1)
+
+    def _batch(uploads, background, response=None):
+        with get_session() as session:
+            return transcriptions.create_batch_transcriptions(
+                background_tasks=background,
+                response=response or Response(),
+                uploads=uploads,
+                language="es",
+                subject=None,
+                destination_folder="lote",
+                model_size=None,
+                device_preference=None,
+                beam_size=None,
+                session=session,
+            )
+
+    with pytest.raises(HTTPException) as excinfo:
+        _batch(
+            [
+                _make_upload("valido.wav", data=_make_silent_wav_bytes(100)),
+                _make_upload("enorme.wav", data=b"\0" * (1024 * 1024 + 1)),
+            ],
+            BackgroundTasks(),
+        )
+    assert excinfo.value.status_code == 413
+    with get_session() as session:
+        names = {row.original_filename for row in session.query(Transcription)}
+    assert not {"valido.wav", "enorme.wav"} & names
+
+    background = BackgroundTasks()
+    response = Response()
+    batch = _batch(
+        [
+            _make_upload("corta.wav", data=_make_silent_wav_bytes(200)),
+            _make_upload("larga.wav", data=_make_silent_wav_bytes(900)),
+            _make_upload("media.wav", data=_make_silent_wav_bytes(500)),
+        ],
+        background,
+        response,
+    )
+    ids = {item.original_filename: item.id for item in batch.items}
+    group_id = response.headers["X-Batch-Group"]
+    assert response.headers["Location"] == f"/api/transcriptions/batch/{group_id}"
+    assert len(background.tasks) == 1
+
+    before = transcriptions.get_batch_progress(group_id)
+    assert before["total"] == 3 and before["queued"] == 3 and before["progress"] == 0
+    _run_background_tasks(background)
+    assert processed == [ids["larga.wav"], ids["media.wav"], ids["corta.wav"]]
+    after = transcriptions.get_batch_progress(group_id)
+    assert after[DONE] == 3 and after["progress"] == 1.0
+    with pytest.raises(HTTPException) as excinfo:
+        transcriptions.get_batch_progress("desconocido")
+    assert excinfo.value.status_code == 404
+
+    def broken_enqueue(group_id, items):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(transcriptions.JOB_QUEUE, "enqueue_group", broken_enqueue)
+    with pytest.raises(HTTPException) as excinfo:
+        _batch([_make_upload("sin-cola.wav", data=_make_silent_wav_bytes(100))], BackgroundTasks())
+    assert excinfo.value.status_code == 503
+    with get_session() as session:
+        orphan = (
+            session.query(Transcription)
+            .filter_by(original_filename="sin-cola.wav")
+            .order_by(Transcription.id.desc())
+            .first()
+        )
+        assert orphan.status == TranscriptionStatus.FAILED.value
+
+
+def test_result_cache_reuses_identical_runs_and_can_be_bypassed(test_env, monkeypatch):
+    _prepare_database()
+    import sqlite3
+
+    from app.database import get_session
+    from app.models import Transcription, TranscriptionStatus
+    from app.routers import transcriptions
+    from app.utils.result_cache import TranscriptionResultCache
+
+    cache = TranscriptionResultCache(test_env / "lru.db")
+    texts = {key: os.urandom(128).hex() for key in ("a", "b", "c")}
+    cache.put("a", {"text": texts["a"]})
+    # Room for two entries of this size.
+    cache.max_bytes = cache.total_bytes() * 2 + 16
+    cache.put("b", {"text": texts["b"]})
+    assert cache.get("a") == {"text": texts["a"]}
+    cache.put("c", {"text": texts["c"]})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"text": texts["a"]} and cache.get("c") == {"text": texts["c"]}
+    assert cache.total_bytes() <= cache.max_bytes
+
+    loads = []
+    real_normalized_audio = transcriptions._normalized_audio
+
+    def counting_normalized_audio(*args, **kwargs):
+        loads.append(args)
+        return real_normalized_audio(*args, **kwargs)
+
+    monkeypatch.setattr(transcriptions, "_normalized_audio", counting_normalized_audio)
+    payload = _make_silent_wav_bytes(300)
+    queued = []
+
+    def _run(name, bypass=False, beam_size=None):
+        background = BackgroundTasks()
+        with get_session() as session:
+            response = transcriptions.create_transcription(
+                background_tasks=background,
+                upload=_make_upload(name, data=payload),
+                language="es",
+                subject=None,
+                destination_folder="cache",
+                model_size=None,
+                device_preference=None,
+                beam_size=beam_size,
+                bypass_result_cache=bypass,
+                session=session,
+            )
+        queued.append(len(background.tasks))
+        _run_background_tasks(background)
+        with get_session() as session:
+            row = session.get(Transcription, response.id)
+            return row.status, row.text, row.speakers
+
+    first = _run("original.wav")
+    assert first[0] == TranscriptionStatus.COMPLETED.value and len(loads) == 1
+    assert _run("copia.wav") == first
+    # The identical upload completes from the cache without queueing a job.
+    assert len(loads) == 1 and queued == [1, 0]
+    _run("forzada.wav", bypass=True)
+    assert len(loads) == 2
+    _run("otro-beam.wav", beam_size=2)
+    assert len(loads) == 3
+
+    # A cache write failure is logged; the job itself still succeeds.
+    def broken_put(key, payload):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(transcriptions._result_cache(), "put", broken_put)
+    assert _run("sin-cache.wav", beam_size=3)[0] == TranscriptionStatus.COMPLETED.value
+
+    # Without an ingest hash the file is hashed once for both caches.
+    from app.utils import audio_cache
+
+    hashed = []
+    real_hash_file = audio_cache.hash_file
+
+    def counting_hash_file(path):
+        hashed.append(path)
+        return real_hash_file(path)
+
+    monkeypatch.setattr(transcriptions, "hash_file", counting_hash_file)
+    monkeypatch.setattr(audio_cache, "hash_file", counting_hash_file)
+    transcriptions._audio_caches.clear()
+    with get_session() as session:
+        row_id = (
+            session.query(Transcription.id)
+            .filter_by(original_filename="sin-cache.wav")
+            .order_by(Transcription.id.desc())
+            .first()[0]
+        )
+    transcriptions.process_transcription(row_id, "es", None, None, 4)
+    assert len(hashed) == 1
+
+
+def test_model_pool_budget_refcounts_and_lru_eviction(test_env, monkeypatch):
+    import threading
+    from types import SimpleNamespace
+
+    from app.model_pool import ModelPool
+    from app.routers import transcriptions
+
+    loaded, unloaded = [], []
+    gate = threading.Event()
+    megabyte = 1024 * 1024
+
+    def loader(model_size, device):
+        loaded.append((model_size, device))
+        gate.wait(timeout=5)
+        return object()
+
+    pool = ModelPool(
+        loader,
+        budget_bytes=250 * megabyte,
+        unload=unloaded.append,
+        estimate=lambda model_size: {"small": 100, "medium": 150}.get(model_size, 50) * megabyte,
+        measure=lambda: None,
+    )
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.acquire("small", "cpu")))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    while not loaded:
+        time.sleep(0.005)
+    gate.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert loaded == [("small", "cpu")] and len({id(item) for item in results}) == 1
+    assert pool.status()["models"][0]["refs"] == 3
+
+    with pool.use("medium", "cpu"):
+        # small is still referenced, so the pool runs over budget instead.
+        assert not unloaded and pool.resident_bytes == 250 * megabyte
+    for _ in range(3):
+        pool.release("small", "cpu")
+    pool.preload([("tiny", "cpu")])
+    assert len(unloaded) == 1 and loaded[-1] == ("tiny", "cpu")
+    states = {item["model_size"]: item["state"] for item in pool.status()["models"]}
+    # small was released after medium finished, so medium is the LRU one.
+    assert states == {"small": "idle", "tiny": "idle"}
+    assert pool.status()["resident_mb"] == 150.0 and pool.evictions == 1
+
+    pool.clear()
+    assert pool.status()["models"] == [] and len(unloaded) == 3
+
+    with pool.use("small", "cpu"), pool.reserve("medium", "cpu", copies=2):
+        # Piece processes' copies push the idle tiny model out of the budget.
+        assert pool.status()["reserved_mb"] == 300.0
+        assert [item["model_size"] for item in pool.status()["models"]] == ["small"]
+    assert pool.status()["reserved"] == []
+
+    factory_loads = []
+
+    def factory(model_size, device):
+        factory_loads.append((model_size, device))
+        return SimpleNamespace(model_size=model_size, device=device)
+
+    monkeypatch.setattr(transcriptions, "get_transcriber", factory)
+    transcriptions.MODEL_POOL.clear()
+    transcriptions.MODEL_POOL.preload([("tiny", "cpu"), ("base", "cpu")])
+    resident = transcriptions.get_resident_models()
+    assert [(item["model_size"], item["state"]) for item in resident["models"]] == [
+        ("base", "idle"),
+        ("tiny", "idle"),
+    ]
+    with transcriptions.MODEL_POOL.use("base", "cpu") as model:
+        assert model.model_size == "base"
+    # The pool keeps the models; the service loader is only asked once each.
+    assert factory_loads == [("tiny", "cpu"), ("base", "cpu")]
+    transcriptions.MODEL_POOL.clear()
+
+
 def test_reject_non_media_upload(test_env):
     _prepare_database()
     from fastapi import HTTPException
@@ -270,15 +1202,130 @@ def test_live_chunk_merge_normalizes_audio(tmp_path):
     assert len(combined) >= 900
 
 
+class _LegacyAudioRing:
+    """Reference copy of the pydub-based ring the NumPy ring replaced."""
+
+    def __init__(self, max_duration: float) -> None:
+        self.max_duration = max(1.0, float(max_duration))
+        self._audio = (
+            AudioSegment.silent(duration=0, frame_rate=16_000)
+            .set_channels(1)
+            .set_sample_width(2)
+        )
+        self._total_duration = 0.0
+
+    def append(self, segment) -> None:
+        if len(segment) <= 0:
+            return
+        self._total_duration += len(segment) / 1000.0
+        combined = self._audio + segment
+        max_ms = int(self.max_duration * 1000)
+        if len(combined) > max_ms:
+            combined = combined[-max_ms:]
+        self._audio = combined
+
+    @property
+    def start(self) -> float:
+        return max(0.0, self._total_duration - len(self._audio) / 1000.0)
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self._audio) / 1000.0
+
+    def window(self, start_time: float):
+        actual_start = max(start_time, self.start)
+        offset_ms = int(max(0.0, (actual_start - self.start) * 1000))
+        return self._audio[offset_ms:], actual_start, self.end
+
+
+def test_numpy_audio_ring_matches_legacy_ring_on_replay():
+    import numpy as np
+
+    from app.routers import transcriptions
+
+    rng = np.random.default_rng(3)
+    legacy = _LegacyAudioRing(5.0)
+    ring = transcriptions.AudioRing(5.0)
+    window_start = 0.0
+    for index in range(40):
+        duration_ms = int(rng.integers(50, 900))
+        samples = rng.integers(-20000, 20000, size=duration_ms * 16, dtype=np.int16)
+        segment = AudioSegment(
+            samples.tobytes(), frame_rate=16_000, sample_width=2, channels=1
+        )
+        legacy.append(segment)
+        ring.append(segment)
+
+        assert abs(ring.start - legacy.start) < 1e-6
+        assert abs(ring.end - legacy.end) < 1e-6
+        view, actual_start, end = ring.window(window_start)
+        expected, expected_start, expected_end = legacy.window(window_start)
+        assert abs(actual_start - expected_start) < 1e-3
+        assert abs(end - expected_end) < 1e-6
+        expected_samples = np.frombuffer(expected.raw_data, dtype="<i2")
+        # The legacy ring truncates float milliseconds, so its window may start
+        # up to one millisecond (16 samples) away from the exact one.
+        assert abs(len(view) - len(expected_samples)) <= 16
+        overlap = min(len(view), len(expected_samples))
+        assert np.array_equal(view[-overlap:], expected_samples[-overlap:])
+        assert np.shares_memory(view, ring._buffer)
+        window_start = max(0.0, end - 2.0) if index % 3 else window_start
+
+
+def _legacy_silence_ratio(segment) -> float:
+    from pydub.silence import detect_nonsilent
+
+    base_threshold = segment.dBFS
+    if base_threshold == float("-inf"):
+        base_threshold = -60.0
+    windows = detect_nonsilent(
+        segment, min_silence_len=200, silence_thresh=base_threshold - 16
+    )
+    nonsilent_ms = sum(end - start for start, end in windows)
+    return min(1.0, max(0.0, 1.0 - nonsilent_ms / len(segment)))
+
+
+@pytest.mark.parametrize("seconds", [1, 5, 30])
+def test_vectorized_silence_ratio_matches_pydub(seconds):
+    import numpy as np
+
+    from app.routers import transcriptions
+
+    rng = np.random.default_rng(seconds)
+    sample_rate = transcriptions.LIVE_AUDIO_SAMPLE_RATE
+    t = np.arange(seconds * sample_rate) / sample_rate
+    # Speech-like bursts of varying length separated by pauses.
+    envelope = (np.sin(2 * np.pi * 0.37 * t) + 0.4 * np.sin(2 * np.pi * 1.9 * t)) > 0.3
+    signal = 0.4 * np.sin(2 * np.pi * 220 * t) * envelope
+    signal += 0.002 * rng.standard_normal(len(t))
+    samples = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    segment = AudioSegment(
+        data=samples.tobytes(), sample_width=2, frame_rate=sample_rate, channels=1
+    )
+
+    expected = _legacy_silence_ratio(segment)
+    estimated = transcriptions._estimate_silence_ratio(samples, sample_rate)
+    assert abs(estimated - expected) <= 0.01
+    assert transcriptions._estimate_silence_ratio(np.zeros(sample_rate, dtype="<i2")) == 1.0
+
+
 def test_prepare_model_status_endpoint(test_env):
     _prepare_database()
     from app.routers import transcriptions
     from app.schemas import ModelPreparationRequest
 
-    response = fastapi.Response()
     payload = ModelPreparationRequest(model_size="tiny", device_preference="cpu")
+    loads = transcriptions.MODEL_POOL.loads
+    first = transcriptions.prepare_model(payload=payload, response=fastapi.Response())
+    deadline = time.time() + 5
+    while not transcriptions.MODEL_POOL.is_resident("tiny", first.device_preference):
+        assert time.time() < deadline
+        time.sleep(0.005)
+
+    response = fastapi.Response()
     status_payload = transcriptions.prepare_model(payload=payload, response=response)
     assert response.status_code == 200
+    assert transcriptions.MODEL_POOL.loads == loads + 1
     assert status_payload.model_size == "tiny"
     assert status_payload.device_preference in {"cpu", "cuda"}
     assert status_payload.status == "ready"
@@ -326,6 +1373,7 @@ def test_batch_upload_and_payment_flow(test_env):
             model_size="medium",
             device_preference="gpu",
             session=session,
+            response=fastapi.Response(),
         )
     assert batch.items
     first_id = batch.items[0].id
@@ -401,6 +1449,503 @@ def test_live_transcription_session(test_env):
     assert session_id not in transcriptions.LIVE_SESSIONS
 
 
+def test_live_chunk_hands_window_array_to_transcriber(test_env, monkeypatch):
+    import numpy as np
+
+    from app.routers import transcriptions
+    from app.schemas import LiveSessionCreateRequest
+    from app.whisper_service import SegmentResult, TranscriptionResult
+
+    calls = []
+
+    class ArrayTranscriber:
+        supports_array_input = True
+
+        def transcribe(self, audio, language=None, **kwargs):
+            calls.append((audio, kwargs.get("sample_rate")))
+            return TranscriptionResult(
+                text="hola",
+                segments=[SegmentResult(start=0.0, end=0.2, text="hola")],
+                language=language,
+                duration=0.2,
+                runtime_seconds=0.01,
+            )
+
+    monkeypatch.setattr(
+        transcriptions, "get_transcriber", lambda *args, **kwargs: ArrayTranscriber()
+    )
+    session_id = transcriptions.create_live_session(
+        LiveSessionCreateRequest(language="es", model_size="small", device_preference="cpu")
+    ).session_id
+    upload = _make_upload(
+        "chunk.wav", data=_make_silent_wav_bytes(), content_type="audio/wav"
+    )
+    result = asyncio.run(
+        transcriptions.push_live_chunk(session_id=session_id, chunk=upload)
+    )
+
+    assert result.text == "hola"
+    assert len(calls) == 1
+    audio, sample_rate = calls[0]
+    assert isinstance(audio, np.ndarray)
+    assert audio.dtype == np.float32
+    assert sample_rate == transcriptions.LIVE_AUDIO_SAMPLE_RATE
+    assert len(audio) == sample_rate // 4
+    state = transcriptions.LIVE_SESSIONS[session_id]
+    assert not (state.directory / "window.wav").exists()
+    transcriptions.discard_live_session(session_id)
+
+
+def test_live_chunk_cursor_returns_only_new_segments(test_env, monkeypatch):
+    from app.routers import transcriptions
+    from app.schemas import LiveSessionCreateRequest
+    from app.whisper_service import SegmentResult, TranscriptionResult
+
+    words = iter(["uno", "dos tres"])
+
+    class TailTranscriber:
+        supports_array_input = True
+
+        def transcribe(self, audio, language=None, **kwargs):
+            duration = len(audio) / kwargs["sample_rate"]
+            text = next(words)
+            return TranscriptionResult(
+                text=text,
+                segments=[SegmentResult(start=duration - 0.25, end=duration, text=text)],
+                language=language,
+                duration=duration,
+                runtime_seconds=0.01,
+            )
+
+    monkeypatch.setattr(
+        transcriptions, "get_transcriber", lambda *args, **kwargs: TailTranscriber()
+    )
+    session_id = transcriptions.create_live_session(
+        LiveSessionCreateRequest(language="es", model_size="small", device_preference="cpu")
+    ).session_id
+
+    def push(cursor=None):
+        upload = _make_upload(
+            "chunk.wav", data=_make_silent_wav_bytes(), content_type="audio/wav"
+        )
+        return asyncio.run(
+            transcriptions.push_live_chunk(
+                session_id=session_id, chunk=upload, cursor=cursor
+            )
+        )
+
+    first = push(cursor=0)
+    assert [segment["text"] for segment in first.segments] == ["uno"]
+    assert first.next_cursor == 1
+
+    second = push(cursor=first.next_cursor)
+    assert [segment["text"] for segment in second.segments] == ["dos tres"]
+    assert second.text == "dos tres"
+    assert second.next_cursor == 2
+
+    snapshot = transcriptions.get_live_session_snapshot(session_id)
+    assert [segment["text"] for segment in snapshot.segments] == ["uno", "dos tres"]
+    assert snapshot.text == "uno dos tres"
+    state = transcriptions.LIVE_SESSIONS[session_id]
+    assert state.word_count == 3
+    assert transcriptions._collect_segments_texts(state) == ["uno", "dos tres"]
+    transcriptions.discard_live_session(session_id)
+
+
+def test_live_chunks_queued_behind_inference_are_coalesced(test_env, monkeypatch):
+    import threading
+    import time as time_module
+
+    from app.routers import transcriptions
+    from app.schemas import LiveSessionCreateRequest
+    from app.whisper_service import SegmentResult, TranscriptionResult
+
+    release = threading.Event()
+    window_lengths = []
+
+    class SlowTranscriber:
+        supports_array_input = True
+
+        def transcribe(self, audio, language=None, **kwargs):
+            window_lengths.append(len(audio))
+            if len(window_lengths) == 1:
+                release.wait(timeout=5)
+            duration = len(audio) / kwargs["sample_rate"]
+            return TranscriptionResult(
+                text="hola",
+                segments=[
+                    SegmentResult(start=duration - 0.2, end=duration, text=f"t{len(window_lengths)}")
+                ],
+                language=language,
+                duration=duration,
+                runtime_seconds=0.01,
+            )
+
+    monkeypatch.setattr(
+        transcriptions, "get_transcriber", lambda *args, **kwargs: SlowTranscriber()
+    )
+    session_id = transcriptions.create_live_session(
+        LiveSessionCreateRequest(language="es", model_size="small", device_preference="cpu")
+    ).session_id
+    state = transcriptions.LIVE_SESSIONS[session_id]
+    results = {}
+
+    def push(position: int) -> None:
+        results[position] = transcriptions._process_live_chunk_sync(
+            state, _make_silent_wav_bytes(), ".wav"
+        )
+
+    threads = [threading.Thread(target=push, args=(0,))]
+    threads[0].start()
+    while not window_lengths:
+        time_module.sleep(0.01)
+    for position in range(1, 4):
+        threads.append(threading.Thread(target=push, args=(position,)))
+        threads[-1].start()
+    while state.appended_gen < 4:
+        time_module.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    # One pass for the first chunk, one coalesced pass for the three queued.
+    assert len(window_lengths) == 2
+    assert window_lengths[1] > window_lengths[0]
+    broadcasting = [key for key, value in results.items() if value[1] is not None]
+    assert len(broadcasting) == 2
+    for position in range(1, 4):
+        response = results[position][0]
+        assert [segment["text"] for segment in response.new_segments] == ["t2"]
+    assert state.coalesced_chunks == 3
+    metrics = transcriptions._compute_live_metrics(state)
+    assert metrics["coalesced_chunks"] == 3
+    assert metrics["lag_ms"] >= 0
+    assert [segment["text"] for segment in state.segments] == ["t1", "t2"]
+    transcriptions.discard_live_session(session_id)
+
+    # Discarding mid-inference: the running chunk must not write afterwards.
+    from fastapi import HTTPException
+
+    window_lengths.clear()
+    release.clear()
+    session_id = transcriptions.create_live_session(
+        LiveSessionCreateRequest(language="es", model_size="small", device_preference="cpu")
+    ).session_id
+    state = transcriptions.LIVE_SESSIONS[session_id]
+    errors = []
+
+    def push_discarded() -> None:
+        try:
+            transcriptions._process_live_chunk_sync(state, _make_silent_wav_bytes(), ".wav")
+        except HTTPException as exc:
+            errors.append(exc.status_code)
+
+    pusher = threading.Thread(target=push_discarded)
+    pusher.start()
+    while not window_lengths:
+        time_module.sleep(0.01)
+    transcriptions.discard_live_session(session_id)
+    release.set()
+    pusher.join(timeout=5)
+    assert errors == [404]
+    assert state.closed and state.segments == [] and state.ring.sample_count == 0
+
+
+def test_inference_scheduler_prefers_live_and_rotates_owners():
+    import threading
+    import time as time_module
+
+    from app.scheduler import InferenceScheduler, Priority
+
+    scheduler = InferenceScheduler(slots=1)
+    holder = scheduler.acquire("cuda", Priority.BATCH, "folder:a")
+    order = []
+
+    def wait_for_slot(priority, owner, label):
+        with scheduler.slot("gpu", priority, owner):
+            order.append(label)
+
+    requests = [
+        (Priority.BATCH, "folder:a", "a1"),
+        (Priority.BATCH, "folder:a", "a2"),
+        (Priority.BATCH, "folder:b", "b1"),
+        (Priority.LIVE, "live:x", "live"),
+    ]
+    threads = []
+    for priority, owner, label in requests:
+        threads.append(threading.Thread(target=wait_for_slot, args=(priority, owner, label)))
+        threads[-1].start()
+        while scheduler.status()["gpu"]["queued"] < len(threads):
+            time_module.sleep(0.005)
+
+    status = scheduler.status()["gpu"]
+    assert status["active"] == 1
+    assert status["classes"]["batch"]["queued"] == 3
+    assert status["classes"]["live"]["queued"] == 1
+
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order == ["live", "a1", "b1", "a2"]
+    status = scheduler.status()["gpu"]
+    assert status["active"] == 0 and status["queued"] == 0
+    assert status["classes"]["batch"]["served"] == 4
+    assert status["classes"]["batch"]["max_wait_ms"] >= 0
+
+
+def test_inference_slots_are_shared_between_schedulers(tmp_path):
+    from app.scheduler import InferenceScheduler, Priority, SharedSlots
+
+    # Two schedulers on one directory stand in for the API and a job worker.
+    api = InferenceScheduler(slots=1, shared=SharedSlots(tmp_path))
+    worker = InferenceScheduler(slots=1, shared=SharedSlots(tmp_path))
+    with api.slot("cuda", Priority.LIVE, "live:x"):
+        with pytest.raises(TimeoutError):
+            with worker.slot("gpu", Priority.BATCH, "folder:a", timeout=0.2):
+                pass
+        assert worker.status()["gpu"]["active"] == 0
+    with worker.slot("gpu", Priority.BATCH, "folder:a", timeout=1.0):
+        assert api.status()["gpu"]["shared"] is True
+
+
+def test_live_reaper_expires_idle_sessions_off_request_path(tmp_path):
+    import time as time_module
+
+    from app.live_reaper import ExpiryReaper
+
+    ttl = 100.0
+    start = time_module.time()
+    last_seen = {"idle": start, "busy": start}
+    directories = {key: tmp_path / key for key in last_seen}
+    for directory in directories.values():
+        directory.mkdir()
+    expired = []
+
+    def deadline_of(key):
+        return last_seen[key] + ttl if key in last_seen else None
+
+    def expire(key):
+        expired.append(key)
+        del last_seen[key]
+        reaper.remove_later(directories[key])
+
+    reaper = ExpiryReaper(deadline_of, expire)
+    try:
+        for key in last_seen:
+            reaper.track(key, start + ttl)
+        for offset in range(1, 50):
+            last_seen["busy"] = start + offset
+        assert len(reaper) == 2
+
+        assert reaper.run_pending(now=start + ttl + 1) == 1
+        assert expired == ["idle"]
+        assert not directories["idle"].exists()
+        assert directories["busy"].exists()
+        assert len(reaper) == 1
+
+        assert reaper.run_pending(now=start + ttl + 48) == 0
+        assert reaper.run_pending(now=start + ttl + 50) == 1
+        assert expired == ["idle", "busy"]
+        assert len(reaper) == 0
+    finally:
+        reaper.stop()
+    assert not directories["busy"].exists()
+
+
+def test_live_requests_follow_session_owner(test_env, tmp_path, monkeypatch):
+    import httpx
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app import live_registry
+    from app.routers import transcriptions
+
+    registry = live_registry.SQLiteLiveSessionRegistry(tmp_path / "live.db")
+    other_worker = live_registry.SQLiteLiveSessionRegistry(tmp_path / "live.db")
+    other_worker.claim("remota", "http://127.0.0.1:9")
+    assert registry.owner_of("remota") == "http://127.0.0.1:9"
+    monkeypatch.setattr(transcriptions, "LIVE_REGISTRY", registry)
+
+    forwarded = []
+
+    def owner_handler(request: httpx.Request) -> httpx.Response:
+        forwarded.append((str(request.url), request.read()))
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json"},
+            stream=httpx.ByteStream(b'{"forwarded": true}'),
+        )
+
+    monkeypatch.setattr(
+        transcriptions,
+        "_live_owner_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(owner_handler)),
+    )
+    app = FastAPI()
+    app.include_router(transcriptions.router, prefix="/api")
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/transcriptions/live/sessions/remota/chunk?cursor=3",
+        files={"chunk": ("chunk.webm", b"opus-bytes", "audio/webm")},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"forwarded": True}
+    url, body = forwarded[0]
+    assert url == "http://127.0.0.1:9/api/transcriptions/live/sessions/remota/chunk?cursor=3"
+    assert b"opus-bytes" in body
+
+    monkeypatch.setattr(transcriptions.settings, "live_session_routing", "redirect")
+    response = client.get(
+        "/api/transcriptions/live/sessions/remota/events", follow_redirects=False
+    )
+    assert response.status_code == 307
+    assert (
+        response.headers["location"]
+        == "http://127.0.0.1:9/api/transcriptions/live/sessions/remota/events"
+    )
+
+    assert other_worker.release_owner("http://127.0.0.1:9") == 1
+    assert client.get("/api/transcriptions/live/sessions/remota/snapshot").status_code == 404
+
+
+_PASSTHROUGH_DECODER = [
+    sys.executable,
+    "-c",
+    "import os\n"
+    "while True:\n"
+    "    data = os.read(0, 65536)\n"
+    "    if not data:\n"
+    "        break\n"
+    "    os.write(1, data)\n",
+]
+
+
+def test_streaming_decoder_keeps_one_process_and_restarts():
+    import numpy as np
+
+    from app.utils.stream_decoder import StreamingDecoder
+
+    decoder = StreamingDecoder(command=_PASSTHROUGH_DECODER, settle_seconds=0.05)
+    try:
+        first = np.arange(0, 800, dtype="<i2")
+        second = np.arange(800, 1600, dtype="<i2")
+        assert np.array_equal(decoder.decode(first.tobytes()), first)
+        process = decoder._process
+        assert np.array_equal(decoder.decode(second.tobytes()), second)
+        assert decoder._process is process
+        assert decoder.chunks == 2 and decoder.last_decode_ms is not None
+
+        process.kill()
+        process.wait()
+        # The replacement process is primed with the first chunk, whose
+        # output is discarded, so only the new samples come back.
+        third = np.arange(1600, 2400, dtype="<i2")
+        assert np.array_equal(decoder.decode(third.tobytes()), third)
+        assert decoder.restarts == 1
+    finally:
+        decoder.close()
+    assert decoder._process is None
+
+
+def test_streaming_decoder_restarts_a_stalled_process(tmp_path):
+    import numpy as np
+
+    from app.utils.stream_decoder import StreamingDecoder
+
+    marker = tmp_path / "stalled"
+    # The first process never reads its input; the replacement passes it on.
+    command = [
+        sys.executable,
+        "-c",
+        "import os, sys, time\n"
+        f"marker = {str(marker)!r}\n"
+        "if not os.path.exists(marker):\n"
+        "    open(marker, 'w').close()\n"
+        "    time.sleep(30)\n"
+        "while True:\n"
+        "    data = os.read(0, 65536)\n"
+        "    if not data:\n"
+        "        break\n"
+        "    os.write(1, data)\n",
+    ]
+    decoder = StreamingDecoder(command=command, stall_timeout=0.5)
+    try:
+        first = np.arange(0, 800, dtype="<i2")
+        assert np.array_equal(decoder.decode(first.tobytes()), first)
+        assert decoder.restarts == 1 and marker.exists()
+    finally:
+        decoder.close()
+
+
+def test_debug_event_log_appends_and_filters(test_env):
+    _prepare_database()
+    from app.database import get_session
+    from app.models import Transcription, TranscriptionStatus
+    from app.routers import transcriptions
+
+    with get_session() as session:
+        transcription = Transcription(
+            original_filename="demo.wav",
+            stored_path=str(test_env / "demo.wav"),
+            status=TranscriptionStatus.PROCESSING.value,
+        )
+        session.add(transcription)
+        session.commit()
+        transcription_id = transcription.id
+
+    log = transcriptions.DEBUG_EVENT_LOG
+    for idx in range(150):
+        level = "warning" if idx % 50 == 0 else "info"
+        transcriptions.record_debug_event(
+            transcription_id, f"stage-{idx % 3}", f"mensaje {idx}", extra={"i": idx}, level=level
+        )
+    log.flush()
+    log_path = log.root / f"{transcription_id}.jsonl"
+    first_lines = log_path.read_bytes()
+    assert log.count(transcription_id) == 150
+
+    transcriptions.record_debug_event(transcription_id, "processing-complete", "fin")
+    log.flush()
+    assert log_path.read_bytes().startswith(first_lines)
+    assert [event["seq"] for event in log.tail(transcription_id, 3)] == [148, 149, 150]
+    resumed = list(log.read(transcription_id, after=140, stages={"stage-1"}))
+    assert [event["extra"]["i"] for event in resumed] == [142, 145, 148]
+
+    with get_session() as session:
+        detail = transcriptions.get_transcription(transcription_id, session=session)
+        assert detail.debug_events[-1].stage == "processing-complete"
+
+        # Listing stays one query; the log files are only read for the detail.
+        real_tail = log.tail
+        log.tail = lambda *args, **kwargs: pytest.fail("list read a log file")
+        try:
+            listing = transcriptions.list_transcriptions(
+                q="demo", status=None, premium_only=False, session=session
+            )
+        finally:
+            log.tail = real_tail
+        assert any(item.id == transcription_id for item in listing.results)
+
+        async def _collect(response):
+            return b"".join([chunk async for chunk in response.body_iterator]).decode("utf-8")
+
+        response = transcriptions.download_transcription_logs(
+            transcription_id, stage=None, level=["warning"], after=0, output="jsonl", session=session
+        )
+        events = [json.loads(line) for line in asyncio.run(_collect(response)).splitlines()]
+        assert [event["message"] for event in events] == ["mensaje 0", "mensaje 50", "mensaje 100"]
+
+        response = transcriptions.download_transcription_logs(
+            transcription_id, stage=["processing-complete"], level=None, after=0, output="text", session=session
+        )
+        text = asyncio.run(_collect(response))
+        assert text.splitlines()[0].endswith("INFO · processing-complete: fin")
+        transcriptions.delete_transcription(transcription_id, session=session)
+    assert not log_path.exists()
+
+
 def test_debug_event_trim(test_env):
     _prepare_database()
 
@@ -191,3 +191,98 @@ def test_live_sse_streaming_order_and_resume(test_env):
             state.remove_subscriber(subscriber)
 
     asyncio.run(_run())
+
+
+def test_live_fan_out_encodes_once_and_resumes_by_seq(test_env, monkeypatch):
+    from app.routers import transcriptions
+
+    monkeypatch.setattr(transcriptions, "LIVE_HEARTBEAT_INTERVAL_SECONDS", 0.01)
+
+    async def _run() -> None:
+        _prepare_database()
+        session_info = create_live_session(
+            LiveSessionCreateRequest(
+                language="es", model_size="tiny", device_preference="cpu"
+            )
+        )
+        state = LIVE_SESSIONS[session_info.session_id]
+        subscribers = [state.add_subscriber() for _ in range(100)]
+        try:
+            sent = [
+                state.broadcast_event("delta", {"text": f"parte {index}"})
+                for index in range(transcriptions.LIVE_EVENT_QUEUE_SIZE - 8)
+            ]
+            for subscriber in subscribers:
+                received = [subscriber.queue.get_nowait() for _ in sent]
+                assert all(a.sse is b.sse for a, b in zip(received, sent))
+            assert sent[0].sse.startswith(f"id: {sent[0].seq}\n".encode())
+
+            state.ensure_heartbeat()
+            first_task = state.heartbeat_task
+            state.ensure_heartbeat()
+            assert state.heartbeat_task is first_task
+            next_seq = state.next_seq
+            await asyncio.sleep(0.05)
+            for subscriber in subscribers:
+                heartbeat = subscriber.queue.get_nowait()
+                assert heartbeat.event == "heartbeat"
+                assert heartbeat.seq is None
+                assert not heartbeat.sse.startswith(b"id:")
+            assert state.next_seq == next_seq
+        finally:
+            state.close_all_subscribers()
+
+        for index in range(3 * transcriptions.LIVE_EVENT_HISTORY_LIMIT):
+            state.broadcast_event("delta", {"text": f"extra {index}"})
+        history = list(state.event_history)
+        assert len(history) == transcriptions.LIVE_EVENT_HISTORY_LIMIT
+        assert state.iter_history(None) == history
+        middle = history[len(history) // 2]
+        assert state.iter_history(middle.seq) == history[len(history) // 2 + 1 :]
+        assert state.iter_history(history[0].seq - 5) == history
+        assert state.iter_history(history[-1].seq) == []
+
+    asyncio.run(_run())
+
+
+def test_live_expiry_closes_streams_from_reaper_thread(test_env, monkeypatch):
+    import threading
+    import time
+
+    from app.routers import transcriptions
+
+    async def _run() -> None:
+        _prepare_database()
+        session_info = create_live_session(
+            LiveSessionCreateRequest(
+                language="es", model_size="tiny", device_preference="cpu"
+            )
+        )
+        session_id = session_info.session_id
+        state = LIVE_SESSIONS[session_id]
+        subscriber = state.add_subscriber()
+        state.ensure_heartbeat()
+        heartbeat = state.heartbeat_task
+        retried = []
+        monkeypatch.setattr(
+            transcriptions.LIVE_REAPER, "track", lambda key, deadline: retried.append(key)
+        )
+        state.last_activity = time.time() - 2 * transcriptions.LIVE_SESSION_TTL_SECONDS
+
+        # A request holding the session lock defers expiry instead of racing it.
+        with state.lock:
+            await asyncio.to_thread(transcriptions._expire_live_session, session_id)
+        assert retried == [session_id]
+        assert session_id in LIVE_SESSIONS
+
+        reaper = threading.Thread(
+            target=transcriptions._expire_live_session, args=(session_id,)
+        )
+        reaper.start()
+        await asyncio.to_thread(reaper.join)
+        assert session_id not in LIVE_SESSIONS
+        assert await asyncio.wait_for(subscriber.queue.get(), timeout=1.0) is None
+        await asyncio.sleep(0)
+        assert heartbeat.cancelled()
+
+    asyncio.run(_run())